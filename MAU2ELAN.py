@@ -0,0 +1,100 @@
+# encoding=utf-8
+
+# Sets the word start and end times in an ELAN file created by importing
+# a Toolbox file directly from a BAS Partitur file with a MAU tier.
+# This replaces MAU2Toolbox.py with word times, importing the resulting
+# Toolbox file into ELAN, flexibilize_imported_toolbox_in_elan.py
+# and import_wordtimes_from_toolbox_to_elan.py.
+#
+# Usage:
+# python MAU2ELAN.py BASFILE ORIGINALBASFILE ELANFILE OUTPUTFILE
+#
+# Optional arguments are:
+# --inputenc ...           Character encoding of the input file
+# --origenc ...            Character encoding of the original BAS Partitur file
+# --wave ...               Tries to automatically determine the attributes
+#                          of a wave file in order to convert samples to seconds
+# --waveindex ...         File in which the properties of wave files are stored between runs
+# --samplerate             Sample rate in Hz
+# --keeputterancetimes     Keep the original utterance start and end times
+# --texttier ...           Name of the transcription tier containing the words
+# --errorreport ...        Report file for words whose times cannot be set
+
+# Nice command line argument parsing
+import argparse
+
+# Module to check files and paths
+import os.path
+
+import sys
+
+# Functions for determining the properties of wave files
+from langdocmaus.audio import getWaveProperties
+
+# Functions for setting word times in ELAN files from BAS Partitur files
+from langdocmaus.mau2elan import mau_to_elan
+
+
+# Function to run the conversion with command-line arguments
+# Arguments:
+# 1. A list of command-line arguments (defaults to sys.argv[1:])
+def main(argv=None):
+
+    # Create an command-line argument parser
+    parser = argparse.ArgumentParser(description="Set word start and end times in an ELAN file (created by importing a Toolbox file) using a BAS Partitur file with a MAU tier.")
+
+    # Add arguments with sensible defaults to parser
+    parser.add_argument("inputfilename", help="the name of the input BAS Partitur file with MAU tier")
+    parser.add_argument("originalfilename", help="the name of the original BAS Partitur file")
+    parser.add_argument("elanfilename", help="the name of the input ELAN file (created by importing the original Toolbox file)")
+    parser.add_argument("outputfilename", help="the name of the output ELAN file")
+    parser.add_argument("-inputenc", "--inputenc", required=False, default="utf-8", help="the input character encoding to be used for the BAS Partitur file with MAU tier (defaults to UTF-8)")
+    parser.add_argument("-origenc", "--origenc", required=False, default="utf-8", help="the input character encoding to be used for the original BAS Partitur file (defaults to UTF-8)")
+    parser.add_argument("-wave", "--wave", required=False, help="the file name of the associated wave file")
+    parser.add_argument("-samplerate", "--samplerate", required=False, type=int, help="the sample rate of the associated wave file in Hz")
+    parser.add_argument("-waveindex", "--waveindex", required=False, help="the name of a file in which the properties of wave files are stored between runs, so that the header of each wave file is only read once (defaults to None)")
+    parser.add_argument("-keeputterancetimes", "--keeputterancetimes", required=False, action="store_true", help="keep the original utterance start and end times")
+    parser.add_argument("-texttier", "--texttier", required=False, default="t", help="the name of the transcription tier containing the words (defaults to t)")
+    parser.add_argument("-errorreport", "--errorreport", required=False, default=None, help="the name of a report file for words whose times cannot be set; if given, all such words are reported instead of stopping at the first one (tab-separated)")
+    parser.add_argument("-debuglevel", "--debuglevel", required=False, default=1, type=int, choices=[0,1], help="the debug level to be used (0 --> no status messages, 1 --> print status messages)")
+
+    # Parse command-line arguments
+    args = vars(parser.parse_args(argv))
+
+    # Process obligatory command-line arguments
+    input_file_name = args["inputfilename"]
+    original_file_name = args["originalfilename"]
+    elan_file_name = args["elanfilename"]
+    output_file_name = args["outputfilename"]
+
+    # Process optional command-line arguments
+    input_encoding = args["inputenc"]
+    original_encoding = args["origenc"]
+
+    sample_rate = args["samplerate"]
+    keep_utterance_times = args["keeputterancetimes"]
+    text_tier_name = args["texttier"]
+    error_report_file_name = args["errorreport"]
+    debug_level = args["debuglevel"]
+
+    # If a wave file was specified, test whether it exists
+    if "wave" in args and args["wave"] is not None:
+        wave_file_name = args["wave"]
+
+        if os.path.exists(wave_file_name) and os.path.isfile(wave_file_name):
+
+            # Try to determine its properties
+            sample_rate = getWaveProperties(wave_file_name, args["waveindex"])[0]
+
+    else:
+        wave_file_name = None
+        if sample_rate is None:
+            print("You either have to provide the path to the wave file or to specify the sample rate manually.")
+            sys.exit()
+
+    # Set the word start and end times in the ELAN file
+    mau_to_elan(input_file_name, original_file_name, elan_file_name, output_file_name, sample_rate, input_encoding, original_encoding, keep_utterance_times, text_tier_name, error_report_file_name, debug_level)
+
+
+if __name__ == "__main__":
+    main()
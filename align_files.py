@@ -0,0 +1,131 @@
+# encoding=utf-8
+
+# Performs the automatic alignment of BAS Partitur files created by
+# Toolbox2BASPartitur.py without uploading them to WebMAUS by hand,
+# either with a local stand-in aligner or with an external program
+# (e.g. a local MAUS installation). Many files can be aligned at once.
+#
+# Usage:
+# python align_files.py BASFILE [BASFILE ...]
+#
+# The wave file of BASE.par is BASE.wav and the result is written to BASE.mau.
+#
+# Optional arguments are:
+# --chunks ...             Chunk list written by Toolbox2BASPartitur --chunksize
+#                          (all chunks listed are aligned)
+# --wavedir ...            Directory containing the wave files
+# --outputdir ...          Directory for the resulting MAU files
+# --aligner ...            Aligner to be used (even or command, defaults to even)
+# --command ...            Command to be run by the command aligner
+# --jobs ...               Number of alignments running at the same time
+# --retries ...            Number of retries of a failed alignment
+# --retrydelay ...         Seconds to wait before the first retry
+# --timeout ...            Seconds after which an alignment is given up
+# --cache ...              Directory in which the results are kept between runs
+
+# Nice command line argument parsing
+import argparse
+
+# Module to check files and paths
+import os.path
+
+import sys
+
+# Functions for performing the automatic alignment
+from langdocmaus.aligners import align_files
+from langdocmaus.aligners import getAligner
+
+# Functions for reading chunk lists
+from langdocmaus.chunks import readChunkList
+
+
+# Function to run the alignment with command-line arguments
+# Arguments:
+# 1. A list of command-line arguments (defaults to sys.argv[1:])
+def main(argv=None):
+
+    # Create an command-line argument parser
+    parser = argparse.ArgumentParser(description="Align BAS Partitur files with their wave files and write BAS Partitur files with MAU tier.")
+
+    # Add arguments with sensible defaults to parser
+    parser.add_argument("basfilenames", nargs="*", help="the names of the BAS Partitur files (the wave file of BASE.par is BASE.wav and the result is written to BASE.mau)")
+    parser.add_argument("-chunks", "--chunks", required=False, action="append", default=[], help="the name of a chunk list file written by Toolbox2BASPartitur.py -chunksize, all chunks listed are aligned (can be given more than once)")
+    parser.add_argument("-wavedir", "--wavedir", required=False, help="the directory containing the wave files (defaults to the directory of each BAS Partitur file)")
+    parser.add_argument("-outputdir", "--outputdir", required=False, help="the directory for the resulting MAU files (defaults to the directory of each BAS Partitur file)")
+    parser.add_argument("-aligner", "--aligner", required=False, default="even", choices=["even", "command"], help="the aligner to be used (even --> spread the phonemes evenly over the utterances as a stand-in for MAUS, command --> run the command given with -command, defaults to even)")
+    parser.add_argument("-command", "--command", required=False, help="the command to be run by the command aligner, in which {par}, {wave} and {mau} are replaced by the names of the BAS Partitur file, the wave file and the output file")
+    parser.add_argument("-jobs", "--jobs", required=False, default=4, type=int, help="the number of alignments running at the same time (defaults to 4)")
+    parser.add_argument("-retries", "--retries", required=False, default=2, type=int, help="the number of retries of a failed alignment (defaults to 2)")
+    parser.add_argument("-retrydelay", "--retrydelay", required=False, default=1.0, type=float, help="the number of seconds to wait before the first retry, doubled for every further retry (defaults to 1)")
+    parser.add_argument("-timeout", "--timeout", required=False, type=float, help="the number of seconds after which an alignment is given up (defaults to no limit)")
+    parser.add_argument("-cache", "--cache", required=False, help="the name of a directory in which the results are kept between runs, so that unchanged files are not aligned again (defaults to None)")
+    parser.add_argument("-debuglevel", "--debuglevel", required=False, default=1, type=int, choices=[0,1], help="the debug level to be used (0 --> no status messages, 1 --> print status messages)")
+
+    # Parse command-line arguments
+    args = vars(parser.parse_args(argv))
+
+    if args["aligner"] == "command" and args["command"] is None:
+        print("You have to specify the command to be run by the command aligner with -command.")
+        sys.exit()
+
+    if args["jobs"] < 1:
+        print("The number of alignments running at the same time has to be at least 1.")
+        sys.exit()
+
+    # Collect the BAS Partitur files, their wave files and the output files
+    alignments = []
+
+    for par_file_name in args["basfilenames"]:
+
+        (directory, file_name) = os.path.split(par_file_name)
+        base_name = os.path.splitext(file_name)[0]
+
+        wave_file_name = os.path.join(args["wavedir"] if args["wavedir"] is not None else directory, base_name + ".wav")
+        output_file_name = os.path.join(args["outputdir"] if args["outputdir"] is not None else directory, base_name + ".mau")
+
+        alignments.append((par_file_name, wave_file_name, output_file_name))
+
+    for chunk_list_file_name in args["chunks"]:
+
+        for chunk in readChunkList(chunk_list_file_name):
+            alignments.append((chunk["par"], chunk["wave"], chunk["mau"]))
+
+    if len(alignments) == 0:
+        print("You have to specify at least one BAS Partitur file or chunk list file.")
+        sys.exit()
+
+    # Safety check
+    for (par_file_name, wave_file_name, output_file_name) in alignments:
+
+        if not os.path.isfile(par_file_name):
+            print("Cannot find the BAS Partitur file you specified:", par_file_name)
+            sys.exit()
+
+        if not os.path.isfile(wave_file_name):
+            print("Could not find wave file:", wave_file_name)
+            sys.exit()
+
+        if os.path.abspath(par_file_name) == os.path.abspath(output_file_name):
+            print("Input and output file name are the same. Cannot overwrite input file.")
+            sys.exit()
+
+    if args["outputdir"] is not None and not os.path.isdir(args["outputdir"]):
+        os.makedirs(args["outputdir"])
+
+    # Align all files
+    results = align_files(alignments, getAligner(args["aligner"], args["command"]),
+                          concurrency=args["jobs"],
+                          retries=args["retries"],
+                          retry_delay=args["retrydelay"],
+                          timeout=args["timeout"],
+                          cache_directory=args["cache"],
+                          debug_level=args["debuglevel"])
+
+    # Report the failed alignments even without status messages
+    for (par_file_name, status, message) in results:
+        if status == "failed" and args["debuglevel"] == 0:
+            print("Could not align", par_file_name + ":", message)
+
+
+if __name__ == "__main__":
+    main()
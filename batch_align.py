@@ -0,0 +1,123 @@
+# encoding=utf-8
+
+# Runs the whole pipeline (Toolbox2BASPartitur, MAU2Toolbox, MAU2TextGrid,
+# flexibilize_imported_toolbox_in_elan and import_wordtimes_from_toolbox_to_elan)
+# over all recordings found in a directory tree and writes a report
+# about the success or failure of each stage for each recording.
+#
+# Usage:
+# python batch_align.py INPUTDIRECTORY OUTPUTDIRECTORY TRANSLITERATIONFILE
+#
+# Optional arguments are:
+# --t ...                  Name of the transcription tier (defaults to t)
+# --r ...                  Name of the reference tier (defaults to ref)
+# --jobs ...               Number of recordings processed in parallel
+# --report ...             Name of the report file
+# --starttimemarker ...    Tier with utterance start times to constrain the alignment
+# --endtimemarker ...      Tier with utterance end times to constrain the alignment
+# --keeputterancetimes     Keep the original utterance times in the Toolbox files
+# --samplerate             Sample rate in Hz for recordings without wave file
+# --toolboxext ...         File name extension of Toolbox files
+# --toolboxenc ...         Character encoding of the Toolbox files
+# --parenc ...             Character encoding of the BAS Partitur files
+# --transenc ...           Character encoding of the transliteration table file
+# --force                  Run all stages even if their inputs have not changed
+# --aligner ...            Align the recordings without MAU file (even or command)
+# --command ...            Command to be run by the command aligner
+# --alignjobs ...          Number of alignments running at the same time
+
+# Nice command line argument parsing
+import argparse
+
+# Module to check files and paths
+import os.path
+
+import sys
+
+# Functions for performing the automatic alignment
+from langdocmaus.aligners import getAligner
+
+# Functions for running the pipeline over a corpus
+from langdocmaus.batch import batch_align
+
+
+# Function to run the pipeline with command-line arguments
+# Arguments:
+# 1. A list of command-line arguments (defaults to sys.argv[1:])
+def main(argv=None):
+
+    # Create an command-line argument parser
+    parser = argparse.ArgumentParser(description="Run the alignment pipeline over all recordings in a directory tree.")
+
+    # Add arguments with sensible defaults to parser
+    parser.add_argument("inputdirectory", help="the directory containing the wave, Toolbox, MAU and ELAN files (including subdirectories)")
+    parser.add_argument("outputdirectory", help="the directory for the output files")
+    parser.add_argument("transliterationfilename", help="the name of the transliteration table file")
+    parser.add_argument("-t", "--t", required=False, default="t", help="the name of the transcription tier marker in the Toolbox files (defaults to t)")
+    parser.add_argument("-r", "--r", required=False, default="ref", help="the name of the record marker in the Toolbox files (defaults to ref)")
+    parser.add_argument("-jobs", "--jobs", required=False, type=int, help="the number of recordings to be processed in parallel (defaults to the number of processors)")
+    parser.add_argument("-report", "--report", required=False, help="the name of the report file (defaults to batch_report.tsv in the output directory)")
+    parser.add_argument("-starttimemarker", "--starttimemarker", required=False, help="the name of the Toolbox tier containing the start times of utterances, which will be used to constrain the automatic time alignment")
+    parser.add_argument("-endtimemarker", "--endtimemarker", required=False, help="the name of the Toolbox tier containing the end times of utterances, which will be used to constrain the automatic time alignment")
+    parser.add_argument("-keeputterancetimes", "--keeputterancetimes", required=False, action="store_true", help="keep the original utterance start and end times in the Toolbox files")
+    parser.add_argument("-samplerate", "--samplerate", required=False, type=int, help="the sample rate in Hz to be used for recordings without wave file")
+    parser.add_argument("-toolboxext", "--toolboxext", required=False, default=".txt", help="the file name extension of Toolbox files (defaults to .txt)")
+    parser.add_argument("-toolboxenc", "--toolboxenc", required=False, default="utf-8", help="the character encoding of the Toolbox files (defaults to UTF-8)")
+    parser.add_argument("-parenc", "--parenc", required=False, default="utf-8", help="the character encoding of the BAS Partitur files (defaults to UTF-8)")
+    parser.add_argument("-transenc", "--transenc", required=False, default="utf-8", help="the character encoding to be used for the transliteration table (defaults to UTF-8)")
+    parser.add_argument("-force", "--force", required=False, action="store_true", help="run all stages, even those whose input files and options have not changed since the last run")
+    parser.add_argument("-aligner", "--aligner", required=False, choices=["even", "command"], help="align the recordings without MAU file after creating their BAS Partitur files (even --> spread the phonemes evenly over the utterances as a stand-in for MAUS, command --> run the command given with -command, defaults to no alignment)")
+    parser.add_argument("-command", "--command", required=False, help="the command to be run by the command aligner, in which {par}, {wave} and {mau} are replaced by the names of the BAS Partitur file, the wave file and the output file")
+    parser.add_argument("-alignjobs", "--alignjobs", required=False, default=4, type=int, help="the number of alignments running at the same time (defaults to 4)")
+    parser.add_argument("-debuglevel", "--debuglevel", required=False, default=1, type=int, choices=[0,1], help="the debug level to be used (0 --> no status messages, 1 --> print status messages)")
+
+    # Parse command-line arguments
+    args = vars(parser.parse_args(argv))
+
+    input_directory = args["inputdirectory"]
+    output_directory = args["outputdirectory"]
+    transliteration_file_name = args["transliterationfilename"]
+
+    if not os.path.isdir(input_directory):
+        print("Cannot find the input directory you specified:", input_directory)
+        sys.exit()
+
+    if not os.path.isfile(transliteration_file_name):
+        print("Cannot find the transliteration table file you specified:", transliteration_file_name)
+        sys.exit()
+
+    if (args["starttimemarker"] is None) != (args["endtimemarker"] is None):
+        print("You have to specify both a tier for utterance start times and a tier for utterance end times in order to constrain the automatic time alignment.")
+        sys.exit()
+
+    if args["aligner"] == "command" and args["command"] is None:
+        print("You have to specify the command to be run by the command aligner with -command.")
+        sys.exit()
+
+    if args["aligner"] is not None:
+        aligner = getAligner(args["aligner"], args["command"])
+    else:
+        aligner = None
+
+    # Run the pipeline over all recordings
+    batch_align(input_directory, output_directory, transliteration_file_name,
+                transcription_tier_name=args["t"],
+                reference_tier_name=args["r"],
+                jobs=args["jobs"],
+                report_file_name=args["report"],
+                start_time_marker=args["starttimemarker"],
+                end_time_marker=args["endtimemarker"],
+                keep_utterance_times=args["keeputterancetimes"],
+                sample_rate=args["samplerate"],
+                toolbox_extension=args["toolboxext"],
+                toolbox_encoding=args["toolboxenc"],
+                partitur_encoding=args["parenc"],
+                transliteration_encoding=args["transenc"],
+                debug_level=args["debuglevel"],
+                force=args["force"],
+                aligner=aligner,
+                align_jobs=args["alignjobs"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# encoding=utf-8
+
+# Library functions of the LangDocMAUS scripts
+#
+# The scripts in the main directory are thin command-line wrappers around
+# these functions, which take all settings as explicit arguments so that
+# they can also be called repeatedly from a single Python process.
+
+from langdocmaus.partitur import readBASPartiturFile
+from langdocmaus.partitur import parse_partitur
+from langdocmaus.partitur import mau_to_word_times
+from langdocmaus.mau2textgrid import write_textgrid
+from langdocmaus.mau2textgrid import mau_to_textgrid
+from langdocmaus.mau2toolbox import annotate_toolbox
+from langdocmaus.mau2toolbox import write_toolbox
+from langdocmaus.mau2toolbox import mau_to_toolbox
+from langdocmaus.toolbox2partitur import toolbox_to_partitur
+from langdocmaus.chunks import merge_chunks
+from langdocmaus.aligners import align_files
+from langdocmaus.inventory import check_inventory
+from langdocmaus.inventory import check_corpus_inventory
+from langdocmaus.flexibilize import flexibilize_elan
+from langdocmaus.wordtimes import import_word_times
+from langdocmaus.mau2elan import mau_to_elan
+from langdocmaus.batch import batch_align
+
+# Public API of the package
+__all__ = ["readBASPartiturFile",
+           "parse_partitur",
+           "mau_to_word_times",
+           "write_textgrid",
+           "mau_to_textgrid",
+           "annotate_toolbox",
+           "write_toolbox",
+           "mau_to_toolbox",
+           "toolbox_to_partitur",
+           "merge_chunks",
+           "align_files",
+           "check_inventory",
+           "check_corpus_inventory",
+           "flexibilize_elan",
+           "import_word_times",
+           "mau_to_elan",
+           "batch_align"]
@@ -0,0 +1,385 @@
+# encoding=utf-8
+
+# Functions for performing the automatic alignment of BAS Partitur files
+# without uploading them to WebMAUS by hand
+#
+# An aligner is a function that takes the name of a BAS Partitur file, the name
+# of the associated wave file and the name of the output BAS Partitur file with
+# MAU tier, and writes the output file (or raises an exception). It can either be
+# an ordinary function (run in a separate thread) or a coroutine function.
+#
+# Two aligners are included:
+#
+# even: a local stand-in for MAUS, which spreads the phonemes of each utterance
+#       evenly over its TRN segment (or all phonemes over the whole recording),
+#       so that the whole pipeline can be run and benchmarked offline
+# command: runs an external program such as a local MAUS installation or a client
+#          for the MAUS web service (see makeCommandAligner)
+#
+# align_files submits many BAS Partitur files at once with a bounded number of
+# alignments running at the same time, retries failed alignments and keeps the
+# results in a cache directory keyed on the contents of the input files.
+
+# Module for running the aligners concurrently
+import asyncio
+
+# Codecs for handling character encodings
+import codecs
+
+# Module for computing the cache keys
+import hashlib
+
+# Modules to check files and paths
+import os
+import os.path
+
+# Module for splitting aligner commands into arguments
+import shlex
+
+# Module for copying cached results
+import shutil
+
+# Module for measuring the time needed for the alignment
+import time
+
+# Functions for reading wave files
+from langdocmaus.audio import readWaveHeader
+
+# Functions for hashing files
+from langdocmaus.manifest import hashFile
+
+# Functions for reading BAS Partitur files
+from langdocmaus.partitur import readBASPartiturFile
+
+
+# Function to determine the MAU tier of a segment by spreading the phonemes evenly over it
+# Arguments:
+# 1. The first sample of the segment
+# 2. The number of samples of the segment
+# 3. A list of pairs (word id, phoneme)
+# returns a list of tuples (start, duration, word id, phoneme) as in the MAU tier
+def spreadPhonemes(start, duration, phonemes):
+
+    if duration < len(phonemes):
+        raise ValueError("Segment at sample %d is too short for %d phonemes" % (start, len(phonemes)))
+
+    segments = []
+
+    for (index, (word_id, phoneme)) in enumerate(phonemes):
+
+        phoneme_start = start + duration * index // len(phonemes)
+        phoneme_end = start + duration * (index + 1) // len(phonemes)
+
+        # The duration in the MAU tier does not include the last sample
+        segments.append((phoneme_start, phoneme_end - phoneme_start - 1, word_id, phoneme))
+
+    return segments
+
+
+# Function to align a BAS Partitur file without MAUS by spreading the phonemes
+# of the KAN tier evenly over the TRN segments of their utterances
+# (or over the whole recording if there is no TRN tier)
+# The parts of the recording outside the segments are marked as pauses
+# and the output file contains all tiers of the input file and the MAU tier.
+# Arguments:
+# 1. The name of the BAS Partitur file
+# 2. The name of the associated wave file
+# 3. The name of the output BAS Partitur file with MAU tier
+# 4. The character encoding of the BAS Partitur files (defaults to utf-8)
+def alignEvenly(par_file_name, wave_file_name, output_file_name, encoding="utf-8"):
+
+    tiers = readBASPartiturFile(par_file_name, encoding)
+
+    number_of_samples = readWaveHeader(wave_file_name)["frames"]
+
+    # The phonemes of each word (new style KAN tiers separate phonemes by spaces)
+    word_phonemes = {}
+
+    for (word_id, word) in tiers["KAN"]:
+        word_phonemes[word_id] = word.split()
+
+    # Use the TRN segments or a single segment for the whole recording
+    if len(tiers["TRN"]) > 0:
+        segments = [(int(start), int(duration), word_ids) for (start, duration, word_ids, utterance_id) in tiers["TRN"]]
+    else:
+        segments = [(0, number_of_samples, [word_id for (word_id, word) in tiers["KAN"]])]
+
+    mau_tier = []
+
+    # The sample after the last segment
+    next_sample = 0
+
+    for (start, duration, word_ids) in sorted(segments):
+
+        if start > next_sample:
+            mau_tier.append((next_sample, start - next_sample - 1, "-1", "<p:>"))
+
+        mau_tier.extend(spreadPhonemes(start, duration, [(word_id, phoneme) for word_id in word_ids for phoneme in word_phonemes.get(word_id, [])]))
+
+        next_sample = max(next_sample, start + duration)
+
+    if number_of_samples > next_sample:
+        mau_tier.append((next_sample, number_of_samples - next_sample - 1, "-1", "<p:>"))
+
+    # Copy the input file and add the MAU tier
+    input_file = codecs.open(par_file_name, "r", encoding)
+    output_file = codecs.open(output_file_name, "w", encoding)
+
+    for line in input_file:
+        output_file.write(line.rstrip("\r\n") + "\n")
+
+    print(file=output_file)
+
+    for (start, duration, word_id, phoneme) in mau_tier:
+        print("MAU:", start, duration, word_id, phoneme, file=output_file)
+
+    input_file.close()
+    output_file.close()
+
+
+# The results of the stand-in aligner are cached under its name
+alignEvenly.cache_key = "even"
+
+
+# Function to create an aligner that runs an external program
+# Arguments:
+# 1. The command as a string, in which {par}, {wave} and {mau} are replaced by
+#    the names of the BAS Partitur file, the wave file and the output file
+#    (e.g. "maus BPF={par} SIGNAL={wave} OUT={mau} OUTFORMAT=mau-append")
+# returns the aligner (a coroutine function)
+def makeCommandAligner(command):
+
+    arguments = shlex.split(command)
+
+    async def alignWithCommand(par_file_name, wave_file_name, output_file_name):
+
+        process = await asyncio.create_subprocess_exec(*[argument.format(par=par_file_name, wave=wave_file_name, mau=output_file_name) for argument in arguments],
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.STDOUT)
+
+        # Do not leave the program running if the alignment is given up
+        try:
+            output = (await process.communicate())[0].decode("utf-8", "replace")
+
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if process.returncode != 0:
+            messages = [line for line in output.splitlines() if line.strip() != ""]
+            raise RuntimeError("%s exited with status %d%s" % (arguments[0], process.returncode, (": " + messages[-1]) if messages else ""))
+
+        if not os.path.isfile(output_file_name):
+            raise RuntimeError("%s did not write %s" % (arguments[0], output_file_name))
+
+    # The results of different commands are cached separately
+    alignWithCommand.cache_key = "command " + command
+
+    return alignWithCommand
+
+
+# The aligners that can be selected by name
+ALIGNERS = {"even": alignEvenly}
+
+
+# Function to select an aligner by name
+# Arguments:
+# 1. The name of the aligner (even or command)
+# 2. The command of the command aligner (see makeCommandAligner)
+# returns the aligner
+def getAligner(aligner_name, command=None):
+
+    if aligner_name == "command":
+
+        if command is None:
+            raise ValueError("The command aligner needs a command")
+
+        return makeCommandAligner(command)
+
+    if aligner_name not in ALIGNERS:
+        raise ValueError("Unknown aligner: %s" % aligner_name)
+
+    return ALIGNERS[aligner_name]
+
+
+# Function to compute the cache key of an alignment
+# Arguments:
+# 1. The aligner
+# 2. The name of the BAS Partitur file
+# 3. The name of the wave file
+# returns the key as a hexadecimal string
+def getAlignmentCacheKey(aligner, par_file_name, wave_file_name):
+
+    cache_key = hashlib.sha256()
+
+    cache_key.update(getattr(aligner, "cache_key", aligner.__name__).encode("utf-8"))
+    cache_key.update(hashFile(par_file_name).encode("ascii"))
+    cache_key.update(hashFile(wave_file_name).encode("ascii"))
+
+    return cache_key.hexdigest()
+
+
+# Function to run an aligner on a single BAS Partitur file
+# The output is written to a temporary file that only replaces the output file
+# if the alignment succeeds, so that an alignment that is given up never leaves
+# behind a partial output file.
+# Ordinary functions run in a separate thread, which cannot be stopped. If such
+# an alignment takes too long, the thread is still waited for before the timeout
+# is reported, so that the number of concurrent alignments stays within its limit.
+# Arguments:
+# 1. The aligner
+# 2. The name of the BAS Partitur file
+# 3. The name of the wave file
+# 4. The name of the output file
+# 5. The number of seconds after which the alignment is given up (None for no limit)
+async def runAligner(aligner, par_file_name, wave_file_name, output_file_name, timeout):
+
+    loop = asyncio.get_running_loop()
+
+    # Keep the extension, from which some aligners determine the output format
+    (base_name, extension) = os.path.splitext(output_file_name)
+    temporary_file_name = "%s.%d.%d.tmp%s" % (base_name, os.getpid(), id(asyncio.current_task()), extension)
+
+    try:
+
+        if asyncio.iscoroutinefunction(aligner):
+            await asyncio.wait_for(aligner(par_file_name, wave_file_name, temporary_file_name), timeout)
+
+        else:
+            alignment = loop.run_in_executor(None, aligner, par_file_name, wave_file_name, temporary_file_name)
+
+            try:
+                await asyncio.wait_for(asyncio.shield(alignment), timeout)
+
+            except asyncio.TimeoutError:
+
+                # Wait for the thread (its result is discarded)
+                try:
+                    await alignment
+                except (Exception, SystemExit):
+                    pass
+
+                raise
+
+        os.replace(temporary_file_name, output_file_name)
+
+    finally:
+
+        if os.path.exists(temporary_file_name):
+            os.remove(temporary_file_name)
+
+
+# Function to align a single BAS Partitur file (with retries and caching)
+# Alignments by ordinary functions are not retried after a timeout,
+# since they might take just as long again (cf. runAligner).
+# Arguments:
+# 1. The aligner
+# 2. A tuple (BAS Partitur file name, wave file name, output file name)
+# 3. The semaphore limiting the number of concurrent alignments
+# 4. The number of retries
+# 5. The number of seconds to wait before the first retry (doubled for every further retry)
+# 6. The number of seconds after which an alignment is given up (None for no limit)
+# 7. The cache directory (None for no cache)
+# 8. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a tuple (BAS Partitur file name, status, message) with status aligned, cached or failed
+async def alignFile(aligner, alignment, semaphore, retries, retry_delay, timeout, cache_directory, debug_level):
+
+    (par_file_name, wave_file_name, output_file_name) = alignment
+
+    loop = asyncio.get_running_loop()
+
+    try:
+
+        # Look up the result in the cache
+        if cache_directory is not None:
+
+            cache_file_name = os.path.join(cache_directory, await loop.run_in_executor(None, getAlignmentCacheKey, aligner, par_file_name, wave_file_name) + ".mau")
+
+            if os.path.isfile(cache_file_name):
+                shutil.copyfile(cache_file_name, output_file_name)
+                return (par_file_name, "cached", "")
+
+        for attempt in range(retries + 1):
+
+            try:
+
+                async with semaphore:
+
+                    start_time = time.perf_counter()
+
+                    await runAligner(aligner, par_file_name, wave_file_name, output_file_name, timeout)
+
+                break
+
+            except (Exception, SystemExit) as error:
+
+                if isinstance(error, asyncio.TimeoutError):
+                    message = "Alignment took longer than %s seconds" % timeout
+
+                    if not asyncio.iscoroutinefunction(aligner):
+                        return (par_file_name, "failed", message + " (not retried)")
+
+                # The functions of the scripts print their error messages before they exit
+                elif isinstance(error, SystemExit):
+                    message = "Alignment stopped (see the messages printed before)"
+                else:
+                    message = "%s: %s" % (type(error).__name__, error)
+
+                if attempt == retries:
+                    return (par_file_name, "failed", message)
+
+                # Print status message
+                if debug_level == 1:
+                    print("Retrying alignment of", par_file_name, "after error:", message)
+
+                await asyncio.sleep(retry_delay * 2 ** attempt)
+
+        # Save the result in the cache
+        if cache_directory is not None:
+            shutil.copyfile(output_file_name, cache_file_name)
+
+    except OSError as error:
+        return (par_file_name, "failed", "%s: %s" % (type(error).__name__, error))
+
+    return (par_file_name, "aligned", "%.3f seconds" % (time.perf_counter() - start_time))
+
+
+# Function to align many BAS Partitur files at once
+# Arguments:
+# 1. A list of tuples (BAS Partitur file name, wave file name, output file name)
+# 2. The aligner (e.g. as returned by getAligner)
+# 3. The maximal number of alignments running at the same time (defaults to 4)
+# 4. The number of retries of a failed alignment (defaults to 2)
+# 5. The number of seconds to wait before the first retry (defaults to 1, doubled for every further retry)
+# 6. The number of seconds after which an alignment is given up (defaults to None, i.e. no limit)
+# 7. The name of a directory in which the results are kept between runs (defaults to None, i.e. no cache)
+# 8. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a list of tuples (BAS Partitur file name, status, message) with status aligned, cached or failed
+def align_files(alignments, aligner, concurrency=4, retries=2, retry_delay=1.0, timeout=None, cache_directory=None, debug_level=0):
+
+    if cache_directory is not None and not os.path.isdir(cache_directory):
+        os.makedirs(cache_directory)
+
+    async def alignAll():
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        return await asyncio.gather(*[alignFile(aligner, alignment, semaphore, retries, retry_delay, timeout, cache_directory, debug_level) for alignment in alignments])
+
+    start_time = time.perf_counter()
+
+    results = asyncio.run(alignAll())
+
+    # Print status message
+    if debug_level == 1:
+
+        for (par_file_name, status, message) in results:
+            if message:
+                print(status.capitalize() + ":", par_file_name, "(" + message + ")")
+            else:
+                print(status.capitalize() + ":", par_file_name)
+
+        print("Aligned", len([result for result in results if result[1] != "failed"]), "of", len(results), "files in %.3f seconds." % (time.perf_counter() - start_time))
+
+    return results
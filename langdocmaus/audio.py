@@ -0,0 +1,286 @@
+# encoding=utf-8
+
+# Functions for determining the properties of wave files
+#
+# Only the RIFF/WAVE header of a wave file is read (not the audio data).
+# Besides plain PCM files, files in the WAVE_FORMAT_EXTENSIBLE format and
+# RF64/BW64 files (for recordings larger than 4 GB) are supported.
+# The properties can be stored in an index file keyed on the path, size
+# and modification time of the wave file, so that the header of a wave file
+# only has to be read once for all scripts.
+# Parts of a wave file can be copied into a new wave file
+# (for aligning a long recording in chunks).
+
+# Codecs for handling character encodings
+import codecs
+
+# Module to check files and paths
+import os
+import os.path
+
+# Unpacking the binary header fields
+import struct
+
+
+# The value of the 32 bit size fields in RF64 files that refers to the ds64 chunk
+RF64_SIZE_IN_DS64 = 0xFFFFFFFF
+
+# The format tag of the WAVE_FORMAT_EXTENSIBLE format
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# The properties of the wave files read in by the current process
+# (a dictionary from tuples (path, size, modification time) to
+# tuples (sample rate, channels, bit depth))
+wave_properties_cache = {}
+
+
+# Function to read the header of a wave file
+# Arguments:
+# 1. The name of the wave file
+# returns a dictionary with the keys "format" (the format tag, for WAVE_FORMAT_EXTENSIBLE
+# the format tag of the sub format), "channels", "sample_rate", "bits_per_sample",
+# "sample_width" (in bytes), "block_align", "data_offset" (the position of the audio data
+# in the file), "data_size" (in bytes) and "frames"
+def readWaveHeader(wave_file_name):
+
+    wave_file = open(wave_file_name, "rb")
+
+    try:
+
+        riff_header = wave_file.read(12)
+
+        if len(riff_header) < 12 or riff_header[0:4] not in (b"RIFF", b"RF64", b"BW64") or riff_header[8:12] != b"WAVE":
+            raise ValueError("Not a RIFF/WAVE file: %s" % wave_file_name)
+
+        header = None
+        data_offset = None
+        data_size = None
+
+        # The size of the data chunk given in the ds64 chunk of RF64 files
+        ds64_data_size = None
+
+        # Go through the chunks until both the format and the data chunk have been found
+        while header is None or data_offset is None:
+
+            chunk_header = wave_file.read(8)
+
+            if len(chunk_header) < 8:
+                break
+
+            (chunk_id, chunk_size) = struct.unpack("<4sI", chunk_header)
+            chunk_start = wave_file.tell()
+
+            if chunk_id == b"ds64":
+
+                ds64_chunk = wave_file.read(chunk_size)
+
+                if len(ds64_chunk) >= 16:
+                    ds64_data_size = struct.unpack("<Q", ds64_chunk[8:16])[0]
+
+            elif chunk_id == b"fmt ":
+
+                format_chunk = wave_file.read(chunk_size)
+
+                if len(format_chunk) < 16:
+                    raise ValueError("Incomplete format chunk in wave file: %s" % wave_file_name)
+
+                (format_tag, channels, sample_rate, byte_rate, block_align, bits_per_sample) = struct.unpack("<HHIIHH", format_chunk[:16])
+
+                # The actual format is given by the first two bytes of the sub format GUID
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(format_chunk) >= 26:
+                    format_tag = struct.unpack("<H", format_chunk[24:26])[0]
+
+                header = {"format": format_tag,
+                          "channels": channels,
+                          "sample_rate": sample_rate,
+                          "bits_per_sample": bits_per_sample,
+                          "sample_width": (bits_per_sample + 7) // 8,
+                          "block_align": block_align}
+
+            elif chunk_id == b"data":
+
+                data_offset = chunk_start
+
+                if chunk_size == RF64_SIZE_IN_DS64 and ds64_data_size is not None:
+                    chunk_size = ds64_data_size
+
+                data_size = chunk_size
+
+                # Do not read the audio data
+                if header is not None:
+                    break
+
+            # Skip the rest of the chunk (chunks are padded to an even size)
+            wave_file.seek(chunk_start + chunk_size + chunk_size % 2)
+
+    finally:
+        wave_file.close()
+
+    if header is None:
+        raise ValueError("Could not find the format chunk in wave file: %s" % wave_file_name)
+
+    if data_offset is None:
+        raise ValueError("Could not find the data chunk in wave file: %s" % wave_file_name)
+
+    # The data chunk of the last file of an interrupted recording may be shorter than specified
+    data_size = min(data_size, os.path.getsize(wave_file_name) - data_offset)
+
+    header["data_offset"] = data_offset
+    header["data_size"] = data_size
+
+    if header["block_align"] > 0:
+        header["frames"] = data_size // header["block_align"]
+    else:
+        header["frames"] = 0
+
+    return header
+
+
+# Function to get the key of a wave file in the cache and the index file
+# Arguments:
+# 1. The name of the wave file
+# returns a tuple (absolute path, size in bytes, modification time in nanoseconds)
+def getWaveFileKey(wave_file_name):
+
+    file_status = os.stat(wave_file_name)
+
+    return (os.path.abspath(wave_file_name), file_status.st_size, file_status.st_mtime_ns)
+
+
+# Function to read in an index file of wave file properties written by getWaveProperties
+# Arguments:
+# 1. The name of the index file
+# returns a dictionary from keys as produced by getWaveFileKey to tuples (sample rate, channels, bit depth)
+def readWaveIndex(index_file_name):
+
+    wave_index = {}
+
+    # There is nothing to read before the first run
+    if not os.path.exists(index_file_name):
+        return wave_index
+
+    index_file = codecs.open(index_file_name, "r", "utf-8")
+
+    # Each line contains the path, size and modification time of a wave file
+    # and its sample rate, number of channels and bit depth separated by tabs
+    for line in index_file:
+
+        fields = line.rstrip("\r\n").split("\t")
+
+        # Ignore incomplete lines (e.g. from an interrupted run)
+        if len(fields) != 6:
+            continue
+
+        try:
+            wave_index[(fields[0], int(fields[1]), int(fields[2]))] = (int(fields[3]), int(fields[4]), int(fields[5]))
+
+        except ValueError:
+            continue
+
+    index_file.close()
+
+    return wave_index
+
+
+# Function to determine the properties of a wave file
+# (only reading the header of the wave file if it has not been read before)
+# Arguments:
+# 1. The name of the wave file
+# 2. The name of an index file in which the properties of wave files are stored
+#    between runs (defaults to None, i.e. only remember them in the current process)
+# returns a tuple (sample_rate, channels, bit_depth), the bit depth in bytes
+def getWaveProperties(wave_file_name, index_file_name=None):
+
+    key = getWaveFileKey(wave_file_name)
+
+    if key in wave_properties_cache:
+        return wave_properties_cache[key]
+
+    # Look up the wave file in the index file
+    if index_file_name is not None:
+
+        wave_index = readWaveIndex(index_file_name)
+
+        if key in wave_index:
+            wave_properties_cache[key] = wave_index[key]
+            return wave_index[key]
+
+    # Read the header of the wave file
+    header = readWaveHeader(wave_file_name)
+
+    properties = (header["sample_rate"], header["channels"], header["sample_width"])
+
+    wave_properties_cache[key] = properties
+
+    # Add the wave file to the index file
+    # (a single line is appended, so that several processes can share the index file)
+    if index_file_name is not None:
+
+        index_file = codecs.open(index_file_name, "a", "utf-8")
+        index_file.write("\t".join([key[0], str(key[1]), str(key[2])] + [str(value) for value in properties]) + "\n")
+        index_file.close()
+
+    return properties
+
+
+# Function to copy a part of a wave file into a new wave file
+# (without reading the whole audio data into memory)
+# Arguments:
+# 1. The name of the wave file
+# 2. The name of the new wave file
+# 3. The first sample of the part
+# 4. The sample after the last sample of the part
+#    (the part ends at the end of the wave file at the latest)
+# returns the number of samples copied
+def writeWaveExcerpt(wave_file_name, output_file_name, start_sample, end_sample):
+
+    header = readWaveHeader(wave_file_name)
+
+    block_align = header["block_align"]
+
+    end_sample = min(end_sample, header["frames"])
+    start_sample = min(max(start_sample, 0), end_sample)
+
+    data_size = (end_sample - start_sample) * block_align
+
+    # The new file is a plain RIFF file
+    if data_size + 36 > 0xFFFFFFFF:
+        raise ValueError("Excerpt too large for a RIFF/WAVE file: %s" % output_file_name)
+
+    # Copy the format of the wave file
+    # (WAVE_FORMAT_EXTENSIBLE files get the format tag of their sub format)
+    format_chunk = struct.pack("<HHIIHH", header["format"], header["channels"], header["sample_rate"], header["sample_rate"] * block_align, block_align, header["bits_per_sample"])
+
+    wave_file = open(wave_file_name, "rb")
+    output_file = open(output_file_name, "wb")
+
+    try:
+
+        output_file.write(b"RIFF" + struct.pack("<I", 4 + 8 + len(format_chunk) + 8 + data_size + data_size % 2) + b"WAVE")
+        output_file.write(b"fmt " + struct.pack("<I", len(format_chunk)) + format_chunk)
+        output_file.write(b"data" + struct.pack("<I", data_size))
+
+        wave_file.seek(header["data_offset"] + start_sample * block_align)
+
+        remaining_size = data_size
+
+        # Copy the audio data in blocks
+        while remaining_size > 0:
+
+            block = wave_file.read(min(remaining_size, 1 << 20))
+
+            if len(block) == 0:
+                break
+
+            output_file.write(block)
+            remaining_size -= len(block)
+
+        # Chunks are padded to an even size
+        if data_size % 2 == 1:
+            output_file.write(b"\x00")
+
+    finally:
+        wave_file.close()
+        output_file.close()
+
+    return end_sample - start_sample
@@ -0,0 +1,568 @@
+# encoding=utf-8
+
+# Functions to run the whole LangDocMAUS pipeline over a corpus
+#
+# All recordings in a directory tree are collected by their base file names
+# (e.g. bora.wav, bora.txt, bora.mau and bora.nowordtimes.eaf) and every
+# recording is processed in a separate worker process:
+#
+# 1. Toolbox2BASPartitur (Toolbox file and wave file --> BAS Partitur file)
+# 2. MAU2Toolbox (MAU file --> Toolbox file with utterance and word times)
+# 3. MAU2TextGrid (MAU file --> Praat TextGrid file)
+# 4. flexibilize_imported_toolbox_in_elan (ELAN file --> flexibilized ELAN file)
+# 5. import_wordtimes_from_toolbox_to_elan (flexibilized ELAN file --> ELAN file with word times)
+#
+# A stage is skipped if its input files are missing (e.g. because the automatic
+# alignment with (Web)MAUS has not been performed yet) and a failing stage only
+# stops the later stages of the same recording. The outcome of every stage
+# is written to a tab-separated report file.
+#
+# If an aligner is given (see langdocmaus.aligners), the recordings without
+# MAU file are aligned after the BAS Partitur files have been created and the
+# remaining stages are run with the resulting MAU files.
+
+# Module to run the recordings in parallel
+import concurrent.futures
+
+# Module to redirect the status messages of the individual stages
+import contextlib
+
+# Codecs for handling character encodings
+import codecs
+
+# Module to write the report file
+import csv
+
+import io
+
+# Modules to find files
+import os
+import os.path
+
+# Functions for performing the automatic alignment
+from langdocmaus.aligners import align_files
+
+# Functions for determining the properties of wave files
+from langdocmaus.audio import getWaveProperties
+
+# Functions for skipping stages whose inputs have not changed
+from langdocmaus.manifest import isUpToDate
+from langdocmaus.manifest import makeManifest
+from langdocmaus.manifest import readManifest
+from langdocmaus.manifest import writeManifest
+
+# Functions for the individual stages
+from langdocmaus.toolbox2partitur import toolbox_to_partitur
+from langdocmaus.mau2toolbox import mau_to_toolbox
+from langdocmaus.mau2textgrid import mau_to_textgrid
+from langdocmaus.flexibilize import flexibilize_elan
+from langdocmaus.wordtimes import import_word_times
+
+# Names of the stages in the order in which they are run
+STAGES = ("Toolbox2BASPartitur", "MAU2Toolbox", "MAU2TextGrid", "flexibilize", "import_wordtimes")
+
+
+# Function to determine the base name of a recording and the kind of file
+# Arguments:
+# 1. A file name (without directory)
+# 2. The file name extension of Toolbox files
+# returns a pair (base_name, kind) or None if the file is not used by the pipeline
+def classifyFile(file_name, toolbox_extension=".txt"):
+
+    (base_name, extension) = os.path.splitext(file_name)
+    extension = extension.lower()
+
+    if extension == ".wav":
+        return (base_name, "wave")
+
+    elif extension == toolbox_extension.lower():
+        return (base_name, "toolbox")
+
+    elif extension == ".par":
+        return (base_name, "par")
+
+    elif extension == ".mau":
+        return (base_name, "mau")
+
+    elif extension == ".eaf":
+
+        # ELAN files imported from Toolbox may be called NAME.nowordtimes.eaf
+        if base_name.endswith(".nowordtimes"):
+            base_name = base_name[:-len(".nowordtimes")]
+
+        return (base_name, "eaf")
+
+    return None
+
+
+# Function to find all recordings in a directory tree
+# Arguments:
+# 1. The directory to be searched (including all subdirectories)
+# 2. The file name extension of Toolbox files
+# 3. A directory to be left out (e.g. the output directory)
+# returns a dictionary from base names to dictionaries from kinds of files
+# (wave, toolbox, par, mau, eaf) to lists of file names
+# Only base names with a Toolbox file or a BAS Partitur file are included.
+def findRecordings(directory, toolbox_extension=".txt", excluded_directory=None):
+
+    recordings = {}
+
+    if excluded_directory is not None:
+        excluded_directory = os.path.realpath(excluded_directory)
+
+    for (current_directory, subdirectories, file_names) in os.walk(directory):
+
+        # Do not descend into the excluded directory
+        if excluded_directory is not None:
+            subdirectories[:] = [subdirectory for subdirectory in subdirectories
+                                 if os.path.realpath(os.path.join(current_directory, subdirectory)) != excluded_directory]
+
+        for file_name in sorted(file_names):
+            classification = classifyFile(file_name, toolbox_extension)
+
+            if classification is None:
+                continue
+
+            (base_name, kind) = classification
+
+            if base_name not in recordings:
+                recordings[base_name] = {}
+
+            if kind not in recordings[base_name]:
+                recordings[base_name][kind] = []
+
+            recordings[base_name][kind].append(os.path.join(current_directory, file_name))
+
+    # Leave out files that do not belong to a transcribed recording
+    recordings = dict((base_name, files) for (base_name, files) in recordings.items()
+                      if "toolbox" in files or "par" in files)
+
+    return recordings
+
+
+# Function to run a single stage and to record its outcome
+# Arguments:
+# 1. The list of results (tuples of stage, status, message) to be extended
+# 2. The name of the stage
+# 3. The file handle of the log file of the recording
+# 4. The function to be called
+# 5. Any further arguments are passed on to the function
+#    (if the function returns a string, it is used as the message of a successful stage)
+# returns True if the stage was successful, False otherwise
+def runStage(results, stage, log_file, function, *args, **kwargs):
+
+    # Collect the status messages of the stage, which also contain
+    # the error messages printed before the scripts exit
+    stage_output = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(stage_output):
+            stage_message = function(*args, **kwargs)
+
+    except (Exception, SystemExit) as error:
+
+        # Use the last message that was printed as the reason for the failure
+        messages = [line for line in stage_output.getvalue().splitlines() if line.strip() != ""]
+
+        if isinstance(error, SystemExit) and len(messages) > 0:
+            message = messages[-1]
+        else:
+            message = "%s: %s" % (type(error).__name__, error)
+
+        log_file.write(stage_output.getvalue())
+        log_file.write("Stage %s failed: %s\n" % (stage, message))
+        results.append((stage, "failed", message))
+        return False
+
+    log_file.write(stage_output.getvalue())
+    if not isinstance(stage_message, str):
+        stage_message = ""
+
+    results.append((stage, "ok", stage_message))
+    return True
+
+
+# Function to set the word start and end times in a flexibilized ELAN file
+# Words whose times cannot be set are written to a report file instead of stopping
+# the stage, so that all problems of a recording are found in one run
+# returns a message with the number of words without word times (if any)
+def importWordTimesStage(input_file_name, toolbox_file_name, output_file_name, reference_tier_name, text_tier_name, error_report_file_name):
+    word_time_errors = import_word_times(input_file_name, toolbox_file_name, output_file_name, reference_tier_name, text_tier_name, error_report_file_name=error_report_file_name)
+
+    if len(word_time_errors) > 0:
+        return "%d words without word times (see %s)" % (len(word_time_errors), os.path.basename(error_report_file_name))
+
+    return ""
+
+
+# Function to run all stages of the pipeline for a single recording
+# Arguments:
+# 1. The base name of the recording
+# 2. The dictionary of files of the recording as created by findRecordings
+# 3. A dictionary of options (see batch_align)
+# returns a list of tuples (stage, status, message) with status ok, unchanged, failed or skipped
+def processRecording(base_name, files, options):
+
+    results = []
+
+    output_directory = options["output_directory"]
+
+    log_file = codecs.open(os.path.join(output_directory, base_name + ".log"), "w", "utf-8")
+
+    # Function to mark all remaining stages as skipped
+    def skipStages(stages, message):
+        for stage in stages:
+            results.append((stage, "skipped", message))
+            log_file.write("Stage %s skipped: %s\n" % (stage, message))
+
+    # Function to run a stage unless its input files and options have not changed
+    # since its last successful run (recorded in a manifest file next to the output files)
+    # The arguments of the stage function are recorded as its options.
+    def runChangedStage(stage, input_file_names, output_file_names, function, *args, **kwargs):
+        manifest_file_name = os.path.join(output_directory, base_name + "." + stage + ".manifest.json")
+
+        previous_manifest = readManifest(manifest_file_name)
+        manifest = makeManifest(stage, input_file_names, output_file_names, {"arguments": list(args), "keywords": kwargs}, previous_manifest)
+
+        if not options["force"] and isUpToDate(previous_manifest, manifest):
+            results.append((stage, "unchanged", previous_manifest.get("message", "")))
+            log_file.write("Stage %s unchanged: inputs and options are the same as in the last run\n" % stage)
+            return True
+
+        # The old manifest is no longer valid, even if the stage fails
+        if previous_manifest is not None or os.path.exists(manifest_file_name):
+            os.remove(manifest_file_name)
+
+        if not runStage(results, stage, log_file, function, *args, **kwargs):
+            return False
+
+        writeManifest(manifest_file_name, manifest, results[-1][2])
+        return True
+
+    # Exactly one file of each kind may belong to a recording
+    for (kind, file_names) in sorted(files.items()):
+        if len(file_names) > 1:
+            message = "Found more than one %s file: %s" % (kind, ", ".join(file_names))
+            skipStages(STAGES, message)
+            log_file.close()
+            return results
+
+    wave_file_name = files.get("wave", [None])[0]
+    toolbox_file_name = files.get("toolbox", [None])[0]
+    mau_file_name = files.get("mau", [None])[0]
+    eaf_file_name = files.get("eaf", [None])[0]
+
+    # Determine the sample rate
+    sample_rate = options["sample_rate"]
+    channels = 1
+    bit_depth = 2
+
+    if wave_file_name is not None:
+        try:
+            (sample_rate, channels, bit_depth) = getWaveProperties(wave_file_name, options["wave_index_file_name"])
+        except Exception as error:
+            skipStages(STAGES, "Could not read wave file %s: %s" % (wave_file_name, error))
+            log_file.close()
+            return results
+
+    if sample_rate is None:
+        skipStages(STAGES, "Found no wave file and no sample rate was specified")
+        log_file.close()
+        return results
+
+    # 1. Create the BAS Partitur file from the Toolbox file
+    if toolbox_file_name is not None:
+        par_file_name = os.path.join(output_directory, base_name + ".par")
+
+        if not runChangedStage("Toolbox2BASPartitur",
+                               {"toolbox": toolbox_file_name, "transliteration": options["transliteration_file_name"]},
+                               [par_file_name],
+                               toolbox_to_partitur,
+                               toolbox_file_name, par_file_name, options["transliteration_file_name"],
+                               options["transcription_tier_name"], options["reference_tier_name"],
+                               sample_rate=sample_rate,
+                               channels=channels,
+                               bit_depth=bit_depth,
+                               wave_file_name=wave_file_name,
+                               start_time_marker=options["start_time_marker"],
+                               end_time_marker=options["end_time_marker"],
+                               input_encoding=options["toolbox_encoding"],
+                               output_encoding=options["partitur_encoding"],
+                               transliteration_encoding=options["transliteration_encoding"],
+                               debug_level=1):
+            skipStages(STAGES[1:], "Toolbox2BASPartitur failed")
+            log_file.close()
+            return results
+
+    # Use an existing BAS Partitur file if there is no Toolbox file
+    else:
+        par_file_name = files["par"][0]
+        skipStages(STAGES[:1], "No Toolbox file, using %s" % par_file_name)
+
+    # The remaining stages need the result of the automatic alignment
+    if mau_file_name is None:
+        skipStages(STAGES[1:], "No MAU file (automatic alignment not performed yet)")
+        log_file.close()
+        return results
+
+    # 2. Add utterance and word times to the Toolbox file
+    toolbox_output_file_name = os.path.join(output_directory, base_name + options["toolbox_extension"])
+
+    if options["start_time_marker"] is not None and options["end_time_marker"] is not None:
+        utterance_tier_names = {"utterance_start_tier_name": options["start_time_marker"],
+                                "utterance_end_tier_name": options["end_time_marker"]}
+    else:
+        utterance_tier_names = {}
+
+    toolbox_ok = runChangedStage("MAU2Toolbox",
+                                 {"mau": mau_file_name, "par": par_file_name, "toolbox": toolbox_file_name},
+                                 [toolbox_output_file_name],
+                                 mau_to_toolbox,
+                                 mau_file_name, par_file_name, toolbox_output_file_name, sample_rate,
+                                 original_toolbox_file_name=toolbox_file_name,
+                                 input_encoding=options["partitur_encoding"],
+                                 original_encoding=options["partitur_encoding"],
+                                 toolbox_encoding=options["toolbox_encoding"],
+                                 output_encoding=options["toolbox_encoding"],
+                                 output_word_times=True,
+                                 keep_utterance_times=options["keep_utterance_times"],
+                                 reference_tier_name=options["reference_tier_name"],
+                                 text_tier_name=options["transcription_tier_name"],
+                                 debug_level=1,
+                                 **utterance_tier_names)
+
+    # 3. Create a Praat TextGrid file
+    textgrid_file_name = os.path.join(output_directory, base_name + ".TextGrid")
+
+    runChangedStage("MAU2TextGrid",
+                    {"mau": mau_file_name, "par": par_file_name},
+                    [textgrid_file_name],
+                    mau_to_textgrid,
+                    mau_file_name, par_file_name, textgrid_file_name, sample_rate,
+                    input_encoding=options["partitur_encoding"],
+                    original_encoding=options["partitur_encoding"],
+                    output_encoding=options["partitur_encoding"],
+                    debug_level=1)
+
+    # 4. and 5. Set the word times in the ELAN file
+    if eaf_file_name is None:
+        skipStages(STAGES[3:], "No ELAN file (Toolbox file not imported into ELAN yet)")
+
+    elif not toolbox_ok:
+        skipStages(STAGES[3:], "MAU2Toolbox failed")
+
+    else:
+        flexibilized_file_name = os.path.join(output_directory, base_name + ".flexibilized.eaf")
+        word_times_file_name = os.path.join(output_directory, base_name + ".wordtimes.eaf")
+        word_time_errors_file_name = os.path.join(output_directory, base_name + ".wordtimes_errors.tsv")
+
+        if runChangedStage("flexibilize", {"eaf": eaf_file_name}, [flexibilized_file_name],
+                           flexibilize_elan, eaf_file_name, flexibilized_file_name):
+            runChangedStage("import_wordtimes",
+                            {"eaf": flexibilized_file_name, "toolbox": toolbox_output_file_name},
+                            [word_times_file_name, word_time_errors_file_name],
+                            importWordTimesStage,
+                            flexibilized_file_name, toolbox_output_file_name,
+                            word_times_file_name,
+                            options["reference_tier_name"], options["transcription_tier_name"],
+                            word_time_errors_file_name)
+
+        else:
+            skipStages(STAGES[4:], "flexibilize failed")
+
+    log_file.close()
+
+    return results
+
+
+# Function to process recordings in parallel worker processes
+# Arguments:
+# 1. A dictionary from base names to dictionaries of files as created by findRecordings
+# 2. A dictionary of options (see batch_align)
+# 3. The number of worker processes (None for the number of CPUs)
+# 4. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a dictionary from base names to lists of results as created by processRecording
+def processRecordings(recordings, options, jobs=None, debug_level=0):
+
+    results = {}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+
+        futures = dict((executor.submit(processRecording, base_name, files, options), base_name)
+                       for (base_name, files) in recordings.items())
+
+        for future in concurrent.futures.as_completed(futures):
+            base_name = futures[future]
+
+            try:
+                results[base_name] = future.result()
+
+            # The worker process itself may have crashed
+            except Exception as error:
+                results[base_name] = [("all", "failed", "%s: %s" % (type(error).__name__, error))]
+
+            # Print status message
+            if debug_level == 1:
+                failed = [stage for (stage, status, message) in results[base_name] if status == "failed"]
+                if failed:
+                    print("Failed:", base_name, "(" + ", ".join(failed) + ")")
+                else:
+                    print("Done:", base_name)
+
+    return results
+
+
+# Function to align the recordings that do not have a MAU file yet
+# Arguments:
+# 1. A dictionary from base names to dictionaries of files as created by findRecordings
+#    (the MAU files created are added to it)
+# 2. A dictionary from base names to lists of results as created by processRecording
+# 3. A dictionary of options (see batch_align)
+# 4. The aligner
+# 5. The maximal number of alignments running at the same time
+# 6. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a dictionary from base names to pairs (status, message) with status aligned, cached or failed
+def alignRecordings(recordings, results, options, aligner, align_jobs=4, debug_level=0):
+
+    output_directory = options["output_directory"]
+
+    alignments = []
+
+    for (base_name, files) in sorted(recordings.items()):
+
+        if "mau" in files or "wave" not in files or len(files["wave"]) > 1:
+            continue
+
+        # The BAS Partitur file must have been created without errors
+        if any(status == "failed" for (stage, status, message) in results.get(base_name, [])):
+            continue
+
+        if "toolbox" in files:
+            par_file_name = os.path.join(output_directory, base_name + ".par")
+        else:
+            par_file_name = files["par"][0]
+
+        if not os.path.isfile(par_file_name):
+            continue
+
+        alignments.append((base_name, (par_file_name, files["wave"][0], os.path.join(output_directory, base_name + ".mau"))))
+
+    # Print status message
+    if debug_level == 1:
+        print("Aligning", len(alignments), "recordings without MAU file")
+
+    if len(alignments) == 0:
+        return {}
+
+    alignment_results = align_files([alignment for (base_name, alignment) in alignments], aligner,
+                                    concurrency=align_jobs,
+                                    cache_directory=os.path.join(output_directory, "align_cache"),
+                                    debug_level=debug_level)
+
+    aligned = {}
+
+    for ((base_name, alignment), (par_file_name, status, message)) in zip(alignments, alignment_results):
+
+        aligned[base_name] = (status, message)
+
+        if status != "failed":
+            recordings[base_name]["mau"] = [alignment[2]]
+
+    return aligned
+
+
+# Function to write the report of a batch run
+# Arguments:
+# 1. The name of the report file
+# 2. A dictionary from base names to lists of results as created by processRecording
+def writeReport(report_file_name, results):
+
+    report_file = codecs.open(report_file_name, "w", "utf-8")
+
+    writer = csv.writer(report_file, delimiter="\t", lineterminator="\n")
+    writer.writerow(["recording", "stage", "status", "message"])
+
+    for base_name in sorted(results):
+        for (stage, status, message) in results[base_name]:
+            writer.writerow([base_name, stage, status, message])
+
+    report_file.close()
+
+
+# Function to run the pipeline over all recordings in a directory tree
+# Arguments:
+# 1. The directory containing the wave, Toolbox, MAU and ELAN files
+# 2. The directory for the output files (created if necessary)
+# 3. The name of the transliteration table file
+# 4. The name of the transcription tier (defaults to t)
+# 5. The name of the reference tier (defaults to ref)
+# 6. The number of worker processes (defaults to the number of CPUs)
+# 7. The name of the report file (defaults to batch_report.tsv in the output directory)
+# 8. The names of the Toolbox tiers with utterance start and end times
+#    (if given, they are used to constrain the automatic alignment)
+# 9. Whether to keep the original utterance times in the Toolbox file
+# 10. The sample rate to be used if a recording has no wave file
+# 11. The file name extension of Toolbox files (defaults to .txt)
+# 12. The encodings of the Toolbox files, the BAS Partitur files and the transliteration table
+# 13. debug level (0 --> no status messages, 1 --> print status messages)
+# 14. Whether to run all stages even if their inputs and options have not changed
+#     since the last run (defaults to False)
+# 15. The aligner for the recordings without MAU file (defaults to None, i.e. they are not aligned)
+# 16. The maximal number of alignments running at the same time (defaults to 4)
+# returns a dictionary from base names to lists of results as created by processRecording
+def batch_align(input_directory, output_directory, transliteration_file_name, transcription_tier_name="t", reference_tier_name="ref", jobs=None, report_file_name=None, start_time_marker=None, end_time_marker=None, keep_utterance_times=False, sample_rate=None, toolbox_extension=".txt", toolbox_encoding="utf-8", partitur_encoding="utf-8", transliteration_encoding="utf-8", debug_level=0, force=False, aligner=None, align_jobs=4):
+
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+
+    if report_file_name is None:
+        report_file_name = os.path.join(output_directory, "batch_report.tsv")
+
+    options = {"output_directory": output_directory,
+               "transliteration_file_name": transliteration_file_name,
+               "transcription_tier_name": transcription_tier_name,
+               "reference_tier_name": reference_tier_name,
+               "start_time_marker": start_time_marker,
+               "end_time_marker": end_time_marker,
+               "keep_utterance_times": keep_utterance_times,
+               "sample_rate": sample_rate,
+               "toolbox_extension": toolbox_extension,
+               "toolbox_encoding": toolbox_encoding,
+               "partitur_encoding": partitur_encoding,
+               "transliteration_encoding": transliteration_encoding,
+               "wave_index_file_name": os.path.join(output_directory, "wave_index.tsv"),
+               "force": force}
+
+    # Find all recordings
+    recordings = findRecordings(input_directory, toolbox_extension, output_directory)
+
+    # Print status message
+    if debug_level == 1:
+        print("Found", len(recordings), "recordings in", input_directory)
+
+    results = processRecordings(recordings, options, jobs, debug_level)
+
+    # Align the recordings without MAU file and run the remaining stages again
+    # (the BAS Partitur files are not created again, as they have not changed)
+    if aligner is not None:
+
+        aligned = alignRecordings(recordings, results, options, aligner, align_jobs, debug_level)
+
+        realigned_results = processRecordings(dict((base_name, recordings[base_name]) for base_name in aligned
+                                                   if aligned[base_name][0] != "failed"), options, jobs, debug_level)
+
+        # Keep the result of creating the BAS Partitur file from the first run
+        for (base_name, (status, message)) in aligned.items():
+            results[base_name] = results[base_name][:1] + [("align", status, message)] + realigned_results.get(base_name, results[base_name])[1:]
+
+    # Write the report
+    writeReport(report_file_name, results)
+
+    # Print status message
+    if debug_level == 1:
+        num_failed = len([base_name for base_name in results
+                          if any(status == "failed" for (stage, status, message) in results[base_name])])
+        print(len(results) - num_failed, "recordings processed successfully,", num_failed, "with errors.")
+        print("Report written to", report_file_name)
+
+    return results
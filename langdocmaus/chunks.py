@@ -0,0 +1,415 @@
+# encoding=utf-8
+
+# Functions for aligning a long recording in chunks of utterances
+#
+# Toolbox2BASPartitur.py can split a recording with known utterance start
+# and end times into chunks of a fixed number of utterances. Every chunk gets
+# its own BAS Partitur file (with the words numbered from 0 and the TRN tier
+# relative to the start of the chunk) and its own excerpt of the wave file,
+# so that the chunks can be aligned independently and in parallel.
+# The chunks are listed in a chunk list file, which is used to merge the MAU
+# tiers of the aligned chunks back into a single MAU tier on the timeline of
+# the whole recording with the word ids of the BAS Partitur file of the whole recording.
+#
+# Toolbox2BASPartitur.py -incremental also writes a chunk for each record that is new
+# or has changed since the last run. The MAU tiers of these chunks can be merged into
+# the MAU tier of the previous alignment, so that only these records have to be aligned again.
+
+# Codecs for handling character encodings
+import codecs
+
+# Module to check files and paths
+import os.path
+
+import sys
+
+# Functions for reading BAS Partitur files
+from langdocmaus.partitur import KNOWN_TIERS
+from langdocmaus.partitur import iterBASPartiturFile
+
+
+# Header lines of the chunk MAU files that do not apply to the merged MAU file
+CHUNK_HEADER_LINES = ("SRC", "BEG", "END")
+
+
+# Function to determine the name of a file belonging to a chunk
+# Arguments:
+# 1. The name of the BAS Partitur file of the whole recording
+# 2. The number of the chunk (starting with 1)
+# 3. The extension of the file (e.g. ".par", ".wav" or ".mau")
+# returns the file name
+def getChunkFileName(output_file_name, chunk_number, extension):
+
+    return "%s.chunk%03d%s" % (os.path.splitext(output_file_name)[0], chunk_number, extension)
+
+
+# Function to determine the name of the chunk list file
+# Arguments:
+# 1. The name of the BAS Partitur file of the whole recording
+# returns the file name
+def getChunkListFileName(output_file_name):
+
+    return os.path.splitext(output_file_name)[0] + ".chunks.tsv"
+
+
+# Function to write a chunk list file
+# Arguments:
+# 1. The name of the chunk list file
+# 2. A list of chunks as dictionaries with the keys "par", "wave" and "mau"
+#    (the names of the chunk files), "start_sample" and "end_sample" (the part of the
+#    whole recording) and "word_ids" (the word ids of the words in the chunk
+#    in the BAS Partitur file of the whole recording)
+def writeChunkList(chunk_list_file_name, chunks):
+
+    chunk_list_file = codecs.open(chunk_list_file_name, "w", "utf-8")
+
+    print("chunk\tpar\twave\tmau\tstart_sample\tend_sample\tword_ids", file=chunk_list_file)
+
+    # The chunk files are given relative to the chunk list file
+    for (chunk_number, chunk) in enumerate(chunks, 1):
+        print("\t".join([str(chunk_number)] + [os.path.basename(chunk[key]) for key in ("par", "wave", "mau")] + [str(chunk["start_sample"]), str(chunk["end_sample"]), ",".join(str(word_id) for word_id in chunk["word_ids"])]), file=chunk_list_file)
+
+    chunk_list_file.close()
+
+
+# Function to read in a chunk list file written by writeChunkList
+# Arguments:
+# 1. The name of the chunk list file
+# returns a list of chunks as described for writeChunkList
+# (with the names of the chunk files including the directory of the chunk list file)
+def readChunkList(chunk_list_file_name):
+
+    if not os.path.isfile(chunk_list_file_name):
+        print("Cannot find the chunk list file you specified:", chunk_list_file_name)
+        sys.exit()
+
+    chunk_directory = os.path.dirname(chunk_list_file_name)
+
+    chunks = []
+
+    chunk_list_file = codecs.open(chunk_list_file_name, "r", "utf-8")
+
+    # Skip the header
+    chunk_list_file.readline()
+
+    line_number = 1
+
+    for line in chunk_list_file:
+
+        line_number += 1
+
+        fields = line.rstrip("\r\n").split("\t")
+
+        if len(fields) != 7:
+            print("Found a line that does not contain 7 fields (chunk, par, wave, mau, start_sample, end_sample, word_ids) in the chunk list file in line:", line_number)
+            sys.exit()
+
+        chunk = {"par": os.path.join(chunk_directory, fields[1]),
+                 "wave": os.path.join(chunk_directory, fields[2]),
+                 "mau": os.path.join(chunk_directory, fields[3])}
+
+        try:
+            chunk["start_sample"] = int(fields[4])
+            chunk["end_sample"] = int(fields[5])
+            chunk["word_ids"] = [word_id for word_id in fields[6].split(",") if word_id != ""]
+
+        except ValueError:
+            print("Could not convert the start or end sample of the chunk in line", line_number, "of the chunk list file.")
+            sys.exit()
+
+        chunks.append(chunk)
+
+    chunk_list_file.close()
+
+    return chunks
+
+
+# Function to read in a record map file written by writeRecordMap
+# Arguments:
+# 1. the name of the record map file
+# returns a dictionary from pairs (record id, occurrence of the record id) to
+# dictionaries with the keys "first_word_id", "word_ids" (the number of words
+# of the record), "fingerprint" and "previous_first_word_id" (the first word id
+# of the record in the run before, None if the record is new or has changed since)
+def readRecordMap(file_name):
+
+    record_map = {}
+
+    # There is nothing to read before the first run
+    if not os.path.exists(file_name):
+        return record_map
+
+    record_map_file = codecs.open(file_name, "r", "utf-8")
+
+    # Skip the header
+    record_map_file.readline()
+
+    for line in record_map_file:
+
+        fields = line.rstrip("\r\n").split("\t")
+
+        # Record maps of older versions do not contain the previous word ids
+        if len(fields) == 5:
+            fields.append("")
+
+        (record_id, occurrence, first_word_id, word_ids, fingerprint, previous_first_word_id) = fields
+
+        if previous_first_word_id == "":
+            previous_first_word_id = None
+        else:
+            previous_first_word_id = int(previous_first_word_id)
+
+        record_map[(record_id, int(occurrence))] = {"first_word_id": int(first_word_id), "word_ids": int(word_ids), "fingerprint": fingerprint, "previous_first_word_id": previous_first_word_id}
+
+    record_map_file.close()
+
+    return record_map
+
+
+# Function to write a record map file
+# Arguments:
+# 1. the name of the record map file
+# 2. the record map as produced by langdocmaus.toolbox2partitur.compareRecords
+def writeRecordMap(file_name, record_map):
+
+    record_map_file = codecs.open(file_name, "w", "utf-8")
+
+    print("record\toccurrence\tfirst_word_id\tword_ids\tfingerprint\tprevious_first_word_id", file=record_map_file)
+
+    for ((record_id, occurrence), record) in sorted(record_map.items(), key=lambda item: item[1]["first_word_id"]):
+
+        if record["previous_first_word_id"] is None:
+            previous_first_word_id = ""
+        else:
+            previous_first_word_id = str(record["previous_first_word_id"])
+
+        print("\t".join([record_id, str(occurrence), str(record["first_word_id"]), str(record["word_ids"]), record["fingerprint"], previous_first_word_id]), file=record_map_file)
+
+    record_map_file.close()
+
+
+# Function to go through the MAU tier of an aligned chunk
+# with the times and word ids of the whole recording
+# Arguments:
+# 1. The chunk as read in by readChunkList
+# 2. The character encoding of the chunk MAU file
+# yields pairs (tier_name, entry) as produced by iterBASPartiturFile, for the MAU tier
+# with the entries as tuples (start, duration, word_id, phoneme) and start and duration as integers
+def iterChunkMAUTier(chunk, input_encoding):
+
+    for (tier_name, entry) in iterBASPartiturFile(chunk["mau"], input_encoding):
+
+        if tier_name != "MAU":
+            yield (tier_name, entry)
+            continue
+
+        (start, duration, word_id, phoneme) = entry
+
+        # Pauses do not belong to any word
+        if word_id != "-1":
+
+            try:
+                word_id = chunk["word_ids"][int(word_id)]
+
+            except (ValueError, IndexError):
+                print("Found an unknown word id", word_id, "in the MAU tier of chunk", chunk["mau"])
+                sys.exit()
+
+        try:
+            start = int(start) + chunk["start_sample"]
+            duration = int(duration)
+
+        except ValueError:
+            print("Could not convert the start time or duration", start, duration, "in the MAU tier of chunk", chunk["mau"])
+            sys.exit()
+
+        yield ("MAU", (start, duration, word_id, phoneme))
+
+
+# Function to read in the MAU tier of the previous alignment of a recording
+# for the records that have not changed since (see Toolbox2BASPartitur -incremental)
+# Arguments:
+# 1. The name of the BAS Partitur file with the MAU tier of the previous alignment
+# 2. The name of the record map file written by Toolbox2BASPartitur
+# 3. The character encoding of the previous MAU file
+# returns a tuple (header, segments, end sample) with the header lines of the previous
+# MAU file as pairs (tier_name, entry), the segments of the words of the unchanged records
+# as tuples (start, duration, word_id, phoneme) with their new word ids
+# and the sample after the last segment of the previous MAU tier
+def readPreviousMAUTier(previous_file_name, record_map_file_name, input_encoding):
+
+    if not os.path.isfile(record_map_file_name):
+        print("Cannot find the record map file:", record_map_file_name)
+        sys.exit()
+
+    # Map the previous word ids of the unchanged records to their current word ids
+    # (only records that have not changed since the previous run have a previous word id)
+    word_id_map = {}
+
+    for record in readRecordMap(record_map_file_name).values():
+
+        if record["previous_first_word_id"] is None:
+            continue
+
+        for index in range(record["word_ids"]):
+            word_id_map[str(record["previous_first_word_id"] + index)] = str(record["first_word_id"] + index)
+
+    header = []
+    segments = []
+    end_sample = 0
+
+    for (tier_name, entry) in iterBASPartiturFile(previous_file_name, input_encoding):
+
+        if tier_name not in KNOWN_TIERS:
+            header.append((tier_name, entry))
+            continue
+
+        if tier_name != "MAU":
+            continue
+
+        (start, duration, word_id, phoneme) = entry
+
+        try:
+            (start, duration) = (int(start), int(duration))
+
+        except ValueError:
+            print("Could not convert the start time or duration", start, duration, "in the MAU tier of", previous_file_name)
+            sys.exit()
+
+        end_sample = max(end_sample, start + duration + 1)
+
+        # Pauses are filled in again around the segments that are kept
+        if word_id in word_id_map:
+            segments.append((start, duration, word_id_map[word_id], phoneme))
+
+    return (header, segments, end_sample)
+
+
+# Function to merge the MAU tiers of the aligned chunks into a single BAS Partitur file
+# with the MAU tier on the timeline of the whole recording, which can be used
+# like the result of aligning the BAS Partitur file of the whole recording
+# If the MAU file of a previous alignment of the recording is given, the chunks are
+# the records that are new or have changed since (see Toolbox2BASPartitur -incremental)
+# and the words of all other records are taken over from the previous MAU tier.
+# Arguments:
+# 1. The name of the chunk list file written by Toolbox2BASPartitur
+# 2. The name of the output BAS Partitur file with MAU tier
+# 3. The character encoding of the chunk MAU files (defaults to utf-8)
+# 4. The character encoding of the output file (defaults to utf-8)
+# 5. debug level (0 --> no status messages, 1 --> print status messages)
+# 6. The name of the BAS Partitur file with the MAU tier of the previous alignment
+#    (defaults to None, i.e. the chunks cover the whole recording)
+# 7. The name of the record map file written by Toolbox2BASPartitur -incremental
+#    (only used with the previous MAU file)
+# 8. The number of samples of the whole recording, the part after the last chunk is marked
+#    as a pause (defaults to None, i.e. the end of the previous MAU tier or of the last chunk)
+# returns the number of chunks merged
+def merge_chunks(chunk_list_file_name, output_file_name, input_encoding="utf-8", output_encoding="utf-8", debug_level=0, previous_file_name=None, record_map_file_name=None, end_sample=None):
+
+    chunks = readChunkList(chunk_list_file_name)
+
+    # Safety check
+    for chunk in chunks:
+
+        if not os.path.isfile(chunk["mau"]):
+            print("Cannot find the MAU file of chunk", chunk["par"] + ":", chunk["mau"])
+            sys.exit()
+
+        if os.path.abspath(chunk["mau"]) == os.path.abspath(output_file_name):
+            print("Input and output file name are the same. Cannot overwrite input file.")
+            sys.exit()
+
+    # Read in the previous alignment before the output file is written
+    # (the output file may be the previous MAU file)
+    if previous_file_name is not None:
+
+        if not os.path.isfile(previous_file_name):
+            print("Cannot find the MAU file of the previous alignment:", previous_file_name)
+            sys.exit()
+
+        (header, previous_segments, previous_end_sample) = readPreviousMAUTier(previous_file_name, record_map_file_name, input_encoding)
+
+        if end_sample is None:
+            end_sample = previous_end_sample
+
+        # Print status message
+        if debug_level == 1:
+            print("Keeping", len(previous_segments), "segments of unchanged records from", previous_file_name)
+
+    output_file = codecs.open(output_file_name, "w", output_encoding)
+
+    # Copy the header of the previous alignment
+    if previous_file_name is not None:
+
+        for (tier_name, entry) in header:
+            print((tier_name + ": " + entry).rstrip(), file=output_file)
+
+        segments = list(previous_segments)
+
+    # The sample after the last segment merged so far
+    next_sample = 0
+
+    for (chunk_number, chunk) in enumerate(chunks, 1):
+
+        # Print status message
+        if debug_level == 1:
+            print("Merging the MAU tier of chunk", chunk_number, "from", chunk["mau"])
+
+        first_segment = True
+
+        for (tier_name, entry) in iterChunkMAUTier(chunk, input_encoding):
+
+            # Copy the header of the first chunk
+            if tier_name not in KNOWN_TIERS:
+
+                if chunk_number == 1 and previous_file_name is None and tier_name not in CHUNK_HEADER_LINES:
+                    print((tier_name + ": " + entry).rstrip(), file=output_file)
+
+                continue
+
+            if tier_name != "MAU":
+                continue
+
+            # The segments are sorted together with those of the previous alignment below
+            if previous_file_name is not None:
+                segments.append(entry)
+                continue
+
+            (start, duration, word_id, phoneme) = entry
+
+            # Mark the parts of the recording before and between the chunks as pauses
+            # (like the alignment of the whole recording does)
+            if first_segment and start > next_sample:
+                print("MAU:", next_sample, start - next_sample - 1, "-1", "<p:>", file=output_file)
+
+            first_segment = False
+            next_sample = max(next_sample, start + duration + 1)
+
+            print("MAU:", start, duration, word_id, phoneme, file=output_file)
+
+    # Write the segments of the previous alignment and the chunks in the order of time
+    # and mark all parts of the recording between them as pauses
+    if previous_file_name is not None:
+
+        segments.sort(key=lambda segment: segment[0])
+
+        for (start, duration, word_id, phoneme) in segments:
+
+            if start > next_sample:
+                print("MAU:", next_sample, start - next_sample - 1, "-1", "<p:>", file=output_file)
+
+            next_sample = max(next_sample, start + duration + 1)
+
+            print("MAU:", start, duration, word_id, phoneme, file=output_file)
+
+    # Mark the rest of the recording as a pause
+    if end_sample is not None and end_sample > next_sample:
+        print("MAU:", next_sample, end_sample - next_sample - 1, "-1", "<p:>", file=output_file)
+
+    output_file.close()
+
+    # Print status message
+    if debug_level == 1:
+        print("Merged the MAU tiers of", len(chunks), "chunks into", output_file_name)
+
+    return len(chunks)
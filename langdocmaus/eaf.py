@@ -0,0 +1,583 @@
+# encoding=utf-8
+
+# Functions for reading and writing ELAN (.eaf) files
+#
+# ELAN files are parsed incrementally. Only the time order, the linguistic types,
+# the tier headers and the annotations of the tiers that are actually processed
+# are kept in memory. When the file is written, these parts are written from memory
+# and everything else is copied element by element from the input file, so that
+# neither the whole document tree nor the whole output is ever held in memory.
+# The output is written to a temporary file that only replaces the output file
+# once it is complete, so that the input file is never overwritten while it is read.
+#
+# Comments and processing instructions outside the root element, between the
+# elements below the root element and inside copied elements are kept. Those
+# inside the time order and inside the tiers that have been read in are dropped,
+# since these parts are written from memory.
+#
+# The classes provide the same methods as the corresponding classes of the
+# Python ELAN API (https://github.com/janstrunk/Python-Elan-API/) as far as
+# they are needed by langdocmaus.flexibilize and langdocmaus.wordtimes.
+
+# Codecs for handling character encodings
+import codecs
+
+# Renaming of the finished output file and comparison of file names
+import os
+
+# Incremental XML parsing
+import xml.etree.ElementTree as ElementTree
+
+# Fast scanning of XML files without building a document tree
+import xml.parsers.expat
+
+# Escaping of XML text and attribute values
+from xml.sax.saxutils import escape
+
+# Indentation of the elements of an ELAN file
+ELAN_INDENT = "    "
+
+# Format of an annotation in a tier
+# (annotation type, attributes, annotation value, annotation type)
+ANNOTATION_FORMAT = ELAN_INDENT * 2 + "<ANNOTATION>\n" \
+    + ELAN_INDENT * 3 + "<%s%s>\n" \
+    + ELAN_INDENT * 4 + "<ANNOTATION_VALUE>%s</ANNOTATION_VALUE>\n" \
+    + ELAN_INDENT * 3 + "</%s>\n" \
+    + ELAN_INDENT * 2 + "</ANNOTATION>\n"
+
+
+# A time slot of an ELAN file
+class ELANTimeSlot:
+
+    def __init__(self, time_slot_id, time_value=None):
+        self.time_slot_id = time_slot_id
+        self.time_value = time_value
+
+    def get_id(self):
+        return self.time_slot_id
+
+    def get_time_value(self):
+        return self.time_value
+
+    def set_time_value(self, time_value):
+        self.time_value = time_value
+
+
+# The time order of an ELAN file (a list of time slots)
+class ELANTimeOrder:
+
+    def __init__(self, elan_file=None):
+        self.elan_file = elan_file
+        self.time_slots = []
+        self.time_slots_by_id = {}
+
+    def add_time_slot(self, time_slot):
+        self.time_slots.append(time_slot)
+        self.time_slots_by_id[time_slot.get_id()] = time_slot
+
+    def get_time_slot_by_id(self, time_slot_id):
+        return self.time_slots_by_id.get(time_slot_id)
+
+    def __len__(self):
+        return len(self.time_slots)
+
+    def __iter__(self):
+        return iter(self.time_slots)
+
+
+# A linguistic type of an ELAN file
+class ELANLinguisticType:
+
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    def get_linguistic_type_id(self):
+        return self.attributes.get("LINGUISTIC_TYPE_ID")
+
+    def get_constraints(self):
+        return self.attributes.get("CONSTRAINTS")
+
+    def is_time_alignable(self):
+        return self.attributes.get("TIME_ALIGNABLE") == "true"
+
+
+# An annotation of an ELAN file (alignable or reference annotation)
+# The attributes are kept in the order of the input file.
+class ELANAnnotation:
+
+    def __init__(self, elan_file, annotation_type, attributes, annotation_value):
+        self.elan_file = elan_file
+        self.annotation_type = annotation_type
+        self.attributes = attributes
+        self.annotation_value = annotation_value
+
+    def get_annotation_id(self):
+        return self.attributes.get("ANNOTATION_ID")
+
+    def get_annotation_value(self):
+        return self.annotation_value
+
+    def set_annotation_value(self, annotation_value):
+        self.annotation_value = annotation_value
+
+    def get_start_time_slot(self):
+        return self.attributes.get("TIME_SLOT_REF1")
+
+    def get_end_time_slot(self):
+        return self.attributes.get("TIME_SLOT_REF2")
+
+    def set_start_time_slot(self, time_slot_id):
+        self.attributes["TIME_SLOT_REF1"] = time_slot_id
+
+    def set_end_time_slot(self, time_slot_id):
+        self.attributes["TIME_SLOT_REF2"] = time_slot_id
+
+    # The times are looked up in the current time order of the ELAN file
+    # (None for unaligned time slots and reference annotations)
+    def get_start_time(self):
+        return self.elan_file.get_time_value(self.get_start_time_slot())
+
+    def get_end_time(self):
+        return self.elan_file.get_time_value(self.get_end_time_slot())
+
+
+# A tier of an ELAN file
+# The annotations are only read in for the tiers selected when reading the file.
+class ELANTier:
+
+    def __init__(self, attributes):
+        self.attributes = attributes
+        self.annotations = []
+        self.loaded = False
+
+    def get_tier_id(self):
+        return self.attributes.get("TIER_ID")
+
+    def get_linguistic_type(self):
+        return self.attributes.get("LINGUISTIC_TYPE_REF")
+
+    def get_parent_tier_ref(self):
+        return self.attributes.get("PARENT_REF")
+
+    def get_annotations(self):
+        return self.annotations
+
+    def is_loaded(self):
+        return self.loaded
+
+    def __iter__(self):
+        return iter(self.annotations)
+
+
+# An ELAN file as read in by readELANFile
+class ELANFile:
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.time_order = ELANTimeOrder(self)
+        self.linguistic_types = []
+        self.tiers = []
+        self.tiers_by_id = {}
+        self.annotations_by_id = {}
+
+    def get_file_name(self):
+        return self.file_name
+
+    def get_time_order(self):
+        return self.time_order
+
+    def set_time_order(self, time_order):
+        self.time_order = time_order
+
+    def get_time_value(self, time_slot_id):
+        time_slot = self.time_order.get_time_slot_by_id(time_slot_id)
+
+        if time_slot is None:
+            return None
+
+        return time_slot.get_time_value()
+
+    def get_linguistic_types(self):
+        return self.linguistic_types
+
+    def get_tiers(self):
+        return self.tiers
+
+    def get_tier_by_id(self, tier_id):
+        return self.tiers_by_id.get(tier_id)
+
+    def get_annotation_by_id(self, annotation_id):
+        return self.annotations_by_id.get(annotation_id)
+
+
+# Function to go through the elements of an ELAN file incrementally
+# Only the elements up to a depth of 2 (e.g. the tiers and their annotations)
+# are reported, deeper elements can be accessed through them. Time slots, annotations
+# and the elements below the root element are removed from the document tree once
+# they have been processed, so that the document tree never grows beyond a single
+# time slot or annotation (or a single header element).
+# Arguments:
+# 1. The name of the ELAN file
+# 2. A dictionary to be filled with the namespace declarations (prefix to URI)
+#    of the file (defaults to None)
+# 3. Whether to keep comments and processing instructions (defaults to False)
+# yields tuples (event, depth, element) with event "start" or "end"
+# and the depth of the element (0 for the root element);
+# if comments are kept, comments and processing instructions outside the root
+# element, below the root element and directly inside the time order or a tier
+# are reported with the event "comment" or "pi", all others remain in the
+# document tree of the element that contains them
+def iterateELANFile(file_name, namespaces=None, keep_comments=False):
+
+    # Current depth and the open elements up to a depth of 2
+    depth = 0
+    open_elements = [None, None, None]
+
+    if keep_comments:
+        events = ("start", "end", "start-ns", "comment", "pi")
+        parser = ElementTree.XMLParser(target=ElementTree.TreeBuilder(insert_comments=True, insert_pis=True))
+    else:
+        events = ("start", "end", "start-ns")
+        parser = None
+
+    for (event, element) in ElementTree.iterparse(file_name, events=events, parser=parser):
+
+        if event == "start":
+
+            if depth <= 2:
+                open_elements[depth] = element
+                yield (event, depth, element)
+
+            depth += 1
+
+        elif event == "end":
+
+            depth -= 1
+
+            if depth <= 2:
+                yield (event, depth, element)
+
+                # Remove processed elements below the root element as well as
+                # processed time slots and annotations from the document tree
+                if depth == 1 or (depth == 2 and open_elements[1].tag in ("TIME_ORDER", "TIER")):
+                    open_elements[depth - 1].remove(element)
+
+        elif event in ("comment", "pi"):
+
+            if depth <= 1 or (depth == 2 and open_elements[1].tag in ("TIME_ORDER", "TIER")):
+                yield (event, depth, element)
+
+                # Comments outside the root element are not part of the document tree
+                if depth >= 1:
+                    open_elements[depth - 1].remove(element)
+
+        elif namespaces is not None:
+
+            (prefix, uri) = element
+            namespaces[prefix] = uri
+
+
+# Function to read in the annotations of an ELAN file
+# Arguments:
+# 1. The ELAN file as read in by readELANFile (the annotations are added to it)
+# 2. The ids of the tiers whose annotations are to be read in
+def readELANAnnotations(elan_file, tier_ids):
+
+    time_order = ELANTimeOrder(elan_file)
+
+    cur_tier = None
+
+    for (event, depth, element) in iterateELANFile(elan_file.get_file_name()):
+
+        # Tiers
+        if depth == 1 and element.tag == "TIER":
+
+            if event == "start" and element.get("TIER_ID") in tier_ids:
+                cur_tier = elan_file.get_tier_by_id(element.get("TIER_ID"))
+                cur_tier.loaded = True
+            else:
+                cur_tier = None
+
+        # Time slots
+        elif depth == 2 and event == "end" and element.tag == "TIME_SLOT":
+
+            time_value = element.get("TIME_VALUE")
+
+            if time_value is not None:
+                time_value = int(time_value)
+
+            time_order.add_time_slot(ELANTimeSlot(element.get("TIME_SLOT_ID"), time_value))
+
+        # Annotations of the selected tiers
+        elif depth == 2 and event == "end" and cur_tier is not None and element.tag == "ANNOTATION":
+
+            for annotation_element in element:
+
+                # Skip comments and processing instructions
+                if not isinstance(annotation_element.tag, str):
+                    continue
+
+                annotation_value = annotation_element.findtext("ANNOTATION_VALUE")
+
+                if annotation_value is None:
+                    annotation_value = ""
+
+                annotation = ELANAnnotation(elan_file, annotation_element.tag, dict(annotation_element.attrib), annotation_value)
+
+                cur_tier.annotations.append(annotation)
+                elan_file.annotations_by_id[annotation.get_annotation_id()] = annotation
+
+    elan_file.set_time_order(time_order)
+
+
+# Function to read in the linguistic types and the tiers (without annotations) of an ELAN file
+# (the file is only scanned, without building a document tree)
+# Arguments:
+# 1. The ELAN file (the linguistic types and tiers are added to it)
+def readELANTiers(elan_file):
+
+    def startElement(name, attributes):
+
+        if name == "TIER":
+
+            tier = ELANTier(attributes)
+
+            elan_file.tiers.append(tier)
+            elan_file.tiers_by_id[tier.get_tier_id()] = tier
+
+        elif name == "LINGUISTIC_TYPE":
+
+            elan_file.linguistic_types.append(ELANLinguisticType(attributes))
+
+    parser = xml.parsers.expat.ParserCreate()
+    parser.StartElementHandler = startElement
+
+    input_file = open(elan_file.get_file_name(), "rb")
+    parser.ParseFile(input_file)
+    input_file.close()
+
+
+# Function to read in an ELAN file
+# The file is read twice: first the linguistic types and tier headers,
+# then the time order and the annotations of the selected tiers.
+# Arguments:
+# 1. The name of the ELAN file
+# 2. A function that is given the ELAN file with the linguistic types and tiers
+#    and returns the ids of the tiers whose annotations are to be read in
+#    (defaults to None, i.e. all tiers)
+# returns the ELAN file
+def readELANFile(file_name, select_tiers=None):
+
+    elan_file = ELANFile(file_name)
+
+    readELANTiers(elan_file)
+
+    if select_tiers is None:
+        tier_ids = set(tier.get_tier_id() for tier in elan_file.get_tiers())
+    else:
+        tier_ids = set(select_tiers(elan_file))
+
+    readELANAnnotations(elan_file, tier_ids)
+
+    return elan_file
+
+
+# Function to format the name of an element or attribute
+# using the namespace prefixes of the ELAN file
+# Arguments:
+# 1. The name as given by ElementTree ({uri}name for names in a namespace)
+# 2. A dictionary from namespace URIs to prefixes
+def formatXMLName(name, prefixes):
+
+    if name.startswith("{"):
+        (uri, local_name) = name[1:].split("}", 1)
+
+        if prefixes.get(uri, "") != "":
+            return prefixes[uri] + ":" + local_name
+
+        return local_name
+
+    return name
+
+
+# Function to escape an attribute value
+# (most values, e.g. ids, do not contain any special characters)
+# Arguments:
+# 1. The attribute value
+def escapeXMLAttribute(value):
+
+    if "&" in value or "<" in value or ">" in value or "\"" in value:
+        return escape(value, {"\"": "&quot;"})
+
+    return value
+
+
+# Function to format the attributes of an element
+# Arguments:
+# 1. A dictionary of attributes
+# 2. A dictionary from namespace URIs to prefixes (defaults to None)
+# returns the attributes as a string (with a leading space if there are any)
+def formatXMLAttributes(attributes, prefixes=None):
+
+    if prefixes is None:
+        prefixes = {}
+
+    return "".join(" %s=\"%s\"" % (formatXMLName(name, prefixes), escapeXMLAttribute(value)) for (name, value) in attributes.items())
+
+
+# Function to write the time order of an ELAN file
+# Arguments:
+# 1. The output file
+# 2. The time order
+def writeELANTimeOrder(output_file, time_order):
+
+    output_file.write(ELAN_INDENT + "<TIME_ORDER>\n")
+
+    for time_slot in time_order:
+
+        if time_slot.get_time_value() is None:
+            output_file.write(ELAN_INDENT * 2 + "<TIME_SLOT TIME_SLOT_ID=\"%s\"/>\n" % escapeXMLAttribute(time_slot.get_id()))
+        else:
+            output_file.write(ELAN_INDENT * 2 + "<TIME_SLOT TIME_SLOT_ID=\"%s\" TIME_VALUE=\"%d\"/>\n" % (escapeXMLAttribute(time_slot.get_id()), time_slot.get_time_value()))
+
+    output_file.write(ELAN_INDENT + "</TIME_ORDER>\n")
+
+
+# Function to write the annotations of a tier
+# Arguments:
+# 1. The output file
+# 2. The tier
+def writeELANAnnotations(output_file, tier):
+
+    for annotation in tier:
+
+        output_file.write(ANNOTATION_FORMAT % (annotation.annotation_type, formatXMLAttributes(annotation.attributes), escape(annotation.get_annotation_value()), annotation.annotation_type))
+
+
+# Function to write an element copied from the input file
+# Arguments:
+# 1. The output file
+# 2. The element
+# 3. The depth of the element
+def writeELANElement(output_file, element, depth):
+
+    element.tail = None
+
+    output_file.write(ELAN_INDENT * depth + ElementTree.tostring(element, encoding="unicode") + "\n")
+
+
+# Function to check whether two file names refer to the same file
+# (also if they are spelled differently, e.g. same.eaf and ./same.eaf)
+# Arguments:
+# 1. The name of the first file
+# 2. The name of the second file
+def isSameFile(file_name1, file_name2):
+
+    return os.path.realpath(file_name1) == os.path.realpath(file_name2)
+
+
+# Function to write an ELAN file
+# The time order and the annotations of the tiers that have been read in
+# are written from memory, everything else is copied from the input file.
+# The output is written to a temporary file first, which then replaces the output file.
+# Arguments:
+# 1. The ELAN file as read in by readELANFile
+# 2. The name of the output file
+def writeELANFile(elan_file, output_file_name):
+
+    namespaces = {}
+
+    # Write to a temporary file first so that neither the input file
+    # nor an existing output file is destroyed while the input file is read
+    # (the temporary file is in the same directory so that it can be renamed)
+    temporary_file_name = "%s.%d.tmp" % (output_file_name, os.getpid())
+
+    output_file = codecs.open(temporary_file_name, "w", "utf-8")
+
+    try:
+
+        writeELANContent(elan_file, output_file, namespaces)
+
+    except BaseException:
+
+        output_file.close()
+        os.remove(temporary_file_name)
+        raise
+
+    output_file.close()
+
+    os.replace(temporary_file_name, output_file_name)
+
+
+# Function to write the content of an ELAN file
+# (cf. writeELANFile)
+# Arguments:
+# 1. The ELAN file as read in by readELANFile
+# 2. The output file
+# 3. A dictionary to be filled with the namespace declarations of the input file
+def writeELANContent(elan_file, output_file, namespaces):
+
+    output_file.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n")
+
+    # Is the current tier copied from the input file?
+    copy_tier = False
+
+    for (event, depth, element) in iterateELANFile(elan_file.get_file_name(), namespaces, True):
+
+        # Comments and processing instructions
+        if event in ("comment", "pi"):
+
+            # Those inside the time order and inside tiers that have been read in are dropped
+            if depth <= 1 or copy_tier:
+                writeELANElement(output_file, element, depth)
+
+        # Root element
+        elif depth == 0:
+
+            if event == "start":
+
+                prefixes = dict((uri, prefix) for (prefix, uri) in namespaces.items())
+                namespace_declarations = "".join(" xmlns%s=\"%s\"" % (":" + prefix if prefix != "" else "", uri) for (prefix, uri) in namespaces.items())
+
+                output_file.write("<" + formatXMLName(element.tag, prefixes) + namespace_declarations + formatXMLAttributes(element.attrib, prefixes) + ">\n")
+
+            else:
+
+                output_file.write("</" + formatXMLName(element.tag, prefixes) + ">\n")
+
+        # Time order
+        elif depth == 1 and element.tag == "TIME_ORDER":
+
+            if event == "end":
+                writeELANTimeOrder(output_file, elan_file.get_time_order())
+
+        # Tiers
+        elif depth == 1 and element.tag == "TIER":
+
+            tier = elan_file.get_tier_by_id(element.get("TIER_ID"))
+
+            if event == "start":
+
+                copy_tier = not tier.is_loaded()
+
+                output_file.write(ELAN_INDENT + "<TIER" + formatXMLAttributes(element.attrib) + ">\n")
+
+            else:
+
+                if not copy_tier:
+                    writeELANAnnotations(output_file, tier)
+
+                output_file.write(ELAN_INDENT + "</TIER>\n")
+
+                copy_tier = False
+
+        # Annotations of tiers that have not been read in
+        elif depth == 2 and event == "end" and element.tag == "ANNOTATION":
+
+            if copy_tier:
+                writeELANElement(output_file, element, depth)
+
+        # Everything else
+        elif depth == 1 and event == "end":
+
+            writeELANElement(output_file, element, depth)
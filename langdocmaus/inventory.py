@@ -0,0 +1,510 @@
+# encoding=utf-8
+
+# Functions for checking that a BAS Partitur file only contains phonemes
+# from a specified phoneme inventory
+
+# Codecs for handling character encodings
+import codecs
+
+# Worker processes for checking many files
+import concurrent.futures
+
+# Redirect the error messages of files that cannot be checked
+import contextlib
+import io
+
+# Writing the report file
+import csv
+
+# Finding the files in directories and glob patterns
+import glob
+import os
+import os.path
+
+# Module for regular expressions
+import re
+
+import sys
+
+
+# Reads a BAS partitur file and returns a list of the words (transcriptions)
+# occurring in the KAN tier
+# Arguments:
+# 1. file name of the BASPartitur file
+# 2. optional: encoding
+# returns a list of pairs (word, line_number)
+def read_bas_file(file_name, encoding="utf-8"):
+    bas_file = codecs.open(file_name, "r", encoding)
+    
+    # The list of occurring words (transcriptions)
+    words = []
+    
+    # Count line numbers for error messages
+    line_number = 1
+    
+    # Go through the file line by line
+    for line in bas_file:
+        
+        # Delete preceding or trailing white space
+        line = line.strip()
+        
+        # If the line starts with the key word "KAN:",
+        # it contains phonological information
+        if line.startswith("KAN:"):
+            
+            # Split line at white space
+            elements = line.split()
+
+            if len(elements) < 3:
+                print("Found a KAN tier that does not contain at least 3 elements (tier marker, number, phoneme) in line:", line_number)
+                sys.exit()
+
+            if len(elements) == 3:
+            
+                # Unpack elements into separate variables    
+                (tier_marker, number, word) = elements
+            
+            else:
+                
+                # Skip the tier marker and the number
+                # (new style KAN tiers separate phonemes by spaces)
+                word = " ".join(elements[2:])
+                        
+            # Append the current word into the list of words
+            # (also include the line number)
+            words.append((word, line_number))
+            
+        # Increase line number
+        line_number += 1
+    
+    # Close file
+    bas_file.close()
+    
+    return words
+        
+# Reads a KANINVENTAR file containing a phoneme inventory
+# and returns a list of the phonemes 
+# Arguments:
+# 1. file name of the BASPartitur file
+# 2. optional: encoding
+# returns a list of phonemes (in the order of the file, without duplicates)
+def read_inventory_file(file_name, encoding="utf-8"):
+    inventory_file = codecs.open(file_name, "r", encoding)
+    
+    # The list of phonemes
+    phonemes = list()
+
+    # The set of phonemes for fast lookup
+    phoneme_set = set()
+    
+    # Go through the file line by line
+    for line in inventory_file:
+        
+        # Delete preceding or trailing white space
+        line = line.strip()
+        
+        # Add phoneme to inventory
+        if not line in phoneme_set:
+            phonemes.append(line)
+            phoneme_set.add(line)
+    
+    # Close file
+    inventory_file.close()
+    
+    # Return the list of phonemes
+    return phonemes
+
+# Compiles a list of phonemes into a trie for the segmentation of
+# old style KAN tiers (without white space between the phonemes)
+# Arguments:
+# 1. a list of allowed phonemes
+# returns the trie as nested dictionaries from characters to subtries,
+# in which the key None marks the end of a phoneme
+def make_phoneme_trie(allowed_phonemes):
+
+    trie = {}
+
+    for phoneme in allowed_phonemes:
+
+        # Ignore empty lines in the inventory
+        if phoneme == "":
+            continue
+
+        node = trie
+
+        for character in phoneme:
+            node = node.setdefault(character, {})
+
+        node[None] = True
+
+    return trie
+
+
+# Finds the illegal phonemes in a single word (transcription)
+# Arguments:
+# 1. the word (transcription) from the KAN tier
+# 2. the set of allowed phonemes
+# 3. the trie of allowed phonemes as produced by make_phoneme_trie
+# returns a list of the illegal phonemes in the order of their occurrence
+def find_illegal_phonemes(word, phoneme_set, phoneme_trie):
+
+    illegal_phonemes = []
+
+    # If the word contains whitespace, split it at white space
+    # (New style KAN tier for maus.trn)
+    if re.search(r"\s", word):
+
+        # Test whether each phoneme is an allowed phoneme or not
+        for phoneme in word.split():
+
+            if phoneme not in phoneme_set:
+                illegal_phonemes.append(phoneme)
+
+    # Old style KAN-tier
+    else:
+
+        # Because phonemes can be more than one character long,
+        # we need a little more complicated procedure:
+        # Perform a left to right search for the longest
+        # allowed phoneme at each position using the trie
+
+        # Start at position 0
+        position = 0
+
+        # Length of word
+        length_of_word = len(word)
+
+        while position < length_of_word:
+
+            # Length of the longest phoneme found at the current position
+            phoneme_length = 0
+
+            # Follow the characters of the word in the trie
+            node = phoneme_trie
+            end_position = position
+
+            while end_position < length_of_word and word[end_position] in node:
+
+                node = node[word[end_position]]
+                end_position += 1
+
+                if None in node:
+                    phoneme_length = end_position - position
+
+            # Test whether a phoneme was found at the current position
+            if phoneme_length > 0:
+
+                # Continue after the phoneme
+                position += phoneme_length
+
+            else:
+
+                # Assume the current character is an illegal phoneme
+                illegal_phonemes.append(word[position])
+
+                # Increase the position in the word by one
+                position += 1
+
+    return illegal_phonemes
+
+
+# Checks whether the phonemes occurring in the BAS file
+# are all included in the set of allowed phonemes
+# Arguments:
+# 1. a list of (word, line_number) pairs from the BASPartitur file
+# 2. a list of allowed phonemes
+# returns a dictionary of illegal phonemes with a list of line numbers where
+# they occur as values.
+def check_phonemes(list_of_words, allowed_phonemes):
+
+    # Compile the inventory for fast lookup and segmentation
+    return collect_illegal_phonemes(list_of_words, set(allowed_phonemes), make_phoneme_trie(allowed_phonemes))
+
+
+# Checks the phonemes occurring in the BAS file with a compiled inventory
+# Arguments:
+# 1. a list of (word, line_number) pairs from the BASPartitur file
+# 2. the set of allowed phonemes
+# 3. the trie of allowed phonemes as produced by make_phoneme_trie
+# returns a dictionary of illegal phonemes with a list of line numbers where
+# they occur as values.
+def collect_illegal_phonemes(list_of_words, phoneme_set, phoneme_trie):
+    
+    # A dictionary for the results of the check
+    results = {}
+
+    # The illegal phonemes of the words that have already been checked
+    # (each word type only needs to be segmented once)
+    checked_words = {}
+    
+    # Go through the list of (word, line number) pairs
+    for (word, line_number) in list_of_words:
+
+        if word not in checked_words:
+            checked_words[word] = find_illegal_phonemes(word, phoneme_set, phoneme_trie)
+
+        for illegal_phoneme in checked_words[word]:
+
+            # Add the illegal phoneme to the result dictionary
+            if illegal_phoneme in results:
+                results[illegal_phoneme].append(str(line_number))
+
+            else:
+                results[illegal_phoneme] = [str(line_number)]
+    
+    # Return the result dictionary
+    return results
+
+
+# Outputs the illegal phonemes found by check_phonemes
+# Arguments:
+# 1. the dictionary of illegal phonemes as produced by check_phonemes
+# 2. file name of the BASPartitur file
+def print_results(results, bas_file_name):
+
+    if len(results) == 0:
+        print("No illegal phonemes found in:", bas_file_name)
+
+    else:
+
+        # Output a sorted list of illegal phonemes and the corresponding
+        # lines in the BASPartitur file where they occurred
+        for phoneme in sorted(results):
+
+            # Try to output the illegal phoneme to the console
+            try:
+                print("Illegal phoneme", phoneme, "occuring in lines:\t\t" + " ".join(results[phoneme]))
+
+            # If there is a character encoding problem,
+            # output a safe represenation of the phoneme
+            except UnicodeEncodeError:
+                print("Illegal phoneme", repr(phoneme), "occuring in lines:\t\t" + " ".join(results[phoneme]))
+
+
+# Checks whether all phonemes in a BAS Partitur file are contained
+# in a phoneme inventory and outputs the illegal phonemes
+# Arguments:
+# 1. file name of the BASPartitur file
+# 2. file name of the KANINVENTAR file
+# 3. optional: encoding
+# returns a dictionary of illegal phonemes as produced by check_phonemes
+def check_inventory(bas_file_name, inventory_file_name, encoding="utf-8"):
+
+    # Read the BASPartitur file
+    list_of_words = read_bas_file(bas_file_name, encoding)
+
+    # Read the KANINVENTAR file
+    allowed_phonemes = read_inventory_file(inventory_file_name, encoding)
+
+    # Check whether all occurring phonemes are included
+    # in the set of allowed phonemes
+    results = check_phonemes(list_of_words, allowed_phonemes)
+
+    # Output the results
+    print_results(results, bas_file_name)
+
+    return results
+
+
+# Finds the BAS Partitur files to be checked
+# Arguments:
+# 1. a list of file names, directory names (searched including subdirectories)
+#    and glob patterns (e.g. corpus/*/*.par)
+# 2. optional: the file name extension of BAS Partitur files in directories (defaults to .par)
+# returns a sorted list of file names
+def find_bas_files(paths, extension=".par"):
+
+    bas_file_names = set()
+
+    for path in paths:
+
+        if os.path.isdir(path):
+
+            for (current_directory, subdirectories, file_names) in os.walk(path):
+                for file_name in file_names:
+                    if file_name.endswith(extension):
+                        bas_file_names.add(os.path.normpath(os.path.join(current_directory, file_name)))
+
+        elif os.path.isfile(path):
+            bas_file_names.add(os.path.normpath(path))
+
+        elif glob.has_magic(path):
+
+            for file_name in glob.glob(path, recursive=True):
+                if os.path.isfile(file_name):
+                    bas_file_names.add(os.path.normpath(file_name))
+
+        else:
+            print("Cannot find the BASPartitur file or directory you specified:", path)
+            sys.exit()
+
+    return sorted(bas_file_names)
+
+
+# The inventory of a worker process (set by init_worker, so that the
+# inventory is only sent to every worker process once)
+worker_inventory = None
+
+
+# Compiles the inventory for checking BAS Partitur files in the current process
+# Arguments:
+# 1. a list of allowed phonemes
+def init_worker(allowed_phonemes):
+
+    global worker_inventory
+
+    worker_inventory = (set(allowed_phonemes), make_phoneme_trie(allowed_phonemes))
+
+
+# Checks a single BAS Partitur file with the inventory set by init_worker
+# Arguments:
+# 1. file name of the BASPartitur file
+# 2. optional: encoding
+# returns a tuple (file name, dictionary of illegal phonemes as produced by check_phonemes
+# or None if the file could not be checked, error message or None)
+def check_bas_file(bas_file_name, encoding="utf-8"):
+
+    (phoneme_set, phoneme_trie) = worker_inventory
+
+    # Collect the error messages printed before read_bas_file exits
+    output = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(output):
+            list_of_words = read_bas_file(bas_file_name, encoding)
+
+    except (Exception, SystemExit) as error:
+
+        messages = [line for line in output.getvalue().splitlines() if line.strip() != ""]
+
+        if isinstance(error, SystemExit) and len(messages) > 0:
+            return (bas_file_name, None, messages[-1])
+
+        return (bas_file_name, None, "%s: %s" % (type(error).__name__, error))
+
+    return (bas_file_name, collect_illegal_phonemes(list_of_words, phoneme_set, phoneme_trie), None)
+
+
+# Outputs the illegal phonemes found in several BAS Partitur files
+# (with file:line locations) and a summary for each file
+# Arguments:
+# 1. a list of tuples as produced by check_bas_file
+def print_corpus_results(corpus_results):
+
+    # Aggregate the locations of the illegal phonemes over all files
+    locations = {}
+
+    for (bas_file_name, results, error_message) in corpus_results:
+
+        if results is None:
+            continue
+
+        for phoneme in results:
+            locations.setdefault(phoneme, []).extend(bas_file_name + ":" + line_number for line_number in results[phoneme])
+
+    for phoneme in sorted(locations):
+
+        # Try to output the illegal phoneme to the console
+        try:
+            print("Illegal phoneme", phoneme, "occuring in:\t\t" + " ".join(locations[phoneme]))
+
+        # If there is a character encoding problem,
+        # output a safe represenation of the phoneme
+        except UnicodeEncodeError:
+            print("Illegal phoneme", repr(phoneme), "occuring in:\t\t" + " ".join(locations[phoneme]))
+
+    # Output the summary for each file
+    print()
+    print("Summary:")
+
+    for (bas_file_name, results, error_message) in corpus_results:
+
+        if results is None:
+            print(bas_file_name + "\tfailed: " + error_message)
+
+        elif len(results) == 0:
+            print(bas_file_name + "\tno illegal phonemes")
+
+        else:
+            summary = "%d illegal phonemes (%d occurrences): %s" % (len(results), sum(len(lines) for lines in results.values()), " ".join(sorted(results)))
+
+            try:
+                print(bas_file_name + "\t" + summary)
+
+            except UnicodeEncodeError:
+                print(bas_file_name + "\t" + ascii(summary))
+
+    num_illegal = len([results for (bas_file_name, results, error_message) in corpus_results if results])
+    num_failed = len([results for (bas_file_name, results, error_message) in corpus_results if results is None])
+
+    print(len(corpus_results), "files checked,", num_illegal, "with illegal phonemes,", num_failed, "could not be checked.")
+
+
+# Writes the illegal phonemes found in several BAS Partitur files to a report file
+# (tab-separated, one line per occurrence)
+# Arguments:
+# 1. the name of the report file
+# 2. a list of tuples as produced by check_bas_file
+def write_corpus_report(report_file_name, corpus_results):
+
+    report_file = codecs.open(report_file_name, "w", "utf-8")
+
+    writer = csv.writer(report_file, delimiter="\t", lineterminator="\n")
+    writer.writerow(["file", "line", "phoneme", "message"])
+
+    for (bas_file_name, results, error_message) in corpus_results:
+
+        if results is None:
+            writer.writerow([bas_file_name, "", "", error_message])
+            continue
+
+        occurrences = [(int(line_number), phoneme) for phoneme in results for line_number in results[phoneme]]
+
+        for (line_number, phoneme) in sorted(occurrences):
+            writer.writerow([bas_file_name, line_number, phoneme, ""])
+
+    report_file.close()
+
+
+# Checks whether all phonemes in several BAS Partitur files are contained
+# in a phoneme inventory, using several worker processes, and outputs
+# the illegal phonemes of all files together
+# Arguments:
+# 1. a list of file names, directory names and glob patterns (see find_bas_files)
+# 2. file name of the KANINVENTAR file
+# 3. optional: encoding
+# 4. optional: the number of worker processes (defaults to the number of CPUs)
+# 5. optional: the name of a report file (tab-separated, defaults to None, i.e. no report file)
+# 6. optional: the file name extension of BAS Partitur files in directories (defaults to .par)
+# returns a list of tuples (file name, dictionary of illegal phonemes or None, error message or None)
+# as produced by check_bas_file, sorted by file name
+def check_corpus_inventory(paths, inventory_file_name, encoding="utf-8", jobs=None, report_file_name=None, extension=".par"):
+
+    bas_file_names = find_bas_files(paths, extension)
+
+    # Read the KANINVENTAR file only once
+    allowed_phonemes = read_inventory_file(inventory_file_name, encoding)
+
+    # Check small corpora in the current process
+    if jobs == 1 or len(bas_file_names) <= 1:
+
+        init_worker(allowed_phonemes)
+        corpus_results = [check_bas_file(bas_file_name, encoding) for bas_file_name in bas_file_names]
+
+    else:
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(allowed_phonemes,)) as executor:
+
+            # Send the files to the workers in chunks to reduce the overhead for small files
+            chunk_size = max(1, len(bas_file_names) // (4 * (jobs or os.cpu_count() or 1)))
+
+            corpus_results = list(executor.map(check_bas_file, bas_file_names, [encoding] * len(bas_file_names), chunksize=chunk_size))
+
+    # Output the results
+    print_corpus_results(corpus_results)
+
+    if report_file_name is not None:
+        write_corpus_report(report_file_name, corpus_results)
+        print("Report written to", report_file_name)
+
+    return corpus_results
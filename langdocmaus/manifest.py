@@ -0,0 +1,227 @@
+# encoding=utf-8
+
+# Functions for recording the inputs and options of a conversion in a manifest
+# file next to its output files, so that a conversion whose inputs and options
+# have not changed since the last run does not have to be run again
+#
+# The inputs are compared by the SHA-256 hashes of their contents. A hash is only
+# computed again if the size or the modification time of an input file has changed.
+# The manifest also contains a fingerprint of the LangDocMAUS code, so that all
+# conversions are run again after the code has been changed.
+
+# Codecs for handling character encodings
+import codecs
+
+# Module for computing hashes of file contents
+import hashlib
+
+# Module for reading and writing manifest files
+import json
+
+# Modules to check files and paths
+import os
+import os.path
+
+
+# The format version of the manifest files
+MANIFEST_VERSION = 1
+
+# The size of the blocks in which files are read for hashing
+HASH_BLOCK_SIZE = 1 << 20
+
+# The fingerprint of the LangDocMAUS code (computed once per process)
+code_fingerprint = None
+
+
+# Function to compute the SHA-256 hash of the contents of a file
+# Arguments:
+# 1. The file name
+# returns the hash as a hexadecimal string
+def hashFile(file_name):
+
+    file_hash = hashlib.sha256()
+
+    input_file = open(file_name, "rb")
+
+    for block in iter(lambda: input_file.read(HASH_BLOCK_SIZE), b""):
+        file_hash.update(block)
+
+    input_file.close()
+
+    return file_hash.hexdigest()
+
+
+# Function to compute a fingerprint of the LangDocMAUS code
+# (the hash of all modules of the langdocmaus package)
+# returns the fingerprint as a hexadecimal string
+def getCodeFingerprint():
+
+    global code_fingerprint
+
+    if code_fingerprint is None:
+
+        package_directory = os.path.dirname(os.path.abspath(__file__))
+
+        code_hash = hashlib.sha256()
+
+        for file_name in sorted(os.listdir(package_directory)):
+            if file_name.endswith(".py"):
+                code_hash.update(file_name.encode("utf-8"))
+                code_hash.update(hashFile(os.path.join(package_directory, file_name)).encode("ascii"))
+
+        code_fingerprint = code_hash.hexdigest()
+
+    return code_fingerprint
+
+
+# Function to describe a file by its size, modification time and hash
+# Arguments:
+# 1. The file name
+# 2. The description of the same file in an earlier manifest (defaults to None)
+#    (its hash is reused if the size and modification time have not changed)
+# returns a dictionary with the keys "size", "mtime" and "sha256"
+# (None if the file does not exist)
+def describeFile(file_name, previous_description=None):
+
+    if file_name is None or not os.path.isfile(file_name):
+        return None
+
+    file_status = os.stat(file_name)
+
+    description = {"size": file_status.st_size, "mtime": file_status.st_mtime_ns}
+
+    if previous_description is not None and previous_description.get("size") == description["size"] and previous_description.get("mtime") == description["mtime"]:
+        description["sha256"] = previous_description.get("sha256")
+    else:
+        description["sha256"] = hashFile(file_name)
+
+    return description
+
+
+# Function to read in a manifest file written by writeManifest
+# Arguments:
+# 1. The name of the manifest file
+# returns the manifest as a dictionary (None if there is no valid manifest file)
+def readManifest(manifest_file_name):
+
+    if not os.path.isfile(manifest_file_name):
+        return None
+
+    try:
+        manifest_file = codecs.open(manifest_file_name, "r", "utf-8")
+        manifest = json.load(manifest_file)
+        manifest_file.close()
+
+    except ValueError:
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+
+    return manifest
+
+
+# Function to create a manifest for a conversion
+# Arguments:
+# 1. The name of the conversion
+# 2. A dictionary from the roles of the input files (e.g. "toolbox") to their names
+# 3. A list of the names of the output files
+# 4. A dictionary of the options of the conversion (only strings, numbers, booleans and None)
+# 5. An earlier manifest of the same conversion (defaults to None)
+# returns the manifest as a dictionary
+def makeManifest(conversion, input_file_names, output_file_names, options, previous_manifest=None):
+
+    if previous_manifest is None:
+        previous_manifest = {}
+
+    previous_inputs = previous_manifest.get("inputs", {})
+
+    inputs = {}
+
+    for (role, file_name) in input_file_names.items():
+
+        previous_input = previous_inputs.get(role)
+
+        # Only reuse the hash of the same file
+        if previous_input is None or previous_input.get("file") != file_name:
+            previous_input = None
+
+        inputs[role] = {"file": file_name, "description": describeFile(file_name, previous_input and previous_input.get("description"))}
+
+    return {"version": MANIFEST_VERSION,
+            "conversion": conversion,
+            "code": getCodeFingerprint(),
+            "inputs": inputs,
+            "options": options,
+            "outputs": dict((file_name, describeFile(file_name)) for file_name in output_file_names)}
+
+
+# Function to get the names and hashes of the input files from a manifest
+# Arguments:
+# 1. The manifest as produced by makeManifest or read in by readManifest
+# returns a dictionary from the roles of the input files to pairs (file name, hash)
+def getInputHashes(manifest):
+
+    input_hashes = {}
+
+    for (role, input_file) in manifest.get("inputs", {}).items():
+
+        if input_file.get("description") is None:
+            input_hashes[role] = (input_file.get("file"), None)
+        else:
+            input_hashes[role] = (input_file.get("file"), input_file["description"].get("sha256"))
+
+    return input_hashes
+
+
+# Function to test whether the outputs of a conversion are up to date
+# Arguments:
+# 1. The manifest of the last run as read in by readManifest (or None)
+# 2. The manifest of the current inputs and options as produced by makeManifest
+#    (the descriptions of the outputs are not used)
+# returns True if the inputs, options and the LangDocMAUS code are the same as in the last run
+# and the output files still exist unchanged, False otherwise
+def isUpToDate(previous_manifest, manifest):
+
+    if previous_manifest is None:
+        return False
+
+    for key in ("conversion", "code", "options"):
+        if previous_manifest.get(key) != json.loads(json.dumps(manifest[key])):
+            return False
+
+    # Input files that have only been touched are still the same
+    if getInputHashes(previous_manifest) != getInputHashes(manifest):
+        return False
+
+    # The output files must not have been deleted or changed in the meantime
+    for (file_name, description) in previous_manifest.get("outputs", {}).items():
+
+        if description is None or not os.path.isfile(file_name):
+            return False
+
+        file_status = os.stat(file_name)
+
+        if file_status.st_size != description["size"] or file_status.st_mtime_ns != description["mtime"]:
+            return False
+
+    return True
+
+
+# Function to write a manifest file after a successful conversion
+# Arguments:
+# 1. The name of the manifest file
+# 2. The manifest as produced by makeManifest (before the conversion)
+# 3. A message about the result of the conversion to be repeated when it is not run again (defaults to "")
+def writeManifest(manifest_file_name, manifest, message=""):
+
+    manifest = dict(manifest)
+
+    # Describe the output files as they are after the conversion
+    manifest["outputs"] = dict((file_name, describeFile(file_name)) for file_name in manifest["outputs"])
+    manifest["message"] = message
+
+    manifest_file = codecs.open(manifest_file_name, "w", "utf-8")
+    json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    manifest_file.write("\n")
+    manifest_file.close()
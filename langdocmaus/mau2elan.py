@@ -0,0 +1,235 @@
+# encoding=utf-8
+
+# Functions to set word start and end times in an ELAN file created by
+# importing a Toolbox file directly from a BAS Partitur file with a MAU tier
+# (without writing the word times to a Toolbox file and importing them from there)
+
+import sys
+
+# Functions for reading and writing ELAN files
+from langdocmaus.eaf import isSameFile
+from langdocmaus.eaf import readELANFile
+from langdocmaus.eaf import writeELANFile
+
+# Functions to flexibilize ELAN files
+from langdocmaus.flexibilize import flexibilizeELANFile
+from langdocmaus.flexibilize import selectFlexibilizedTiers
+
+# Functions for reading BAS Partitur files
+from langdocmaus.partitur import makeUtteranceDictionary
+from langdocmaus.partitur import mau_to_word_times
+from langdocmaus.partitur import parse_partitur
+
+# Functions to set word start and end times in ELAN files
+from langdocmaus.wordtimes import importWordTimes
+from langdocmaus.wordtimes import selectWordTimeTiers
+from langdocmaus.wordtimes import writeWordTimeErrorReport
+
+
+# Function to convert a time in samples to seconds as written by MAU2Toolbox
+# Arguments:
+# 1. The time in samples
+# 2. The sample rate
+# returns the time in seconds as a string with three decimals
+def formatSeconds(time, sample_rate):
+
+    return "%.3f" % round(time / sample_rate, 3)
+
+
+# Function to convert a time in seconds as written by MAU2Toolbox to milliseconds
+# (by deleting the dot like import_wordtimes_from_toolbox_to_elan in order to avoid floating point problems)
+# Arguments:
+# 1. The time in seconds as a string with three decimals
+def secondsToMilliseconds(seconds):
+
+    return int(seconds.replace(".", ""))
+
+
+# Function to look up the parent annotations of the transcription tiers
+# (i.e. the annotation units named after the Toolbox references)
+# Arguments:
+# 1. The ELAN file as read in by readELANFile
+# 2. The name of the transcription tier containing the words
+# returns a dictionary from Toolbox references to the lists of their parent annotations
+def findUtteranceAnnotations(elan_file, text_tier_name):
+
+    # Find the parent tiers of the transcription tiers
+    parent_tier_ids = []
+
+    for tier in elan_file.get_tiers():
+
+        if tier.get_linguistic_type() == text_tier_name and tier.get_parent_tier_ref() not in parent_tier_ids:
+
+            parent_tier_ids.append(tier.get_parent_tier_ref())
+
+    utterance_annotations = {}
+
+    for parent_tier_id in parent_tier_ids:
+
+        for annotation in elan_file.get_tier_by_id(parent_tier_id):
+
+            if annotation.get_annotation_value() in utterance_annotations:
+
+                utterance_annotations[annotation.get_annotation_value()].append(annotation)
+
+            else:
+
+                utterance_annotations[annotation.get_annotation_value()] = [annotation]
+
+    return utterance_annotations
+
+
+# Function to set the start and end times of the annotation units to the utterance times
+# computed from the MAU tier (like MAU2Toolbox does for the utterance start and end markers)
+# Arguments:
+# 1. The ELAN file as read in by readELANFile
+# 2. A dictionary from Toolbox references to the lists of their annotations as produced by findUtteranceAnnotations
+# 3. The utterance start and end times as computed by combineWordsIntoUtterances
+# 4. The sample rate
+def setUtteranceTimes(elan_file, utterance_annotations, utterance_times, sample_rate):
+
+    time_order = elan_file.get_time_order()
+
+    for (utterance_id, annotations) in utterance_annotations.items():
+
+        if utterance_id not in utterance_times:
+            continue
+
+        (utterance_start_time, utterance_end_time) = utterance_times[utterance_id]
+
+        for annotation in annotations:
+
+            time_order.get_time_slot_by_id(annotation.get_start_time_slot()).set_time_value(secondsToMilliseconds(formatSeconds(utterance_start_time, sample_rate)))
+            time_order.get_time_slot_by_id(annotation.get_end_time_slot()).set_time_value(secondsToMilliseconds(formatSeconds(utterance_end_time, sample_rate)))
+
+
+# Function to determine the word start and end times of all utterances
+# in the form extracted from a Toolbox file by extractWordTimes
+# Utterances with missing word times get regular intervals within
+# their original times (like in MAU2Toolbox).
+# Arguments:
+# 1. The utterances (RID tier) as produced by readBASPartiturFile
+# 2. The word start and end times as computed by combinePhonemesIntoWords
+# 3. The sample rate
+# 4. A dictionary from utterance ids to pairs of original start and end times in milliseconds
+# 5. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a dictionary from utterance ids to a list of two lists (word start times and word end times)
+def makeUtteranceWordTimes(utterances, word_times, sample_rate, original_utterance_times, debug_level=0):
+
+    utterance_word_times = {}
+
+    for (utterance_id, words) in makeUtteranceDictionary(utterances).items():
+
+        if len(words) == 0:
+            continue
+
+        # Have all words been aligned?
+        if all(word in word_times for word in words):
+
+            word_start_times = [formatSeconds(word_times[word][0], sample_rate) for word in words]
+            word_end_times = [formatSeconds(word_times[word][1], sample_rate) for word in words]
+
+        else:
+
+            for word in words:
+                if word not in word_times:
+                    print("Could not find word start or end time for word", word + ".")
+
+            if utterance_id not in original_utterance_times:
+                print("Could not determine original utterance start and end times for erroneous utterance", utterance_id)
+                sys.exit()
+
+            # Output regular intervals
+            (original_start_time, original_end_time) = original_utterance_times[utterance_id]
+
+            original_start_time_seconds = original_start_time / 1000
+            word_length = (original_end_time - original_start_time) / 1000 / len(words)
+
+            word_start_times = ["%.3f" % (original_start_time_seconds + index * word_length + 0.010) for index in range(len(words))]
+            word_end_times = ["%.3f" % (original_start_time_seconds + (index + 1) * word_length - 0.010) for index in range(len(words))]
+
+            # Print status message
+            if debug_level == 1:
+                print("Outputting regular intervals for utterance", utterance_id)
+
+        utterance_word_times[utterance_id] = [word_start_times, word_end_times]
+
+    return utterance_word_times
+
+
+# Function to set the word start and end times in an ELAN file created by importing
+# a Toolbox file using a BAS Partitur file with a MAU tier
+# (the same as MAU2Toolbox with word times, importing the Toolbox file into ELAN,
+# flexibilize_imported_toolbox_in_elan and import_wordtimes_from_toolbox_to_elan,
+# but the ELAN file is only read and written once)
+# Arguments:
+# 1. The name of the BAS Partitur file with MAU tier
+# 2. The name of the original BAS Partitur file
+# 3. The name of the input ELAN file (created by importing the original Toolbox file)
+# 4. The name of the output ELAN file
+# 5. The sample rate
+# 6. The encoding of the BAS Partitur file with MAU tier (defaults to utf-8)
+# 7. The encoding of the original BAS Partitur file (defaults to utf-8)
+# 8. Whether to keep the original utterance times (defaults to False)
+# 9. The name of the transcription tier containing the words (defaults to t)
+# 10. The name of a report file for the words whose times cannot be set (defaults to None,
+#     i.e. stop at the first such word, cf. import_word_times)
+# 11. debug level (0 --> no status messages, 1 --> print status messages)
+# returns the list of words whose times could not be set as collected by importWordTimes
+# (None if no report file is given)
+def mau_to_elan(input_file_name, original_file_name, elan_file_name, output_file_name, sample_rate, input_encoding="utf-8", original_encoding="utf-8", keep_utterance_times=False, text_tier_name="t", error_report_file_name=None, debug_level=0):
+
+    # Safety check
+    # (also catches different spellings of the same file name, e.g. same.eaf and ./same.eaf)
+    if isSameFile(elan_file_name, output_file_name):
+        print("Input and output file name are the same. Cannot overwrite input file.")
+        sys.exit()
+
+    # Determine the word and utterance times
+    tiers = parse_partitur(original_file_name, input_file_name, original_encoding, input_encoding, debug_level)
+
+    (word_times, utterance_times) = mau_to_word_times(tiers, False, debug_level)
+
+    # Print status message
+    if debug_level == 1:
+        print("Opening input ELAN file:", elan_file_name)
+
+    # Read in the tiers needed for flexibilizing the ELAN file and setting the word times
+    elan_file = readELANFile(elan_file_name, lambda elan_file: selectFlexibilizedTiers(elan_file) + selectWordTimeTiers(elan_file, text_tier_name))
+
+    utterance_annotations = findUtteranceAnnotations(elan_file, text_tier_name)
+
+    # Remember the original utterance times for utterances with missing word times
+    original_utterance_times = {}
+
+    for (utterance_id, annotations) in utterance_annotations.items():
+
+        if annotations[0].get_start_time() is not None and annotations[0].get_end_time() is not None:
+            original_utterance_times[utterance_id] = (annotations[0].get_start_time(), annotations[0].get_end_time())
+
+    # Set the utterance times before the ELAN file is flexibilized
+    # (like importing a Toolbox file with new utterance times)
+    if keep_utterance_times is False:
+        setUtteranceTimes(elan_file, utterance_annotations, utterance_times, sample_rate)
+
+    # Flexibilize the ELAN file
+    flexibilizeELANFile(elan_file)
+
+    # Collect the words whose times cannot be set instead of stopping
+    if error_report_file_name is not None:
+        word_time_errors = []
+    else:
+        word_time_errors = None
+
+    # Set the word start and end times
+    importWordTimes(elan_file, makeUtteranceWordTimes(tiers["RID"], word_times, sample_rate, original_utterance_times, debug_level), text_tier_name, word_time_errors)
+
+    # Write the report
+    if word_time_errors is not None:
+        writeWordTimeErrorReport(error_report_file_name, word_time_errors)
+        print(len(word_time_errors), "words without word times written to", error_report_file_name)
+
+    # Output the modified ELAN file
+    writeELANFile(elan_file, output_file_name)
+
+    return word_time_errors
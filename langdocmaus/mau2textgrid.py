@@ -0,0 +1,695 @@
+# encoding=utf-8
+
+# Functions for writing the tiers of a BAS Partitur file with a MAU tier
+# to a Praat TextGrid file
+
+# Codecs for handling character encodings
+import codecs
+
+# Modules to copy temporary files into the output file
+import shutil
+import tempfile
+
+# Module to write binary TextGrid files
+import struct
+
+import sys
+
+# Functions for reading BAS Partitur files
+from langdocmaus.partitur import combineWordsIntoUtterances
+from langdocmaus.partitur import iterBASPartiturFile
+from langdocmaus.partitur import makeWordDictionary
+from langdocmaus.partitur import mau_to_word_times
+from langdocmaus.partitur import parse_partitur
+
+
+# Function to determine the minimal start time for words or utterances
+# Argument:
+# 1. A dictionary of ids with values of (start time, end time)
+# returns the minimal start time
+def getMinimalStartTime(id_dict):
+    
+    # Current minimal start time
+    min_start_time = -1
+    
+    # Go through all entries in the dictionary
+    for entry in id_dict:
+        
+        cur_start_time = id_dict[entry][0]
+        
+        # If no start time has been looked at yet
+        if min_start_time == -1:
+            min_start_time = cur_start_time
+        
+        else:
+            
+            # Is the current start time lower than the lowest value seen yet
+            if cur_start_time < min_start_time:
+                
+                # Then take it as the new minimal start time
+                min_start_time = cur_start_time
+    
+    # Return the minimal start time found
+    return min_start_time
+
+
+# Function to determine the maximal end time for words or utterances
+# Argument:
+# 1. A dictionary of ids with values of (start time, end time)
+# returns the maximal end time
+def getMaximalEndTime(id_dict):
+    
+    # Current maximal end time
+    max_end_time = -1
+    
+    # Go through all entries in the dictionary
+    for entry in id_dict:
+        
+        cur_end_time = id_dict[entry][1]
+        
+        # If no end time has been looked at yet
+        if max_end_time == -1:
+            max_end_time = cur_end_time
+        
+        else:
+            
+            # Is the current end time higher than the highest value seen yet
+            if cur_end_time > max_end_time:
+                
+                # Then take it as the new maximal end time
+                max_end_time = cur_end_time
+    
+    # Return the maximal end time found
+    return max_end_time
+
+
+# Number of intervals that are formatted and written to the output file at once
+INTERVAL_CHUNK_SIZE = 10000
+
+# Supported Praat TextGrid file formats
+# (long text format, short text format, binary format)
+TEXTGRID_FORMATS = ("long", "short", "binary")
+
+# Format of an interval in a Praat TextGrid file in long text format
+INTERVAL_FORMAT = "\t\tintervals [%d]:\n\t\t\txmin = %.3f\n\t\t\txmax = %.3f\n\t\t\ttext = %s\n"
+
+# Format of an interval in a Praat TextGrid file in short text format
+SHORT_INTERVAL_FORMAT = "%.3f\n%.3f\n%s\n"
+
+# Start and end times of an interval in a Praat TextGrid file in binary format
+# (big-endian 64-bit floating point numbers)
+BINARY_TIMES = struct.Struct(">dd")
+
+
+# Function to quote a string for a Praat TextGrid file in short text format
+# Arguments:
+# 1. The string
+# returns the string in double quotes (with double quotes inside the string doubled)
+def quotePraatString(text):
+
+    return "\"" + text.replace("\"", "\"\"") + "\""
+
+
+# Function to encode a string for a Praat TextGrid file in binary format
+# (ASCII strings are preceded by their length, other strings are
+#  marked with the maximal length and written in UTF-16)
+# Arguments:
+# 1. The string
+# 2. The number of bytes used for the length of the string (1 or 2)
+# returns the encoded string as bytes
+def encodePraatBinaryString(text, length_size=2):
+
+    max_length = 0xFF if length_size == 1 else 0xFFFF
+
+    length_format = ">B" if length_size == 1 else ">H"
+
+    is_ascii = all(ord(character) < 128 for character in text)
+
+    if is_ascii:
+        encoded_text = text.encode("ascii")
+        length = len(encoded_text)
+
+    else:
+        encoded_text = text.encode("utf-16-be")
+
+        # The length is given in UTF-16 code units
+        # (characters outside the Basic Multilingual Plane take two)
+        length = len(encoded_text) // 2
+
+    if length >= max_length:
+        print("String too long for a Praat TextGrid file in binary format:", text[:50] + "...")
+        sys.exit()
+
+    if is_ascii:
+        return struct.pack(length_format, length) + encoded_text
+
+    else:
+        return struct.pack(length_format, max_length) + struct.pack(length_format, length) + encoded_text
+
+
+# Function to open the output file for a Praat TextGrid file
+# Arguments:
+# 1. The output file name
+# 2. The output file encoding (not used for the binary format)
+# 3. The TextGrid file format ("long", "short" or "binary")
+# returns the file handle
+def openTextGridFile(output_file_name, output_encoding, textgrid_format="long"):
+
+    if textgrid_format == "binary":
+        return open(output_file_name, "wb")
+
+    else:
+        return codecs.open(output_file_name, "w", output_encoding)
+
+
+# Function to print a Praat TextGrid header
+# Arguments:
+# 1. Filehandle of the file to print to
+# 2. The number of tiers to be printed
+# 3. The start time (usually 0)
+# 4. The end time
+# 5. The sample rate (in order to convert MAU times into seconds)
+# 6. debug level (0 --> no status messages, 1 --> print status messages)
+# 7. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+def printPraatTextGridHeader(file_handle, num_tiers, start_time, end_time, sample_rate, debug_level=0, textgrid_format="long"):
+
+    # Times are given in seconds rounded to three decimal places
+    # ("%.3f" rounds exactly like round(..., 3))
+    if textgrid_format == "binary":
+        file_handle.write(b"ooBinaryFile" + encodePraatBinaryString("TextGrid", 1)
+                          + BINARY_TIMES.pack(round(start_time / sample_rate, 3), round(end_time / sample_rate, 3))
+                          + struct.pack(">Bi", 1, num_tiers))
+
+    elif textgrid_format == "short":
+        file_handle.write("File type = \"ooTextFile\"\n"
+                          "Object class = \"TextGrid\"\n"
+                          "\n"
+                          "%.3f\n"
+                          "%.3f\n"
+                          "<exists>\n"
+                          "%d\n" % (start_time / sample_rate, end_time / sample_rate, num_tiers))
+
+    else:
+        file_handle.write("File type = \"ooTextFile\"\n"
+                          "Object class = \"TextGrid\"\n"
+                          "\n"
+                          "xmin = %.3f\n"
+                          "xmax = %.3f\n"
+                          "tiers? <exists>\n"
+                          "size = %d\n"
+                          "item []:\n" % (start_time / sample_rate, end_time / sample_rate, num_tiers))
+
+    # Print status report
+    if debug_level == 1:
+        print("Printing Praat TextGrid header to output file", file_handle.name)
+
+
+# Function to format the header of an interval tier in a Praat TextGrid file
+# Arguments:
+# 1. The number of the tier in the TextGrid file
+# 2. The name of the tier
+# 3. The start time of the tier
+# 4. The end time of the tier
+# 5. The number of intervals in the tier
+# 6. The sample rate (in order to convert MAU times into seconds)
+# 7. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+# returns the header as a string (or as bytes for the binary format)
+def formatIntervalTierHeader(tier_number, tier_name, start_time, end_time, number_of_intervals, sample_rate, textgrid_format="long"):
+
+    if textgrid_format == "binary":
+        return (encodePraatBinaryString("IntervalTier", 1) + encodePraatBinaryString(tier_name)
+                + BINARY_TIMES.pack(round(start_time / sample_rate, 3), round(end_time / sample_rate, 3))
+                + struct.pack(">i", number_of_intervals))
+
+    elif textgrid_format == "short":
+        return ("\"IntervalTier\"\n"
+                "%s\n"
+                "%.3f\n"
+                "%.3f\n"
+                "%d\n" % (quotePraatString(tier_name), start_time / sample_rate, end_time / sample_rate, number_of_intervals))
+
+    return ("\titem [%d]:\n"
+            "\t\tclass = \"IntervalTier\"\n"
+            "\t\tname = \"%s\"\n"
+            "\t\txmin = %.3f\n"
+            "\t\txmax = %.3f\n"
+            "\t\tintervals: size = %d\n" % (tier_number, tier_name, start_time / sample_rate, end_time / sample_rate, number_of_intervals))
+
+
+# Function to format intervals of an interval tier in a Praat TextGrid file
+# Arguments:
+# 1. A list of intervals as tuples (start_time, end_time, text)
+# 2. The number of the first interval in the tier
+# 3. The sample rate (in order to convert MAU times into seconds)
+# 4. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+# returns the intervals as a string (or as bytes for the binary format)
+def formatIntervals(intervals, first_interval_number, sample_rate, textgrid_format="long"):
+
+    if textgrid_format == "binary":
+        return b"".join([BINARY_TIMES.pack(round(interval_start_time / sample_rate, 3), round(interval_end_time / sample_rate, 3)) + encodePraatBinaryString(interval_text)
+                         for (interval_start_time, interval_end_time, interval_text) in intervals])
+
+    elif textgrid_format == "short":
+        return "".join([SHORT_INTERVAL_FORMAT % (interval_start_time / sample_rate, interval_end_time / sample_rate, quotePraatString(interval_text))
+                        for (interval_start_time, interval_end_time, interval_text) in intervals])
+
+    return "".join([INTERVAL_FORMAT % (interval_number, interval_start_time / sample_rate, interval_end_time / sample_rate, interval_text)
+                    for (interval_number, (interval_start_time, interval_end_time, interval_text)) in enumerate(intervals, first_interval_number)])
+
+
+# Function to write an interval tier to a Praat TextGrid file
+# The intervals are formatted and written in large chunks.
+# Arguments:
+# 1. The file handle
+# 2. The number of the tier in the TextGrid file
+# 3. The name of the tier
+# 4. The start time of the tier
+# 5. The end time of the tier
+# 6. A list of intervals as tuples (start_time, end_time, text)
+# 7. The sample rate (in order to convert MAU times into seconds)
+# 8. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+def writeIntervalTier(file_handle, tier_number, tier_name, start_time, end_time, intervals, sample_rate, textgrid_format="long"):
+
+    # Output header for current tier
+    file_handle.write(formatIntervalTierHeader(tier_number, tier_name, start_time, end_time, len(intervals), sample_rate, textgrid_format))
+
+    # Output the individual intervals
+    for chunk_start in range(0, len(intervals), INTERVAL_CHUNK_SIZE):
+        file_handle.write(formatIntervals(intervals[chunk_start:chunk_start + INTERVAL_CHUNK_SIZE], chunk_start + 1, sample_rate, textgrid_format))
+
+
+# Function to print the UTT(erance) tier
+# Arguments:
+# 1. The file handle
+# 2. The list of UTTERANCES (RID tier) as produced by readBASPartiturFile
+# 3. A dictionary from utterance ids to start and end times
+# 4. A dictionary from word ids to orthographic word forms
+# 5. The number of the tier in the TextGrid file
+# 6. The start time (usually 0)
+# 7. The end time
+# 8. The sample rate (in order to convert MAU times into seconds)
+# 9. debug level (0 --> no status messages, 1 --> print status messages)
+def printUTT(file_handle, utterance_list, utterance_times, word_dict, tier_number, start_time, end_time, sample_rate, debug_level=0, textgrid_format="long"):
+    
+    # Print status report
+    if debug_level == 1:
+        print("Printing UTT (utterances) tier.")
+
+    # Collect the intervals
+    intervals = []
+
+    # Go through the list of utterances
+    for (utterance_id, word_ids) in utterance_list:
+
+        # Look up the utterance start and end times
+        if utterance_id not in utterance_times:
+            print("Could not determine utterance start and end times for utterance", utterance_id)
+            sys.exit()
+
+        # Look up the words in the utterance
+        words = []
+        for word_id in word_ids:
+            
+            # Look up the word_id in the dictionary
+            if word_id in word_dict:
+                words.append(word_dict[word_id])
+            
+            else:
+                print("Could not found orthographic form of word id", word_id)
+                sys.exit()
+        
+        # Combine words into utterance text
+        utterance_text = " ".join(words)
+
+        (utterance_start_time, utterance_end_time) = utterance_times[utterance_id]
+        intervals.append((utterance_start_time, utterance_end_time, utterance_text))
+
+    writeIntervalTier(file_handle, tier_number, "UTT", start_time, end_time, intervals, sample_rate, textgrid_format)
+
+
+# Function to collect the intervals of the words in an ORT or KAN tier
+# Arguments:
+# 1. The list of ORT or KAN words as produced by readBASPartiturFile
+# 2. A dictionary from word ids to start and end times
+# returns a list of intervals as tuples (start_time, end_time, text)
+def makeWordIntervals(word_list, word_times):
+
+    intervals = []
+
+    # Go through the list of words
+    for (word_id, word) in word_list:
+
+        # Look up the word start and end times
+        if word_id not in word_times:
+            print("Could not determine word start and end times for word", word_id)
+            sys.exit()
+
+        (word_start_time, word_end_time) = word_times[word_id]
+        intervals.append((word_start_time, word_end_time, word))
+
+    return intervals
+
+
+# Function to print the ORT(hography) tier
+# Arguments:
+# 1. The file handle
+# 2. The list of ORT words as produced by readBASPartiturFile
+# 3. A dictionary from word ids to start and end times
+# 4. The number of the tier in the TextGrid file
+# 5. The start time (usually 0)
+# 6. The end time
+# 7. The sample rate (in order to convert MAU times into seconds)
+# 8. debug level (0 --> no status messages, 1 --> print status messages)
+def printORT(file_handle, ort_list, word_times, tier_number, start_time, end_time, sample_rate, debug_level=0, textgrid_format="long"):
+    
+    # Print status report
+    if debug_level == 1:
+        print("Printing ORT (orthography) tier.")
+
+    writeIntervalTier(file_handle, tier_number, "ORT", start_time, end_time, makeWordIntervals(ort_list, word_times), sample_rate, textgrid_format)
+
+
+# Function to print the KAN (canonical transcription) tier
+# Arguments:
+# 1. The file handle
+# 2. The list of KAN words as produced by readBASPartiturFile
+# 3. A dictionary from word ids to start and end times
+# 4. The number of the tier in the TextGrid file
+# 5. The start time (usually 0)
+# 6. The end time
+# 7. The sample rate (in order to convert MAU times into seconds)
+# 8. debug level (0 --> no status messages, 1 --> print status messages)
+def printKAN(file_handle, kan_list, word_times, tier_number, start_time, end_time, sample_rate, debug_level=0, textgrid_format="long"):
+    
+    # Print status report
+    if debug_level == 1:
+        print("Printing KAN (canonical transcription) tier.")
+
+    writeIntervalTier(file_handle, tier_number, "KAN", start_time, end_time, makeWordIntervals(kan_list, word_times), sample_rate, textgrid_format)
+
+
+# Function to print the MAU (time-aligned phoneme) tier
+# Arguments:
+# 1. The file handle
+# 2. The list of MAU phonemes as produced by readBASPartiturFile
+# 3. The number of the tier in the TextGrid file
+# 4. The start time (usually 0)
+# 5. The end time
+# 6. The sample rate (in order to convert MAU times into seconds)
+# 7. debug level (0 --> no status messages, 1 --> print status messages)
+def printMAU(file_handle, mau_list, tier_number, start_time, end_time, sample_rate, debug_level=0, textgrid_format="long"):
+    
+    # Print status report
+    if debug_level == 1:
+        print("Printing MAU (time-aligned phoneme) tier.")
+
+    # Collect the intervals
+    intervals = [(int(start), int(start) + int(duration), phoneme) for (start, duration, word_id, phoneme) in mau_list]
+
+    writeIntervalTier(file_handle, tier_number, "MAU", start_time, end_time, intervals, sample_rate, textgrid_format)
+
+
+# Function to write the tiers of a BAS Partitur file with a MAU tier
+# to a Praat TextGrid file
+# Arguments:
+# 1. The output file name
+# 2. The tiers as produced by parse_partitur
+# 3. A dictionary from word ids to start and end times
+# 4. A dictionary from utterance ids to start and end times
+# 5. The sample rate (in order to convert MAU times into seconds)
+# 6. The output file encoding (defaults to utf-8, not used for the binary format)
+# 7. debug level (0 --> no status messages, 1 --> print status messages)
+# 8. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+def write_textgrid(output_file_name, tiers, word_times, utterance_times, sample_rate, output_encoding="utf-8", debug_level=0, textgrid_format="long"):
+
+    # Unpack tiers
+    ort_tier = tiers["ORT"]
+    kan_tier = tiers["KAN"]
+    rid_tier = tiers["RID"]
+    mau_tier = tiers["MAU"]
+
+    # Determine start time of the first word and the end time of the last word
+    min_word_start_time = getMinimalStartTime(word_times)
+    max_word_end_time = getMaximalEndTime(word_times)
+
+    # Determine start time of the first utterance and the end time of the last utterance
+    min_utterance_start_time = getMinimalStartTime(utterance_times)
+    max_utterance_end_time = getMaximalEndTime(utterance_times)
+
+    # Make a dictionary from word ids to word forms
+    word_dict = makeWordDictionary(ort_tier)
+
+    # Create output file
+    output_file = openTextGridFile(output_file_name, output_encoding, textgrid_format)
+
+    # Determine absolute start and end times
+    # Start time of the first phoneme
+    first_phoneme = mau_tier[0]
+    absolute_start_time = int(first_phoneme[0])
+    last_phoneme = mau_tier[-1]
+    absolute_end_time = int(last_phoneme[0]) + int(last_phoneme[1])
+
+    # Print Praat TextGrid header
+    printPraatTextGridHeader(output_file, start_time = absolute_start_time, end_time = absolute_end_time, num_tiers = 4, sample_rate = sample_rate, debug_level = debug_level, textgrid_format = textgrid_format)
+
+    # Print utterance tier (UTT)
+    printUTT(output_file, rid_tier, utterance_times, word_dict, tier_number = 1, start_time = min_utterance_start_time, end_time = max_utterance_end_time, sample_rate = sample_rate, debug_level = debug_level, textgrid_format = textgrid_format)
+
+    # Print orthography tier (ORT)
+    printORT(output_file, ort_tier, word_times, tier_number = 2, start_time = min_word_start_time, end_time = max_word_end_time, sample_rate = sample_rate, debug_level = debug_level, textgrid_format = textgrid_format)
+
+    # Print canonical transcription tier (KAN)
+    printKAN(output_file, kan_tier, word_times, tier_number = 3, start_time = min_word_start_time, end_time = max_word_end_time, sample_rate = sample_rate, debug_level = debug_level, textgrid_format = textgrid_format)
+
+    # Print automatically time-aligned phoneme tier (MAU)
+    printMAU(output_file, mau_tier, tier_number = 4, start_time = absolute_start_time, end_time = absolute_end_time, sample_rate = sample_rate, debug_level = debug_level, textgrid_format = textgrid_format)
+
+    # Close output file
+    output_file.close()
+
+
+# Function to write intervals to a temporary spill file in chunks
+# Arguments:
+# 1. The spill file
+# 2. The list of intervals collected so far (emptied when a chunk is written)
+# 3. The number of intervals already written to the spill file
+# 4. The sample rate (in order to convert MAU times into seconds)
+# 5. Whether to write the intervals even if the chunk is not full (defaults to False)
+# 6. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+# returns the number of intervals written to the spill file
+def spillIntervals(spill_file, intervals, number_of_intervals, sample_rate, force=False, textgrid_format="long"):
+
+    if len(intervals) >= INTERVAL_CHUNK_SIZE or (force and len(intervals) > 0):
+        spill_file.write(formatIntervals(intervals, number_of_intervals + 1, sample_rate, textgrid_format))
+        number_of_intervals += len(intervals)
+        del intervals[:]
+
+    return number_of_intervals
+
+
+# Function to convert a BAS Partitur file with a MAU tier to a Praat TextGrid file
+# without keeping the tiers in memory
+#
+# The MAU tier is read one line at a time and its intervals are written
+# to a temporary spill file, as are the intervals of the ORT, KAN and UTT tiers.
+# Only the word and utterance start and end times and the orthographic words
+# are kept in memory. Once the sizes and start and end times of all tiers are known,
+# the headers are written to the output file followed by the contents of the spill files.
+# The output is identical to that of write_textgrid.
+# Arguments:
+# 1. The name of the input BAS Partitur file with MAU tier
+# 2. The name of the original BAS Partitur file
+# 3. The name of the output Praat TextGrid file
+# 4. The sample rate (in order to convert MAU times into seconds)
+# 5. The encoding of the BAS Partitur file with MAU tier (defaults to utf-8)
+# 6. The encoding of the original BAS Partitur file (defaults to utf-8)
+# 7. The output file encoding (defaults to utf-8, not used for the binary format)
+# 8. debug level (0 --> no status messages, 1 --> print status messages)
+# 9. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+def stream_textgrid(input_file_name, original_file_name, output_file_name, sample_rate, input_encoding="utf-8", original_encoding="utf-8", output_encoding="utf-8", debug_level=0, textgrid_format="long"):
+
+    # Temporary spill files for the intervals of the four tiers
+    if textgrid_format == "binary":
+        spill_files = dict((tier_name, tempfile.TemporaryFile("w+b"))
+                           for tier_name in ("UTT", "ORT", "KAN", "MAU"))
+
+    else:
+        spill_files = dict((tier_name, tempfile.TemporaryFile("w+", encoding="utf-8", newline=""))
+                           for tier_name in ("UTT", "ORT", "KAN", "MAU"))
+
+    # Print status message
+    if debug_level == 1:
+        print("Reading MAU tier from BAS Partitur file", input_file_name)
+
+    # Go through the MAU tier
+    word_times = {}
+
+    mau_intervals = []
+    number_of_phonemes = 0
+
+    absolute_start_time = None
+    absolute_end_time = None
+
+    for (tier_name, (start, duration, word_id, phoneme)) in iterBASPartiturFile(input_file_name, input_encoding, ("MAU",)):
+
+        phoneme_start_time = int(start)
+        phoneme_end_time = phoneme_start_time + int(duration)
+
+        # The TextGrid starts with the first phoneme and ends with the last phoneme
+        if absolute_start_time is None:
+            absolute_start_time = phoneme_start_time
+
+        absolute_end_time = phoneme_end_time
+
+        # Combine phoneme start and end times into word start and end times
+        # (ignoring pauses, etc.)
+        if word_id != "-1":
+
+            if word_id in word_times:
+                (old_start_time, old_end_time) = word_times[word_id]
+                word_times[word_id] = (min(old_start_time, phoneme_start_time), max(old_end_time, phoneme_end_time))
+
+            else:
+                word_times[word_id] = (phoneme_start_time, phoneme_end_time)
+
+        mau_intervals.append((phoneme_start_time, phoneme_end_time, phoneme))
+        number_of_phonemes = spillIntervals(spill_files["MAU"], mau_intervals, number_of_phonemes, sample_rate, False, textgrid_format)
+
+    number_of_phonemes = spillIntervals(spill_files["MAU"], mau_intervals, number_of_phonemes, sample_rate, True, textgrid_format)
+
+    if absolute_start_time is None:
+        print("Could not find a MAU tier in BAS Partitur file", input_file_name)
+        sys.exit()
+
+    # Print status message
+    if debug_level == 1:
+        print("Reading ORT, KAN, and RID tiers from BAS Partitur file", original_file_name)
+
+    # Go through the ORT, KAN and RID tiers
+    word_dict = {}
+    utterance_list = []
+
+    intervals = {"ORT": [], "KAN": []}
+    number_of_intervals = {"ORT": 0, "KAN": 0}
+
+    for (tier_name, entry) in iterBASPartiturFile(original_file_name, original_encoding, ("ORT", "KAN", "RID")):
+
+        # The utterances are processed once all words are known
+        if tier_name == "RID":
+            utterance_list.append(entry)
+            continue
+
+        (word_id, word) = entry
+
+        # Keep the orthographic forms of words for the utterance tier
+        if tier_name == "ORT":
+            word_dict[word_id] = word
+
+        # Look up the word start and end times
+        if word_id not in word_times:
+            print("Could not determine word start and end times for word", word_id)
+            sys.exit()
+
+        (word_start_time, word_end_time) = word_times[word_id]
+        intervals[tier_name].append((word_start_time, word_end_time, word))
+        number_of_intervals[tier_name] = spillIntervals(spill_files[tier_name], intervals[tier_name], number_of_intervals[tier_name], sample_rate, False, textgrid_format)
+
+    for tier_name in ("ORT", "KAN"):
+        number_of_intervals[tier_name] = spillIntervals(spill_files[tier_name], intervals[tier_name], number_of_intervals[tier_name], sample_rate, True, textgrid_format)
+
+    # Combine word start and end times into utterance start and end times
+    utterance_times = combineWordsIntoUtterances(utterance_list, word_times, True, debug_level)
+
+    # Go through the utterances
+    utterance_intervals = []
+    number_of_intervals["UTT"] = 0
+
+    for (utterance_id, word_ids) in utterance_list:
+
+        # Look up the words in the utterance
+        words = []
+        for word_id in word_ids:
+
+            # Look up the word_id in the dictionary
+            if word_id in word_dict:
+                words.append(word_dict[word_id])
+
+            else:
+                print("Could not found orthographic form of word id", word_id)
+                sys.exit()
+
+        (utterance_start_time, utterance_end_time) = utterance_times[utterance_id]
+        utterance_intervals.append((utterance_start_time, utterance_end_time, " ".join(words)))
+        number_of_intervals["UTT"] = spillIntervals(spill_files["UTT"], utterance_intervals, number_of_intervals["UTT"], sample_rate, False, textgrid_format)
+
+    number_of_intervals["UTT"] = spillIntervals(spill_files["UTT"], utterance_intervals, number_of_intervals["UTT"], sample_rate, True, textgrid_format)
+    number_of_intervals["MAU"] = number_of_phonemes
+
+    # Determine the start and end times of the tiers
+    min_word_start_time = getMinimalStartTime(word_times)
+    max_word_end_time = getMaximalEndTime(word_times)
+
+    tier_times = {"UTT": (getMinimalStartTime(utterance_times), getMaximalEndTime(utterance_times)),
+                  "ORT": (min_word_start_time, max_word_end_time),
+                  "KAN": (min_word_start_time, max_word_end_time),
+                  "MAU": (absolute_start_time, absolute_end_time)}
+
+    # Create output file
+    output_file = openTextGridFile(output_file_name, output_encoding, textgrid_format)
+
+    # Print Praat TextGrid header
+    printPraatTextGridHeader(output_file, start_time = absolute_start_time, end_time = absolute_end_time, num_tiers = 4, sample_rate = sample_rate, debug_level = debug_level, textgrid_format = textgrid_format)
+
+    # Print the tiers by copying the spill files into the output file
+    for (tier_number, tier_name) in enumerate(("UTT", "ORT", "KAN", "MAU"), 1):
+
+        # Print status report
+        if debug_level == 1:
+            print("Printing", tier_name, "tier.")
+
+        (start_time, end_time) = tier_times[tier_name]
+        output_file.write(formatIntervalTierHeader(tier_number, tier_name, start_time, end_time, number_of_intervals[tier_name], sample_rate, textgrid_format))
+
+        spill_files[tier_name].seek(0)
+        shutil.copyfileobj(spill_files[tier_name], output_file)
+        spill_files[tier_name].close()
+
+    # Close output file
+    output_file.close()
+
+
+# Function to convert a BAS Partitur file with a MAU tier to a Praat TextGrid file
+# Arguments:
+# 1. The name of the input BAS Partitur file with MAU tier
+# 2. The name of the original BAS Partitur file
+# 3. The name of the output Praat TextGrid file
+# 4. The sample rate (in order to convert MAU times into seconds)
+# 5. The encoding of the BAS Partitur file with MAU tier (defaults to utf-8)
+# 6. The encoding of the original BAS Partitur file (defaults to utf-8)
+# 7. The output file encoding (defaults to utf-8, not used for the binary format)
+# 8. debug level (0 --> no status messages, 1 --> print status messages)
+# 9. Whether to use stream_textgrid in order to save memory (defaults to False)
+# 10. The TextGrid file format ("long", "short" or "binary", defaults to "long")
+def mau_to_textgrid(input_file_name, original_file_name, output_file_name, sample_rate, input_encoding="utf-8", original_encoding="utf-8", output_encoding="utf-8", debug_level=0, streaming=False, textgrid_format="long"):
+
+    if textgrid_format not in TEXTGRID_FORMATS:
+        print("Unknown Praat TextGrid file format:", textgrid_format)
+        sys.exit()
+
+    # Print status report
+    if debug_level == 1:
+        print("Converting BAS Partitur file", input_file_name, "to Praat TextGrid file", output_file_name, "using the ORT, KAN, and RID tiers from", original_file_name + ".")
+
+    # Convert the files without keeping the tiers in memory
+    if streaming:
+        stream_textgrid(input_file_name, original_file_name, output_file_name, sample_rate, input_encoding, original_encoding, output_encoding, debug_level, textgrid_format)
+        return
+
+    # Read in the original BAS Partitur file and the MAU tier
+    tiers = parse_partitur(original_file_name, input_file_name, original_encoding, input_encoding, debug_level)
+
+    # Combine phoneme start and end times into word and utterance start and end times
+    (word_times, utterance_times) = mau_to_word_times(tiers, True, debug_level)
+
+    # Write the Praat TextGrid file
+    write_textgrid(output_file_name, tiers, word_times, utterance_times, sample_rate, output_encoding, debug_level, textgrid_format)
@@ -0,0 +1,605 @@
+# encoding=utf-8
+
+# Functions for adding the time information from a BAS Partitur file
+# with a MAU tier to a Toolbox file
+
+# Codecs for handling character encodings
+import codecs
+
+import sys
+
+# Functions for reading BAS Partitur files
+from langdocmaus.partitur import makeUtteranceDictionary
+from langdocmaus.partitur import makeWordDictionary
+from langdocmaus.partitur import mau_to_word_times
+from langdocmaus.partitur import parse_partitur
+
+# Functions for reading Toolbox files
+from langdocmaus.toolbox import getOriginalUtteranceTimes
+from langdocmaus.toolbox import readToolboxFile
+
+# Functions for converting time codes
+from langdocmaus.timecode import timecode2seconds
+
+
+# Function to annotate an original Toolbox file with additional time information
+# Only the reference tiers and the utterance start and end tiers are looked at
+# individually, all other lines are copied to the output file in bulk.
+# Arguments:
+# 1. The output file name
+# 2. The output file encoding
+# 3. The original Toolbox file as read in by readToolboxFile
+# 4. The record index of the original Toolbox file as produced by readToolboxFile
+# 5. The name of the reference tier
+# 6. Whether to keep the original utterance start and end times or not (Boolean)
+# 7. Whether to output word start and end times or not (Boolean)
+# 8. The utterance start and end times (as a dictionary from utterance id to (start, end)
+# 9. The Toolbox marker for utterance start times
+# 10. The Toolbox marker for utterance end times
+# 11. The word start and end times (as a dictionary from word id to (start, end)
+# 12. The Toolbox marker for word start times
+# 13. The Toolbox marker for word end times
+# 14. A dictionary from utterance ids to word ids contained in them as produced by makeUtteranceDictionary
+# 15. A dictionary from utterance ids to the original utterance start and end times
+# 16. The sample rate to be used to convert samples to seconds
+def annotateOriginalToolboxFile(output_file_name, output_encoding, original_toolbox_file, record_index, reference_tier_name, keep_utterance_times, output_word_times, utterance_times, utterance_start_marker, utterance_end_marker, word_times, word_start_marker, word_end_marker, utterance_dict, original_utterance_times_dict, sample_rate):
+
+    # Check that the reference marker actually occurs in the file
+    if len(record_index["records"]) == 0:
+        print("The supplied reference tier marker", reference_tier_name, "does not occur in the original Toolbox file.")
+        sys.exit()
+
+    # Remember whether utterance times were output
+    utterance_times_output = True
+    cur_utterance_id = None
+
+    # Open the output file
+    output_file = codecs.open(output_file_name, "w", output_encoding)
+    
+    # Go through the lines before the first record and all records in the original Toolbox file
+    for record in [record_index["header"]] + record_index["records"]:
+
+        # Number of the next line to be output
+        next_line = record["first_line"]
+
+        # The output lines of the record are written at once
+        output_lines = []
+
+        # Remember start time of first word and end time of last word
+        # to perform sanity checks
+        first_word_start_time = None
+        last_word_end_time = None
+
+        # Flags indicating whether utterance times have been output
+        utterance_start_time_seconds = None
+        utterance_end_time_seconds = None
+
+        # Each record starts with the reference tier
+        if record is not record_index["header"]:
+
+            # Unpack line contents
+            (cur_toolbox_marker, cur_line, cur_line_ending) = original_toolbox_file[record["first_line"]]
+            next_line += 1
+
+            # Only utterance start time or utterance end time were output
+            # but not both
+            if utterance_times_output == "start" or utterance_times_output == "end":
+                
+                utterance_times_output = False
+            
+            # Check whether utterance times were output for preceding utterance
+            if utterance_times_output is False and cur_utterance_id is not None:
+                
+                print("Could not output any utterance times for utterance", cur_utterance_id)
+#                sys.exit()
+            
+            # No utterance times output for current utterance yet
+            utterance_times_output = False
+
+            # The contents of the reference tier were extracted by readToolboxFile
+            cur_utterance_id = record["id"]
+
+            if cur_utterance_id is None:
+
+                print("Something is wrong. I cannot extract the reference from the reference tier in line " + str(record["first_line"] + 1) +".")
+                print(original_toolbox_file[record["first_line"]])
+                sys.exit()
+            
+            # Output the current reference tier line
+            output_lines.append(cur_line)
+            
+            # Try to find the utterance id in the dictionary with utterance
+            # start and end times
+            if cur_utterance_id in utterance_times:
+
+                utterance_start_time = utterance_times[cur_utterance_id][0]
+                utterance_end_time = utterance_times[cur_utterance_id][1]
+                
+                # Calculate start time in seconds
+                utterance_start_time_seconds = round(utterance_start_time / sample_rate, 3)
+    
+                # Calculate end time in seconds
+                utterance_end_time_seconds = round(utterance_end_time / sample_rate, 3)
+                
+                # If the original utterance are to be overwritten
+                if keep_utterance_times is False:
+
+                    # Output the current utterance start time
+                    output_line = "\\" + utterance_start_marker + " " + "%.3f" % utterance_start_time_seconds + cur_line_ending
+                    output_lines.append(output_line)
+            
+                    # Output the current utterance end time
+                    output_line = "\\" + utterance_end_marker + " " + "%.3f" % utterance_end_time_seconds + cur_line_ending
+                    output_lines.append(output_line)
+                    
+                    # Remember that utterance times were output for current utterance
+                    utterance_times_output = True
+
+                # If word times should be output, too
+                if output_word_times:
+
+                    # Could all word times be output
+                    erroneous_unit = False
+                                    
+                    # Look up word ids
+                    if cur_utterance_id in utterance_dict:
+                        
+                        cur_words = utterance_dict[cur_utterance_id]
+                        
+                        # Lists of word start and end times
+                        word_start_times = []
+                        word_end_times = []
+                    
+                        # Go through words
+                        for word in cur_words:
+                        
+                            # Look up that word's start and end times
+                            if word in word_times:
+                                
+                                word_start_time = word_times[word][0]
+                                word_end_time = word_times[word][1]
+                            
+                                # Calculate start time in seconds
+                                word_start_time_seconds = round(word_start_time / sample_rate, 3)
+                            
+                                # Calculate end time in seconds
+                                word_end_time_seconds = round(word_end_time / sample_rate, 3)
+                            
+                                # Add them to the lists after converting them to strings
+                                word_start_times.append("%.3f" % word_start_time_seconds)
+                                word_end_times.append("%.3f" % word_end_time_seconds)
+                                
+                                # Remember word times for sanity checks
+                                if first_word_start_time is None:
+                                    
+                                    first_word_start_time = word_start_time_seconds
+                                
+                                last_word_end_time = word_end_time_seconds
+                        
+                            else:
+                                
+                                print("Could not find word start or end time for word", word + ".")
+                                erroneous_unit = True
+                        
+                        # All word times were output correctly?
+                        if erroneous_unit is False:
+
+                            # Output the start times of the words in the current utterance
+                            output_line = "\\" + word_start_marker + " " + " ".join(word_start_times) + cur_line_ending
+                            output_lines.append(output_line)
+
+                            # Output the end times of the words in the current utterance
+                            output_line = "\\" + word_end_marker + " " + " ".join(word_end_times) + cur_line_ending
+                            output_lines.append(output_line)
+
+                        # Output regular intervals
+                        else:
+
+                            if cur_utterance_id in original_utterance_times_dict:
+                                
+                                if "start" in original_utterance_times_dict[cur_utterance_id] and "end" in original_utterance_times_dict[cur_utterance_id]:
+
+                                    original_utterance_start_time_seconds = original_utterance_times_dict[cur_utterance_id]["start"]
+                                    original_utterance_end_time_seconds = original_utterance_times_dict[cur_utterance_id]["end"]
+                                
+                                else:
+                                    
+                                    print("Could not determine original utterance start and end times for erroneous utterance", cur_utterance_id)
+                                    sys.exit()
+                                                                        
+                            else:
+                                    
+                                print("Could not determine original utterance start and end times for erroneous utterance", cur_utterance_id)
+                                sys.exit()
+                                
+
+                            number_of_words = len(cur_words)
+                            utterance_length = original_utterance_end_time_seconds - original_utterance_start_time_seconds
+                            word_length = utterance_length/number_of_words
+
+                            word_start_times = []
+                            word_end_times = []
+                            
+                            for index in range(number_of_words):
+                                
+                                word_start_time_seconds = original_utterance_start_time_seconds + index * word_length + 0.010
+                                word_end_time_seconds = original_utterance_start_time_seconds + (index + 1) * word_length - 0.010
+
+                                # Add them to the lists after converting them to strings
+                                word_start_times.append("%.3f" % word_start_time_seconds)
+                                word_end_times.append("%.3f" % word_end_time_seconds)
+                            
+                            # Output the start times of the words in the current utterance
+                            output_line = "\\" + word_start_marker + " " + " ".join(word_start_times) + cur_line_ending
+                            output_lines.append(output_line)
+
+                            # Output the end times of the words in the current utterance
+                            output_line = "\\" + word_end_marker + " " + " ".join(word_end_times) + cur_line_ending
+                            output_lines.append(output_line)
+                            
+                            print("Outputting regular intervals for utterance", cur_utterance_id)
+                        
+                        if (keep_utterance_times is False) and (utterance_start_time_seconds is not None) and (utterance_end_time_seconds is not None):
+                        
+                            if utterance_start_time_seconds > first_word_start_time:
+                            
+                                print("Start time of first word in the utterance is before start time of the utterance.")
+                                print("Start time of utterance:", utterance_start_time_seconds)
+                                print("Start time of first word:", first_word_start_time)
+                                sys.exit()
+
+                            if utterance_end_time_seconds < last_word_end_time:
+                            
+                                print("End time of last word in the utterance is after end time of the utterance.")
+                                print("End time of utterance:", utterance_end_time_seconds)
+                                print("End time of last word:", last_word_end_time)
+                                sys.exit()
+
+                    else:
+                        
+                        print("No word times output for empty utterance", cur_utterance_id)
+
+            else:
+ 
+                # Utterance contains no words
+                if cur_utterance_id not in utterance_dict:
+                    
+                    utterance_start_time_seconds = None
+                    utterance_end_time_seconds = None
+                    
+                    # Warning
+                    print("Warning: Could not determine utterance start and end times for empty utterance", cur_utterance_id)
+                    print("Will keep original start and end times if present.")
+                
+                else:
+                    
+                    print("Could not determine utterance start and end times for utterance", cur_utterance_id)
+                    sys.exit()
+
+        # Lines with utterance start and end markers
+        marker_lines = sorted(record["markers"].get(utterance_start_marker, []) + record["markers"].get(utterance_end_marker, []))
+
+        for marker_line in marker_lines:
+
+            # Output the lines before the marker unchanged
+            output_lines.extend([line[1] for line in original_toolbox_file[next_line:marker_line]])
+            next_line = marker_line + 1
+
+            # Unpack line contents
+            (cur_toolbox_marker, cur_line, cur_line_ending) = original_toolbox_file[marker_line]
+
+            # Normally ignore the original utterance start and end markers
+            # unless the current utterance is empty
+            
+            # Current utterance seems to be empty
+            # Therefore output original utterance start or end
+            # marker anyway
+            if keep_utterance_times is True or utterance_times_output is not True:
+                
+                output_lines.append(cur_line)
+                
+                # Check that word times are within utterance times
+                if cur_toolbox_marker == utterance_start_marker:
+                    
+                    cur_line_contents = cur_line.strip().split()[-1]
+                    
+                    try:
+                        
+                        utterance_start_time_seconds = timecode2seconds(cur_line_contents)
+                    
+                    except:
+                        
+                        print("Could not determine utterance start time from existing utterance time tier.")
+                        print("Current utterance", cur_utterance_id)
+                        print(cur_line)
+                        sys.exit()
+                    
+                    if first_word_start_time is not None:
+                        
+                        if utterance_start_time_seconds > first_word_start_time:
+                        
+                            print("Start time of first word in the utterance is before start time of the utterance.")
+                            print("Start time of utterance:", utterance_start_time_seconds)
+                            print("Start time of first word:", first_word_start_time)
+                            sys.exit()
+                    
+                    # Remember that utterance times were output for current utterance
+                    if utterance_times_output == "end":
+                        
+                        utterance_times_output = True
+                    
+                    else:
+                        
+                        utterance_times_output = "start"
+
+                if cur_toolbox_marker == utterance_end_marker:
+
+                    cur_line_contents = cur_line.strip().split()[-1]
+                    
+                    try:
+                        
+                        utterance_end_time_seconds = timecode2seconds(cur_line_contents)
+                    
+                    except:
+                        
+                        print("Could not determine utterance end time from existing utterance time tier.")
+                        print("Current utterance", cur_utterance_id)
+                        print(cur_line)
+                        sys.exit()
+                    
+                    if last_word_end_time is not None:
+                        
+                        if utterance_end_time_seconds < last_word_end_time:
+                        
+                            print("End time of last word in the utterance is after end time of the utterance.")
+                            print("End time of utterance:", utterance_end_time_seconds)
+                            print("End time of last word:", last_word_end_time)
+                            sys.exit()
+
+                    # Remember that utterance times were output for current utterance
+                    if utterance_times_output == "start":
+                        
+                        utterance_times_output = True
+                    
+                    else:
+                        
+                        utterance_times_output = "end"
+
+        # Output the remaining lines of the record unchanged
+        output_lines.extend([line[1] for line in original_toolbox_file[next_line:record["end_line"]]])
+
+        output_file.write("".join(output_lines))
+
+    # Close the output file
+    output_file.close()
+
+
+# Function to write a new Toolbox file from scratch
+# Arguments:
+# 1. The output file name
+# 2. The output file encoding
+# 3. The name of the reference tier
+# 4. The name of the text tier
+# 5. The name of the Toolbox database type
+# 6. Whether to output word start and end times or not (Boolean)
+# 7. The utterances from the BAS Partitur file (RID tier) as read in by readBASPartiturFile
+# 8. The utterance start and end times (as a dictionary from utterance id to (start, end)
+# 9. The Toolbox marker for utterance start times
+# 10. The Toolbox marker for utterance end times
+# 11. The word start and end times (as a dictionary from word id to (start, end)
+# 12. The Toolbox marker for word start times
+# 13. The Toolbox marker for word end times
+# 14. A dictionary from word ids to orthographic word forms
+# 15. The sample rate to be used to convert samples to seconds
+def writeNewToolboxFile(output_file_name, output_encoding, reference_tier_name, text_tier_name, toolbox_type, output_word_times, utterances, utterance_times, utterance_start_marker, utterance_end_marker, word_times, word_start_marker, word_end_marker, word_dict, sample_rate):
+
+    # Open the output file
+    output_file = codecs.open(output_file_name, "w", output_encoding)
+    
+    # Use Windows line endings \r\n throughout because Toolbox
+    # is a Windows program
+    
+    # Write the Toolbox header: the Shoebox/Toolbox standard format marker \_sh,
+    # the format version, a number kept at 400 as in the files written so far
+    # (Toolbox finds the database type by its name) and the database type
+    output_line = "\\_sh v3.0  400  " + toolbox_type + "\r\n"
+    output_file.write(output_line)
+    
+    # Output empty line
+    output_file.write("\r\n")
+    
+    # Go through all utterances
+    for utterance in utterances:
+        
+        # Unpack values
+        (utterance_id, words) = utterance
+        
+        # Output the reference tier with the utterance ID
+        output_line = "\\" + reference_tier_name + " " + utterance_id + "\r\n"
+        output_file.write(output_line)
+        
+        # Output the utterance start and end time
+        if utterance_id in utterance_times:
+            utterance_start_time = utterance_times[utterance_id][0]
+            utterance_end_time = utterance_times[utterance_id][1]
+            
+            # Calculate start time in seconds
+            utterance_start_time_seconds = round(utterance_start_time / sample_rate, 3)
+            
+            # Calculate end time in seconds
+            utterance_end_time_seconds = round(utterance_end_time / sample_rate, 3)
+
+            # Output the current utterance start time
+            output_line = "\\" + utterance_start_marker + " " + "%.3f" % utterance_start_time_seconds + "\r\n"
+            output_file.write(output_line)
+            
+            # Output the current utterance end time
+            output_line = "\\" + utterance_end_marker + " " + "%.3f" % utterance_end_time_seconds + "\r\n"
+            output_file.write(output_line)
+
+        else:
+
+            print("Could not determine utterance start and end times for utterance", utterance_id)
+            sys.exit()
+        
+        # Build information about the words in the utterance
+        word_forms = []
+
+        for word in words:
+            
+            # Look up the word form
+            if word in word_dict:
+                word_form = word_dict[word]
+                word_forms.append(word_form.strip())
+            
+            else:
+                print("Could not determine orthographic word form for word", word + ".")
+                sys.exit()
+
+        # Build text tier line
+        text_line = "\\" + text_tier_name + " " + " ".join(word_forms) + "\r\n"
+        
+        # Output the text tier directly if no word start and end times
+        # are output
+        if output_word_times is False:
+            
+            # Output empty line
+            output_file.write("\r\n")
+            
+            # Output text tier
+            output_file.write(text_line)
+        
+        # Should word start and end times also be output?
+        else:
+
+            word_start_times = []
+            word_end_times = []
+            
+            for word in words:
+                
+                # Look up the start and end times
+                if word in word_times:
+                    
+                    word_start_time = word_times[word][0]
+                    word_end_time = word_times[word][1]
+                
+                    # Calculate start time in seconds
+                    word_start_time_seconds = round(word_start_time / sample_rate, 3)
+                
+                    # Calculate end time in seconds
+                    word_end_time_seconds = round(word_end_time / sample_rate, 3)
+                
+                    # Add them to the lists after converting them to strings
+                    word_start_times.append("%.3f" % word_start_time_seconds)
+                    word_end_times.append("%.3f" % word_end_time_seconds)
+
+                else:
+
+                    print("Could not find word start or end time for word", word + ".")
+                    sys.exit()
+            
+            # Output tiers for word start and end times
+            output_line = "\\" + word_start_marker + " " + " ".join(word_start_times) + "\r\n"
+            output_file.write(output_line)
+            output_line = "\\" + word_end_marker + " " + " ".join(word_end_times) + "\r\n"
+            output_file.write(output_line)
+                
+            # Output empty line
+            output_file.write("\r\n")
+                
+            # Output text tier
+            output_file.write(text_line)
+
+        # Output empty lines
+        output_file.write("\r\n")
+        output_file.write("\r\n")
+    
+    # Close the output file
+    output_file.close()
+
+
+# Function to add the time information to an original Toolbox file
+# Arguments:
+# 1. The output file name
+# 2. The name of the original Toolbox file
+# 3. The tiers as produced by parse_partitur
+# 4. A dictionary from word ids to start and end times
+# 5. A dictionary from utterance ids to start and end times
+# 6. The sample rate to be used to convert samples to seconds
+# 7. The name of the reference tier (defaults to ref)
+# 8. Whether to keep the original utterance start and end times or not (Boolean)
+# 9. Whether to output word start and end times or not (Boolean)
+# 10. The Toolbox marker for utterance start times (defaults to ELANBegin)
+# 11. The Toolbox marker for utterance end times (defaults to ELANEnd)
+# 12. The Toolbox marker for word start times (defaults to WordBegin)
+# 13. The Toolbox marker for word end times (defaults to WordEnd)
+# 14. The encoding of the original Toolbox file (defaults to utf-8)
+# 15. The output file encoding (defaults to utf-8)
+# 16. debug level (0 --> no status messages, 1 --> print status messages)
+def annotate_toolbox(output_file_name, original_toolbox_file_name, tiers, word_times, utterance_times, sample_rate, reference_tier_name="ref", keep_utterance_times=False, output_word_times=False, utterance_start_tier_name="ELANBegin", utterance_end_tier_name="ELANEnd", word_start_tier_name="WordBegin", word_end_tier_name="WordEnd", toolbox_encoding="utf-8", output_encoding="utf-8", debug_level=0):
+
+    # Make a dictionary from utterance ids to the words contained in the utterances
+    utterance_dict = makeUtteranceDictionary(tiers["RID"])
+
+    # Read in the original Toolbox file with an index of its records and their utterance start and end times
+    (original_toolbox_file, record_index) = readToolboxFile(original_toolbox_file_name, toolbox_encoding, debug_level, reference_tier_name, utterance_start_tier_name, utterance_end_tier_name)
+    original_utterance_times_dict = getOriginalUtteranceTimes(record_index)
+
+    # Add time annotation to the original Toolbox file
+    annotateOriginalToolboxFile(output_file_name, output_encoding, original_toolbox_file, record_index, reference_tier_name, keep_utterance_times, output_word_times, utterance_times, utterance_start_tier_name, utterance_end_tier_name, word_times, word_start_tier_name, word_end_tier_name, utterance_dict, original_utterance_times_dict, sample_rate)
+
+
+# Function to write a new Toolbox file with time information from scratch
+# Arguments:
+# 1. The output file name
+# 2. The tiers as produced by parse_partitur
+# 3. A dictionary from word ids to start and end times
+# 4. A dictionary from utterance ids to start and end times
+# 5. The sample rate to be used to convert samples to seconds
+# 6. The name of the reference tier (defaults to ref)
+# 7. The name of the text tier (defaults to t)
+# 8. The name of the Toolbox database type (defaults to Text)
+# 9. Whether to output word start and end times or not (Boolean)
+# 10. The Toolbox marker for utterance start times (defaults to ELANBegin)
+# 11. The Toolbox marker for utterance end times (defaults to ELANEnd)
+# 12. The Toolbox marker for word start times (defaults to WordBegin)
+# 13. The Toolbox marker for word end times (defaults to WordEnd)
+# 14. The output file encoding (defaults to utf-8)
+def write_toolbox(output_file_name, tiers, word_times, utterance_times, sample_rate, reference_tier_name="ref", text_tier_name="t", toolbox_type="Text", output_word_times=False, utterance_start_tier_name="ELANBegin", utterance_end_tier_name="ELANEnd", word_start_tier_name="WordBegin", word_end_tier_name="WordEnd", output_encoding="utf-8"):
+
+    # Make a dictionary from word ids to word forms
+    word_dict = makeWordDictionary(tiers["ORT"])
+
+    # Write a new Toolbox file from scratch
+    writeNewToolboxFile(output_file_name, output_encoding, reference_tier_name, text_tier_name, toolbox_type, output_word_times, tiers["RID"], utterance_times, utterance_start_tier_name, utterance_end_tier_name, word_times, word_start_tier_name, word_end_tier_name, word_dict, sample_rate)
+
+
+# Function to convert a BAS Partitur file with a MAU tier to a Toolbox file
+# Arguments:
+# 1. The name of the input BAS Partitur file with MAU tier
+# 2. The name of the original BAS Partitur file
+# 3. The output file name
+# 4. The sample rate to be used to convert samples to seconds
+# 5. The name of an original Toolbox file to which the time information
+#    should be added (if None, a new Toolbox file is created from scratch)
+# All further keyword arguments correspond to the arguments of annotate_toolbox
+# and write_toolbox (and the encodings of the input files)
+def mau_to_toolbox(input_file_name, original_file_name, output_file_name, sample_rate, original_toolbox_file_name=None, toolbox_type="Text", input_encoding="utf-8", original_encoding="utf-8", toolbox_encoding="utf-8", output_encoding="utf-8", output_word_times=False, keep_utterance_times=False, word_start_tier_name="WordBegin", word_end_tier_name="WordEnd", utterance_start_tier_name="ELANBegin", utterance_end_tier_name="ELANEnd", reference_tier_name="ref", text_tier_name="t", debug_level=0):
+
+    # Read in the original BAS Partitur file and the MAU tier
+    tiers = parse_partitur(original_file_name, input_file_name, original_encoding, input_encoding, debug_level)
+
+    # Combine phoneme start and end times into word and utterance start and end times
+    (word_times, utterance_times) = mau_to_word_times(tiers, False, debug_level)
+
+    # Print status message
+    if debug_level == 1:
+        print("Writing Toolbox file.")
+
+    # Add time annotation to an original Toolbox file
+    if original_toolbox_file_name:
+        annotate_toolbox(output_file_name, original_toolbox_file_name, tiers, word_times, utterance_times, sample_rate, reference_tier_name, keep_utterance_times, output_word_times, utterance_start_tier_name, utterance_end_tier_name, word_start_tier_name, word_end_tier_name, toolbox_encoding, output_encoding, debug_level)
+
+    # Write a new Toolbox file from scratch
+    else:
+        write_toolbox(output_file_name, tiers, word_times, utterance_times, sample_rate, reference_tier_name, text_tier_name, toolbox_type, output_word_times, utterance_start_tier_name, utterance_end_tier_name, word_start_tier_name, word_end_tier_name, output_encoding)
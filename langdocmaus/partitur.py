@@ -0,0 +1,544 @@
+# encoding=utf-8
+
+# Functions for reading BAS Partitur files
+#
+# A BAS Partitur file is read in a single pass and the contents of
+# all its tiers (ORT, KAN, RID, MAU, TRN and any other tiers, including
+# the header lines) are stored in a dictionary from tier names to lists
+# of entries (see http://www.bas.uni-muenchen.de/forschung/Bas/BasFormatsdeu.html#Partitur).
+
+# Codecs for handling character encodings
+import codecs
+
+# Use regular expressions
+import re
+
+import sys
+
+# NumPy is optional, it is used to combine the start and end times of phonemes
+# into those for words and utterances for large MAU tiers
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Tiers whose lines are split into their individual fields
+KNOWN_TIERS = ("ORT", "KAN", "RID", "MAU", "TRN")
+
+KNOWN_TIER_MARKERS = frozenset(tier_name + ":" for tier_name in KNOWN_TIERS)
+
+# Tier markers of all other tiers and header lines
+# (BAS Partitur keys consist of three upper case letters or digits)
+TIER_MARKER_RE = re.compile(r"[A-Z0-9]{3}:")
+
+# Plain ASCII integers that fit into a 64-bit integer
+# (with an optional sign and leading zeros as accepted by int)
+INTEGER_RE = re.compile(r"[+-]?[0-9]{1,18}")
+
+# Plain ASCII integers written exactly as int would write them
+# (no sign "+" and no leading zeros apart from 0 itself)
+EXACT_INTEGER_RE = re.compile(r"0|-?[1-9][0-9]{0,17}")
+
+
+# Function to parse a single line of a BAS Partitur file
+# Arguments:
+# 1. The line
+# 2. The line number (for error messages)
+# Returns a pair (tier_name, entry) with entries as described for readBASPartiturFile
+# or None for empty lines and lines without a tier marker
+def parseBASPartiturLine(line, line_number):
+
+    # Remove superfluous whitespace
+    line = line.strip()
+
+    # Skip empty lines
+    if line == "": return None
+
+    # Split the line at white space
+    elements = line.split()
+
+    # Lines of the known tiers must start with the tier marker followed by white space
+    # (e.g. "ORT:0 word" is not skipped as a line of an unknown tier)
+    if line[:4] in KNOWN_TIER_MARKERS:
+
+        if elements[0] != line[:4]:
+            print("Found a", line[:3], "tier without white space after the tier marker in line:", line_number)
+            sys.exit()
+
+    # Skip lines without a tier marker
+    elif not TIER_MARKER_RE.fullmatch(elements[0]):
+        return None
+
+    # Determine the tier name
+    tier_name = elements[0][:-1]
+
+    # Test if the line contains information in the ORT tier
+    if tier_name == "ORT":
+
+        # Test whether the line can be divided into 3 elements:
+        # tier marker, word_id and word
+        if len(elements) != 3:
+            print("Found an ORT tier that does not contain 3 elements (tier marker, number, phoneme) in line:", line_number)
+            sys.exit()
+
+        # Unpack elements into separate variables
+        (tier_marker, word_id, word) = elements
+
+        return ("ORT", (word_id, word))
+
+    # Test if the line contains information in the KAN tier
+    elif tier_name == "KAN":
+
+        # Test whether the line can be divided into 3 elements:
+        # tier marker, word_id and word
+        if len(elements) < 3:
+            print("Found a KAN tier that does not contain at least 3 elements (tier marker, number, phoneme) in line:", line_number)
+            sys.exit()
+
+        # Unpack elements into separate variables
+        # (new style KAN tiers separate phonemes by spaces)
+        word_id = elements[1]
+        word = " ".join(elements[2:])
+
+        return ("KAN", (word_id, word))
+
+    # Test if the line contains information in the RID tier
+    elif tier_name == "RID":
+
+        # Test whether the line can be divided into 3 elements:
+        # tier marker, word ids, utterance id
+        if len(elements) < 3:
+            print("Found a RID tier that does not contain at least 3 elements (tier marker, word ids, utterance id) in line:", line_number)
+            sys.exit()
+
+        # Unpack elements into separate variables
+        word_ids = elements[1]
+        utterance_id = " ".join(elements[2:])
+
+        return ("RID", [utterance_id, word_ids.split(",")])
+
+    # Test if the line contains information in the MAU tier
+    elif tier_name == "MAU":
+
+        # Test whether the line can be divided into 5 elements:
+        # tier marker, start, duration, word_id, and phoneme
+        if len(elements) != 5:
+            print("Found a MAU tier that does not contain 5 elements (tier marker, start time, duration, word id, phoneme) in line:", line_number)
+            sys.exit()
+
+        # Unpack elements into separate variables
+        (tier_marker, start, duration, word_id, phoneme) = elements
+
+        return ("MAU", (start, duration, word_id, phoneme))
+
+    # Test if the line contains information in the TRN tier
+    elif tier_name == "TRN":
+
+        # Test whether the line can be divided into 5 elements:
+        # tier marker, start, duration, word ids, and utterance id
+        if len(elements) < 5:
+            print("Found a TRN tier that does not contain at least 5 elements (tier marker, start time, duration, word ids, utterance id) in line:", line_number)
+            sys.exit()
+
+        # Unpack elements into separate variables
+        start = elements[1]
+        duration = elements[2]
+        word_ids = elements[3]
+        utterance_id = " ".join(elements[4:])
+
+        return ("TRN", (start, duration, word_ids.split(","), utterance_id))
+
+    # Keep the contents of any other tier (including header lines) unchanged
+    return (tier_name, " ".join(elements[1:]))
+
+
+# Function to read the lines of a BAS Partitur file one at a time
+# (without keeping the whole file in memory)
+# Arguments:
+# 1. file name
+# 2. encoding (defaults to utf-8)
+# 3. A collection of tier names (defaults to None, i.e. all tiers)
+# Yields pairs (tier_name, entry) as produced by parseBASPartiturLine
+def iterBASPartiturFile(file_name, encoding="utf-8", tier_names=None):
+    bas_file = codecs.open(file_name, "r", encoding)
+
+    # Count line numbers for error reporting
+    line_number = 0
+
+    # Read the BAS Partitur file line by line
+    for line in bas_file:
+
+        # Increase line number
+        line_number += 1
+
+        # Only parse lines of the requested tiers
+        if tier_names is not None and line.split(":", 1)[0].strip() not in tier_names:
+            continue
+
+        parsed_line = parseBASPartiturLine(line, line_number)
+
+        if parsed_line is not None:
+            yield parsed_line
+
+    # Close the file
+    bas_file.close()
+
+
+# Function to read in all tiers of a BAS Partitur file in a single pass
+# Arguments:
+# 1. file name
+# 2. encoding (defaults to utf-8)
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+# Returns a dictionary from tier names to lists of entries:
+# ORT: tuples (word_id, word)
+# KAN: tuples (word_id, word)
+# RID: lists [utterance_id, list of word_ids]
+# MAU: tuples (start, duration, word_id, phoneme)
+# TRN: tuples (start, duration, list of word_ids, utterance_id)
+# Any other tier: the contents of the line following the tier marker
+def readBASPartiturFile(file_name, encoding="utf-8", debug_level=0):
+
+    # Print status message
+    if debug_level == 1:
+        print("Reading BAS Partitur file", file_name)
+
+    # Make a new index of tiers, the known tiers are always present
+    tiers = {}
+
+    for tier_name in KNOWN_TIERS:
+        tiers[tier_name] = []
+
+    bas_file = codecs.open(file_name, "r", encoding)
+
+    # Count line numbers for error reporting
+    line_number = 0
+
+    # Read the BAS Partitur file line by line
+    for line in bas_file:
+
+        # Increase line number
+        line_number += 1
+
+        parsed_line = parseBASPartiturLine(line, line_number)
+
+        if parsed_line is None:
+            continue
+
+        (tier_name, entry) = parsed_line
+
+        if tier_name not in tiers:
+            tiers[tier_name] = []
+
+        tiers[tier_name].append(entry)
+
+    # Close the file
+    bas_file.close()
+
+    # Return the index of tiers
+    return tiers
+
+
+# Function to convert a list of numbers given as strings into an array of integers
+# Arguments:
+# 1. A list of strings
+# 2. Whether the strings have to be written exactly as plain integers, so that
+#    converting the numbers back yields the original strings (defaults to True)
+# returns a NumPy array of integers or None if the strings cannot be converted
+# (i.e. if any of them is not a plain ASCII integer; the caller then falls back
+# to converting the strings with int, which reports malformed numbers)
+def makeIntegerArray(strings, exact=True):
+
+    if exact:
+        integer_re = EXACT_INTEGER_RE
+    else:
+        integer_re = INTEGER_RE
+
+    # Test all strings before converting any of them
+    if not all(map(integer_re.fullmatch, strings)):
+        return None
+
+    return numpy.fromiter(map(int, strings), dtype=numpy.int64, count=len(strings))
+
+
+# Function to compute the start and end times of words from the phonemes
+# of a MAU tier using NumPy arrays
+# Arguments:
+# 1. A list of phonemes (MAU tier) as created by readBASPartiturFile
+# returns a tuple of three arrays (word_ids, start_times, end_times)
+# sorted by word id or None if NumPy is not available
+# or the MAU tier contains word ids that are not plain integers
+def makeWordTimeArrays(phonemes):
+
+    if numpy is None or len(phonemes) == 0:
+        return None
+
+    # Convert the columns of the MAU tier into arrays
+    word_ids = makeIntegerArray([phoneme[2] for phoneme in phonemes])
+    start_times = makeIntegerArray([phoneme[0] for phoneme in phonemes], False)
+    durations = makeIntegerArray([phoneme[1] for phoneme in phonemes], False)
+
+    if word_ids is None or start_times is None or durations is None:
+        return None
+
+    end_times = start_times + durations
+
+    # Ignore pauses, etc.
+    is_word = word_ids != -1
+
+    word_ids = word_ids[is_word]
+    start_times = start_times[is_word]
+    end_times = end_times[is_word]
+
+    if len(word_ids) == 0:
+        return (word_ids, start_times, end_times)
+
+    # Sort the phonemes by word id (keeping their original order within each word)
+    order = numpy.argsort(word_ids, kind="stable")
+
+    word_ids = word_ids[order]
+    start_times = start_times[order]
+    end_times = end_times[order]
+
+    # Determine where the phonemes of each word start
+    word_starts = numpy.flatnonzero(numpy.r_[True, word_ids[1:] != word_ids[:-1]])
+
+    # The start time of a word is the minimal start time of its phonemes
+    # and the end time of a word is the maximal end time of its phonemes
+    return (word_ids[word_starts],
+            numpy.minimum.reduceat(start_times, word_starts),
+            numpy.maximum.reduceat(end_times, word_starts))
+
+
+# Function to combine the start and end times of phonemes into those for words
+# Arguments:
+# 1. A list of phonemes (MAU tier) as created by readBASPartiturFile
+# 2. debug level (0 --> no status messages, 1 --> print status messages)
+# 3. The word time arrays as created by makeWordTimeArrays
+#    (they are computed if NumPy is available and none are given)
+# returns a dictionary from word ids to pairs of (start_time, end_time)
+def combinePhonemesIntoWords(phonemes, debug_level=0, word_arrays=None):
+
+    # Print status report
+    if debug_level == 1:
+        print("Combining phoneme start and end times into word start and end times.")
+
+    if word_arrays is None:
+        word_arrays = makeWordTimeArrays(phonemes)
+
+    # Use the results of the array computation if possible
+    if word_arrays is not None:
+        (word_id_array, start_time_array, end_time_array) = word_arrays
+
+        return dict(zip(word_id_array.astype(str).tolist(), zip(start_time_array.tolist(), end_time_array.tolist())))
+    
+    # Dictionary of word ids
+    word_ids = {}
+    
+    # Go through list of phonemes
+    for (start, duration, word_id, phoneme) in phonemes:
+        
+        # Ignore pauses, etc.
+        if word_id == "-1":
+            continue
+        
+        # Determine whether phonemes of the current word have already been processed
+        if word_id in word_ids:
+            
+            # Old start and end time
+            (old_start_time, old_end_time) = word_ids[word_id]
+            
+            # Calculate the start and end times of the current phoneme
+            cur_start_time = int(start)
+            cur_end_time = int(start) + int(duration)
+            
+            # Is the current phoneme's start time lower than the old word start time?
+            if cur_start_time < old_start_time:
+                new_start_time = cur_start_time
+            else:
+                new_start_time = old_start_time
+                
+            # Is the current phoneme's end time higher than the old word end time?
+            if cur_end_time > old_end_time:
+                new_end_time = cur_end_time
+            else:
+                new_end_time = old_end_time
+                
+            # Put updated start and end time into dictionary
+            word_ids[word_id] = (new_start_time, new_end_time)                
+            
+        else:
+            new_start_time = int(start)
+            new_end_time = int(start) + int(duration)
+            
+            # Put initial start and end time into dictionary
+            word_ids[word_id] = (new_start_time, new_end_time)
+    
+    # Return the dictionary of start and end times for words
+    return word_ids
+
+
+# Function to combine the start and end times of words into those for utterances
+# Arguments:
+# 1. A list of utterances (RID tier) as created by readBASPartiturFile
+# 2. A dictionary of word start and end times as created by combinePhonemesIntoWords
+# 3. Whether to stop if a word time is missing (Boolean, defaults to True)
+# 4. debug level (0 --> no status messages, 1 --> print status messages)
+# 5. The word time arrays as created by makeWordTimeArrays (defaults to None)
+# returns a dictionary from utterance ids to pairs of (start_time, end_time)
+def combineWordsIntoUtterances(utterances, words, exit_on_missing_words=True, debug_level=0, word_arrays=None):
+
+    # Print status report
+    if debug_level == 1:
+        print("Combining word start and end times into utterance start and end times.")
+
+    # Look up the first and last words of all utterances in the word time arrays
+    if word_arrays is not None and len(utterances) > 0 and len(word_arrays[0]) > 0:
+        (word_id_array, start_time_array, end_time_array) = word_arrays
+
+        first_word_ids = makeIntegerArray([utterance[1][0] for utterance in utterances])
+        last_word_ids = makeIntegerArray([utterance[1][-1] for utterance in utterances])
+
+        if first_word_ids is not None and last_word_ids is not None:
+            first_positions = numpy.minimum(numpy.searchsorted(word_id_array, first_word_ids), len(word_id_array) - 1)
+            last_positions = numpy.minimum(numpy.searchsorted(word_id_array, last_word_ids), len(word_id_array) - 1)
+
+            # Only use the arrays if all words have been found,
+            # otherwise report the missing words below
+            if (numpy.array_equal(word_id_array[first_positions], first_word_ids)
+                and numpy.array_equal(word_id_array[last_positions], last_word_ids)):
+
+                return dict(zip([utterance[0] for utterance in utterances],
+                                zip(start_time_array[first_positions].tolist(), end_time_array[last_positions].tolist())))
+    
+    # Dictionary of utterance ids
+    utterance_ids = {}
+
+    # Test
+#    first_word_id = None
+#    last_word_id = None
+#    first_word_start_time = None
+#    last_word_end_time = None
+    
+    # Go trough the list of utterances
+    for utterance in utterances:
+        utterance_id = utterance[0]
+        list_of_word_ids = utterance[1]
+        
+#        print("Utterance id is", utterance_id)
+#        print("List of word ids is", list_of_word_ids)
+        
+        # Look up the start time of the first and last words in the utterance
+        first_word_id = list_of_word_ids[0]
+        last_word_id = list_of_word_ids[-1]
+        
+        # Determine the start and end times of these words
+        if first_word_id in words:
+            (first_word_start_time, first_word_end_time) = words[first_word_id]
+            
+        else:           
+            print("Could not find word id", first_word_id, "contained in utterance id", utterance_id)
+
+            if exit_on_missing_words:
+                sys.exit()
+
+        if last_word_id in words:
+            (last_word_start_time, last_word_end_time) = words[last_word_id]
+            
+        else:           
+            print("Could not find word id", last_word_id, "contained in utterance id", utterance_id)
+
+            if exit_on_missing_words:
+                sys.exit()
+        
+        # Combine start time of first word and end time of last word into
+        # utterance start and end times
+        utterance_start_time = first_word_start_time
+        utterance_end_time = last_word_end_time
+        
+        # Put the utterance start and end times into the utterance dictionary
+        utterance_ids[utterance_id] = (utterance_start_time, utterance_end_time)
+
+    # Return the dictionary of start and end times for utterances
+    return utterance_ids
+
+
+# Function to produce a dictionary from word ids to the orthographic forms of words
+# Argument:
+# 1. A list of words (ORT tier) as produced by readBASPartiturFile
+# returns a dictionary from word ids to ortographic word forms
+def makeWordDictionary(list_of_words):
+    
+    # A dictionary of words
+    word_dict = {}
+    
+    # Go through the list of words
+    for (word_id, word) in list_of_words:
+        
+        # Put the word into the dictionary
+        word_dict[word_id] = word
+    
+    # Return the dictionary
+    return word_dict
+
+
+# Function to produce a dictionary from utterance ids to the ids
+# of the words contained in the utterance (stored as a list)
+# Argument:
+# 1. A list of utterances (RID tier) as produced by readBASPartiturFile
+# returns a dictionary from utterance ids to the word contained in that utterance
+def makeUtteranceDictionary(list_of_utterances):
+    
+    # A dictionary of utterances
+    utterance_dict = {}
+    
+    # Go through the list of utterances
+    for (utterance_id, words) in list_of_utterances:
+        
+        # Put the list of word ids into the dictionary under the utterance id
+        utterance_dict[utterance_id] = words
+    
+    # Return the dictionary
+    return utterance_dict
+
+
+# Function to read in an original BAS Partitur file together with
+# the MAU tier of the corresponding BAS Partitur file produced by (Web)MAUS
+# Arguments:
+# 1. file name of the original BAS Partitur file
+# 2. file name of the BAS Partitur file with MAU tier
+# 3. encoding of the original BAS Partitur file (defaults to utf-8)
+# 4. encoding of the BAS Partitur file with MAU tier (defaults to utf-8)
+# 5. debug level (0 --> no status messages, 1 --> print status messages)
+# Returns the tiers of the original BAS Partitur file as produced by readBASPartiturFile
+# with the MAU tier taken from the BAS Partitur file with MAU tier
+def parse_partitur(original_file_name, input_file_name, original_encoding="utf-8", input_encoding="utf-8", debug_level=0):
+
+    # Read in all tiers from the original BAS Partitur file
+    tiers = readBASPartiturFile(original_file_name, original_encoding, debug_level)
+
+    # Read in the MAU tier from the BAS Partitur file
+    tiers["MAU"] = readBASPartiturFile(input_file_name, input_encoding, debug_level)["MAU"]
+
+    return tiers
+
+
+# Function to determine the start and end times of words and utterances
+# from the MAU tier
+# Arguments:
+# 1. The tiers as produced by parse_partitur
+# 2. Whether to stop if a word time is missing (Boolean, defaults to True)
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a pair of dictionaries (word_times, utterance_times) from word ids
+# and utterance ids to pairs of (start_time, end_time)
+def mau_to_word_times(tiers, exit_on_missing_words=True, debug_level=0):
+
+    # Compute the word start and end times using NumPy if possible
+    word_arrays = makeWordTimeArrays(tiers["MAU"])
+
+    # Combine phoneme start and end times into word start and end times
+    word_times = combinePhonemesIntoWords(tiers["MAU"], debug_level, word_arrays)
+
+    # Combine word start and end times into utterance start and end times
+    utterance_times = combineWordsIntoUtterances(tiers["RID"], word_times, exit_on_missing_words, debug_level, word_arrays)
+
+    return (word_times, utterance_times)
@@ -0,0 +1,115 @@
+# encoding=utf-8
+
+# Functions for converting the time codes in Toolbox files
+# (plain seconds like 12.345 or hours:minutes:seconds like 0:00:12.345)
+# to seconds and samples
+#
+# Plain seconds are converted without regular expressions, all other
+# time codes are matched against regular expressions compiled only once.
+#
+# Run python -m tests.benchmark_timecode for a small benchmark.
+
+# Use regular expressions
+import re
+
+import sys
+
+
+# Regular expressions for the different time code formats
+HOURS_MINUTES_SECONDS_RE = re.compile(r"^(\d+):(\d+):(\d+(\.\d+)?)$")
+SECONDS_RE = re.compile(r"^(0|(\d+)\.(\d+))$")
+
+
+# Function to convert a time code to seconds using the regular expressions
+# Arguments:
+# 1. time code as string
+# returns the time in seconds as a float
+def matchTimecode(time_code):
+
+    # Test what kind of time code we are dealing with
+    match = HOURS_MINUTES_SECONDS_RE.search(time_code)
+    if match:
+        hours = match.group(1)
+        minutes = match.group(2)
+        seconds = match.group(3)
+
+        # Convert complex time code to seconds
+        try:
+            seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        except:
+            print("Could not convert time code", time_code, " to seconds.")
+            sys.exit()
+
+    elif SECONDS_RE.search(time_code):
+
+        # Convert simple time code to seconds
+        try:
+            seconds = float(time_code)
+
+        except:
+            print("Could not convert time code", time_code, " to seconds.")
+            sys.exit()
+
+    else:
+        print("Could not match time code", time_code)
+        sys.exit()
+
+    return float(seconds)
+
+
+# Function to convert time code hours:minutes:seconds to seconds
+# Arguments:
+# 1. time code as string
+# returns the time in seconds as a float
+def timecode2seconds(time_code):
+
+    # Plain decimal seconds (the most frequent case) do not need a regular expression
+    (integer_part, dot, fraction_part) = time_code.partition(".")
+
+    if dot == "." and integer_part.isdecimal() and fraction_part.isdecimal():
+        return float(time_code)
+
+    return matchTimecode(time_code)
+
+
+# Function to convert time code hours:minutes:seconds to samples
+# Arguments:
+# 1. time code as string
+# 2. sample rate
+# returns the time in samples as an integer
+def timecode2samples(time_code, sample_rate):
+
+    return int(timecode2seconds(time_code) * sample_rate)
+
+
+# Function to convert a whole list of time codes to seconds
+# Arguments:
+# 1. a list of time codes as strings
+# returns a list of times in seconds
+def timecodes2seconds(time_codes):
+
+    # Plain decimal seconds do not need a regular expression
+    times = []
+
+    for time_code in time_codes:
+
+        (integer_part, dot, fraction_part) = time_code.partition(".")
+
+        if dot == "." and integer_part.isdecimal() and fraction_part.isdecimal():
+            times.append(float(time_code))
+        else:
+            times.append(matchTimecode(time_code))
+
+    return times
+
+
+# Function to convert a whole list of time codes to samples
+# Arguments:
+# 1. a list of time codes as strings
+# 2. sample rate
+# returns a list of times in samples
+def timecodes2samples(time_codes, sample_rate):
+
+    return [int(seconds * sample_rate) for seconds in timecodes2seconds(time_codes)]
+
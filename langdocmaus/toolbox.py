@@ -0,0 +1,233 @@
+# encoding=utf-8
+
+# Functions for reading Toolbox files
+
+# Codecs for handling character encodings
+import codecs
+
+# Use regular expressions
+import re
+
+# Functions for converting time codes
+from langdocmaus.timecode import timecode2seconds
+
+
+# Function to make a new entry for the record index of a Toolbox file
+# Arguments:
+# 1. The record id (None for the lines before the first record)
+# 2. The number of the first line of the record (counting from 0)
+# returns a dictionary with the keys "id", "first_line", "end_line" (the number
+# of the line after the record), "markers" (a dictionary from tier markers to the
+# numbers of the lines with this marker, for the reference tier and the utterance
+# start and end tiers), "start_time" and "end_time" (the
+# utterance start and end times in seconds given in the record or None)
+def makeToolboxRecord(record_id, first_line):
+
+    return {"id": record_id, "first_line": first_line, "end_line": first_line, "markers": {}, "start_time": None, "end_time": None}
+
+
+# Function to read in an existing Toolbox file
+# If a reference tier is given, an index of the records in the file is built
+# while reading the file.
+# Arguments:
+# 1. file name
+# 2. encoding (defaults to utf-8)
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+# 4. The name of the reference tier (defaults to None, i.e. no record index)
+# 5. The name of the tier containing the utterance start times (defaults to None)
+# 6. The name of the tier containing the utterance end times (defaults to None)
+# Returns a list of Toolbox lines as tuples (tier marker, line, line ending)
+# or, if a reference tier is given, a pair of this list and the record index,
+# a dictionary with the keys "header" (the record for the lines before the first record),
+# "records" (the list of records as made by makeToolboxRecord in the order of the file)
+# and "ids" (a dictionary from record ids to the positions of the records with this id)
+def readToolboxFile(file_name, encoding="utf-8", debug_level=0, reference_tier_name=None, utterance_start_tier_name=None, utterance_end_tier_name=None):
+
+    # Print status message
+    if debug_level == 1:
+        print("Reading original Toolbox file", file_name)
+
+    # Compile a regular expression to find Toolbox tier markers
+    tier_marker_re = re.compile("^" + r"\\(\S+)(?=($|\s+))")
+    
+    # Compile a regular expression to extract the tier contents
+    tier_contents_re = re.compile("^" + r"\\(\S+)\s+(.+)$")
+    
+    # A list of Toolbox lines
+    toolbox_lines = []
+
+    # The record index
+    header = makeToolboxRecord(None, 0)
+    records = []
+    record_ids = {}
+
+    cur_record = header
+    cur_markers = header["markers"]
+
+    # Only the reference tier and the utterance start and end tiers are indexed
+    if reference_tier_name is not None:
+        indexed_tier_markers = set([reference_tier_name, utterance_start_tier_name, utterance_end_tier_name]) - set([None])
+    else:
+        indexed_tier_markers = set()
+    
+    # Read in the Toolbox file at once
+    # (splitting it into lines exactly like reading it line by line)
+    toolbox_file = codecs.open(file_name, "r", encoding)
+    file_lines = toolbox_file.read().splitlines(True)
+    toolbox_file.close()
+    
+    # Go through the lines in the file
+    for (line_number, line) in enumerate(file_lines):
+        
+        # Tier marker in current line
+        cur_tier_marker = None
+        
+        # Search for a tier marker in the current line
+        match = tier_marker_re.search(line)
+        if match:
+            cur_tier_marker = match.group(1)
+        
+        # Find the line ending in the current line
+        cur_line_ending = line[len(line.rstrip("\r\n")):]
+
+        # Add the line to the record index
+        if cur_tier_marker in indexed_tier_markers:
+
+            # A new record starts with each reference tier
+            if cur_tier_marker == reference_tier_name:
+                cur_record["end_line"] = line_number
+
+                # Extract the record id from the reference tier
+                match = tier_contents_re.search(line)
+                if match:
+                    cur_record_id = match.group(2).strip()
+                else:
+                    cur_record_id = None
+
+                cur_record = makeToolboxRecord(cur_record_id, line_number)
+                cur_markers = cur_record["markers"]
+
+                if cur_record_id is not None:
+                    record_ids.setdefault(cur_record_id, []).append(len(records))
+
+                records.append(cur_record)
+
+            # Remember where the marker occurs in the current record
+            marker_lines = cur_markers.get(cur_tier_marker)
+            if marker_lines is None:
+                cur_markers[cur_tier_marker] = [line_number]
+            else:
+                marker_lines.append(line_number)
+
+            # Extract the existing utterance start and end times
+            if cur_tier_marker == utterance_start_tier_name:
+                cur_record["start_time"] = timecode2seconds(line.strip().split()[-1])
+
+            if cur_tier_marker == utterance_end_tier_name:
+                cur_record["end_time"] = timecode2seconds(line.strip().split()[-1])
+        
+        # Add current line to the list of lines
+        toolbox_lines.append((cur_tier_marker, line, cur_line_ending))
+
+    # Return the list of lines
+    if reference_tier_name is None:
+        return toolbox_lines
+
+    cur_record["end_line"] = len(toolbox_lines)
+
+    # Print status message
+    if debug_level == 1:
+        print(len(records), "records found in Toolbox file", file_name)
+
+    return (toolbox_lines, {"header": header, "records": records, "ids": record_ids})
+
+
+# Function to get the original utterance start and end times from the record index of a Toolbox file
+# (with the same result as readUtteranceTimesFromOriginalToolboxFile)
+# Arguments:
+# 1. The record index as produced by readToolboxFile
+# returns a dictionary from utterance ids to dictionaries with the keys "start" and "end"
+def getOriginalUtteranceTimes(record_index):
+
+    original_utterance_times = dict()
+
+    for record in record_index["records"]:
+
+        if record["id"] is None:
+            continue
+
+        if record["start_time"] is not None:
+            original_utterance_times.setdefault(record["id"], {})["start"] = record["start_time"]
+
+        if record["end_time"] is not None:
+            original_utterance_times.setdefault(record["id"], {})["end"] = record["end_time"]
+
+    return original_utterance_times
+
+
+# Function to read in the original utterance start and end times from a Toolbox file
+# Arguments:
+# 1. The Toolbox file as read in by readToolboxFile
+# 2. The name of the reference tier
+# 3. The name of the tier containing the utterance start times
+# 4. The name of the tier containing the utterance end times
+# returns a dictionary from utterance ids to dictionaries with the keys "start" and "end"
+def readUtteranceTimesFromOriginalToolboxFile(toolbox_file, reference_tier_name, utterance_start_tier_name, utterance_end_tier_name):
+    
+    cur_utterance_id = None
+    
+    original_utterance_times = dict()
+    
+    for line in toolbox_file:
+        
+        # Unpack line contents
+        (cur_toolbox_marker, cur_line, cur_line_ending) = line
+        
+        # Reference tier?
+        if cur_toolbox_marker == reference_tier_name:
+            
+            cur_utterance_id = None
+            
+            # Remember current utterance id
+            cur_utterance_id = cur_line.strip()
+            
+            match = re.search(r"\s+(.+)$", cur_utterance_id)
+            if match:
+                
+                cur_utterance_id = match.group(1)                
+        
+        # Extract utterance start time
+        if cur_toolbox_marker == utterance_start_tier_name:
+                        
+            cur_utterance_start_time = cur_line.strip().split()[-1]
+            cur_utterance_start_time_seconds = timecode2seconds(cur_utterance_start_time)
+            
+            if cur_utterance_id is not None:
+                
+                if cur_utterance_id not in original_utterance_times:
+                    
+                    original_utterance_times[cur_utterance_id] = {}
+                
+                original_utterance_times[cur_utterance_id]["start"] = cur_utterance_start_time_seconds
+                
+            cur_utterance_start_time = None
+            cur_utterance_start_time_seconds = None
+
+        # Extract utterance end time
+        if cur_toolbox_marker == utterance_end_tier_name:
+            
+            cur_utterance_end_time = cur_line.strip().split()[-1]
+            cur_utterance_end_time_seconds = timecode2seconds(cur_utterance_end_time)
+
+            if cur_utterance_id is not None:
+
+                if cur_utterance_id not in original_utterance_times:
+                    
+                    original_utterance_times[cur_utterance_id] = {}
+                
+                original_utterance_times[cur_utterance_id]["end"] = cur_utterance_end_time_seconds
+
+            cur_utterance_end_time = None
+            cur_utterance_end_time_seconds = None
+        
+    return original_utterance_times
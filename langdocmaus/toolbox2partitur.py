@@ -0,0 +1,855 @@
+# encoding=utf-8
+
+# Functions for converting the transcription in a Toolbox file
+# into a BAS Partitur file for use with MAUS / webMAUS
+
+# Codecs for handling character encodings
+import codecs
+
+# Module for computing fingerprints of records
+import hashlib
+
+# Use regular expressions
+import re
+
+# Module to check files and paths
+import os.path
+
+import sys
+
+# Functions for converting time codes
+from langdocmaus.timecode import timecode2samples
+
+# Functions for reading and cutting wave files
+from langdocmaus.audio import readWaveHeader
+from langdocmaus.audio import writeWaveExcerpt
+
+# Functions for aligning a recording in chunks
+from langdocmaus.chunks import getChunkFileName
+from langdocmaus.chunks import getChunkListFileName
+from langdocmaus.chunks import readRecordMap
+from langdocmaus.chunks import writeChunkList
+from langdocmaus.chunks import writeRecordMap
+
+# Functions for checking phoneme inventories
+from langdocmaus.inventory import read_inventory_file
+from langdocmaus.inventory import check_phonemes
+from langdocmaus.inventory import print_results
+
+# Functions for the grapheme-to-phoneme conversion
+from langdocmaus.transliteration import readTransliterationTable
+from langdocmaus.transliteration import transliterateORT
+from langdocmaus.transliteration import readTransliterationCache
+from langdocmaus.transliteration import writeTransliterationCache
+
+
+# Function to read in a Toolbox file
+# Arguments:
+# 1. file name
+# 2. name of the tier in which the transcription is stored
+# 3. name of the tier which contains the utterance id
+# 4. sample rate of the wave file
+# 4. name of the tier containing the utterance start times (if they already exist)
+# 5. name of the tier containing the utterance end times (if they already exist)
+# 6. encoding (defaults to utf-8)
+# 7. debug level (0 --> no status messages, 1 --> print status messages)
+# Returns a list of utterances/sentences as tuples (recordid, utterance)
+def readToolboxFile(file_name, transcription_tier_name, reference_tier_name, sample_rate, start_time_tier_name=None, end_time_tier_name=None, encoding="utf-8", debug_level=0):
+    toolbox_file = codecs.open(file_name,"r",encoding)
+
+    # Print status message
+    if debug_level == 1:
+        print("Reading input file", file_name)
+    
+    # Compile necessary regular expression
+    is_transcription_tier = re.compile("^" + r"\\" + re.escape(transcription_tier_name) + r"\s+(.+)$")
+    is_reference_tier = re.compile("^" + r"\\" + re.escape(reference_tier_name) + r"\s+(.+)$")
+    
+    # Also compile regular expressions for utterance start and end time tiers if given
+    if start_time_tier_name is not None:
+        is_start_time_tier = re.compile("^" + r"\\" + re.escape(start_time_tier_name) + r"\s+(.+)$")
+        is_end_time_tier = re.compile("^" + r"\\" + re.escape(end_time_tier_name) + r"\s+(.+)$")
+    
+    # Make a new list
+    utterances = []
+    
+    # Variable to store the current utterance id
+    cur_utterance = ""
+    
+    # Variable to accumulate the transcription
+    # of the current utterace (which can stretch
+    # over more than one line)
+    cur_utterance_text = ""
+    
+    # Variable to store start and end time of utterance in samples
+    cur_start_sample = None
+    cur_end_sample = None
+
+    # Read toolbox file line by line
+    for line in toolbox_file:
+        # Remove superfluous whitespace
+        line = line.strip()
+        
+        # Skip empty lines
+        if line == "": continue
+        
+        # Test if line contains a reference marker
+        reference_match = is_reference_tier.search(line)
+        if reference_match:
+            # Add transcription of previous utterance to list
+            if cur_utterance != "" and cur_utterance_text != "":
+                
+                # Determine start and end time of current utterance if already specified
+                if start_time_tier_name:
+                    if cur_start_sample is None or cur_end_sample is None:
+                        print("Could not determine utterance start and/or end time for utterance", cur_utterance)
+                        sys.exit()
+                else:
+                    cur_start_sample = None
+                    cur_end_sample = None
+                
+                utterances.append((cur_utterance, cur_utterance_text, cur_start_sample, cur_end_sample))
+                cur_utterance_text = ""
+                cur_start_sample = None
+                cur_end_sample = None
+
+            # Update current utterance id
+            cur_utterance = reference_match.group(1)
+            
+            # Normalize white space
+            cur_utterance = cur_utterance.strip()
+            cur_utterance = re.sub(r"\s+", " ", cur_utterance)
+            
+            # Print status message
+            if debug_level == 1:
+                print("Processing utterance", cur_utterance)
+                
+            # Go to next line in the input file
+            continue
+        
+        # Test if line contains a transcription tier
+        transcription_match = is_transcription_tier.search(line)
+        if transcription_match:
+            transcription_text = transcription_match.group(1)
+            
+            # Normalize white space
+            transcription_text = transcription_text.strip()
+            transcription_text = re.sub(r"\s+", " ", transcription_text)
+            
+            # Add transcription text to text already accumulated
+            if cur_utterance_text == "":
+                cur_utterance_text = transcription_text
+            else:
+                cur_utterance_text = cur_utterance_text + " " + transcription_text
+            
+            transcription_text = ""
+
+        # If utterance start and end times already exist
+        if start_time_tier_name:
+            
+            # Test if line contains an utterance start time
+            start_time_match = is_start_time_tier.search(line)
+            if start_time_match:
+                start_time_text = start_time_match.group(1)
+                cur_start_sample = timecode2samples(start_time_text, sample_rate)
+
+            # Test if line contains an utterance end time
+            end_time_match = is_end_time_tier.search(line)
+            if end_time_match:
+                end_time_text = end_time_match.group(1)
+                cur_end_sample = timecode2samples(end_time_text, sample_rate)
+        
+    # Fully process the last utterance
+    if cur_utterance != "" and cur_utterance_text != "":
+        
+        # Determine start and end time of current utterance if already specified
+        if start_time_tier_name:
+            if cur_start_sample is None or cur_end_sample is None:
+                print("Could not determine utterenace start and/or end time for utterance", cur_utterance)
+                sys.exit()
+        else:
+            cur_start_sample = None
+            cur_end_sample = None
+                
+        utterances.append((cur_utterance, cur_utterance_text, cur_start_sample, cur_end_sample))
+        cur_utterance_text = ""
+    
+    # Close file
+    toolbox_file.close()
+    
+    return utterances
+
+
+# Function to select a range of records from the utterances of a Toolbox file
+# The first and the last record can be given by their number (counting from 1)
+# or by their record id (the first record with that id).
+# Arguments:
+# 1. the list of utterances as produced by readToolboxFile
+# 2. the number of the first record to be processed (or None)
+# 3. the number of the last record to be processed (or None)
+# 4. the record id of the first record to be processed (or None)
+# 5. the record id of the last record to be processed (or None)
+# 6. debug level (0 --> no status messages, 1 --> print status messages)
+# returns the list of selected utterances
+def selectRecords(utterances, start_number=None, end_number=None, start_id=None, end_id=None, debug_level=0):
+
+    record_ids = [utterance[0] for utterance in utterances]
+
+    # Determine the position of the first record
+    if start_id is not None:
+        if start_id not in record_ids:
+            print("Cannot find the record ID of the first record to be processed:", start_id)
+            sys.exit()
+        start_index = record_ids.index(start_id)
+    elif start_number is not None:
+        start_index = start_number - 1
+    else:
+        start_index = 0
+
+    # Determine the position after the last record
+    if end_id is not None:
+        if end_id not in record_ids:
+            print("Cannot find the record ID of the last record to be processed:", end_id)
+            sys.exit()
+        end_index = record_ids.index(end_id) + 1
+    elif end_number is not None:
+        end_index = end_number
+    else:
+        end_index = len(utterances)
+
+    if start_index < 0 or start_index >= len(utterances):
+        print("The first record to be processed does not exist:", start_index + 1)
+        sys.exit()
+
+    if end_index <= start_index:
+        print("The first record to be processed comes after the last record to be processed.")
+        sys.exit()
+
+    # Print status message
+    if debug_level == 1:
+        print("Processing records", start_index + 1, "to", min(end_index, len(utterances)), "of", len(utterances))
+
+    return utterances[start_index:end_index]
+
+
+# Function to print a BAS Partitur header
+# Arguments:
+# 1. filehandle of the file to print to
+# 2. BAS Partitur attributes
+#    (see http://www.bas.uni-muenchen.de/forschung/Bas/BasFormatsdeu.html#Partitur)
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+# returns the number of lines printed
+def printBASPartiturHeader(file_handle, lhd="Partitur 1.2", rep="unknown", snb=2, sam=44100, sbf="01", ssb=16, nch=1, spn="unknown", dbn="unknown", src=None, spa="SAM-PA", beg=None, end=None, debug_level=0):
+    
+    # Count the lines of the header
+    number_of_lines = 11
+
+    # print BAS Partitur header
+    print("LHD:", lhd, file=file_handle)
+    print("REP:", rep, file=file_handle)
+    print("SNB:", str(snb), file=file_handle)
+    print("SAM:", str(sam), file=file_handle)
+    print("SBF:", sbf, file=file_handle)
+    print("SSB:", str(ssb), file=file_handle)
+    print("NCH:", str(nch), file=file_handle)
+    print("SPN:", spn, file=file_handle)
+    print("DBN:", dbn, file=file_handle)
+    
+    if not beg is None:
+        print("BEG:", str(beg), file=file_handle)
+        number_of_lines += 1
+
+    if not end is None:
+        print("END:", str(end), file=file_handle)
+        number_of_lines += 1
+    
+    if not src is None:
+        print("SRC:", src, file=file_handle)
+        number_of_lines += 1
+    
+    print("SPA:", spa, file=file_handle)
+
+    # Print body label
+    print("LBD:", file=file_handle)
+    
+    # Print status report
+    if debug_level == 1:
+        print("Printing BAS Partitur header to output file", file_handle.name)
+
+    return number_of_lines
+
+# Function to convert Toolbox transcription into BAS Partitur ORT tier
+# Arguments:
+# 1. A Toolbox text as read in by readToolboxFile
+# 2. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a list of utterances as tuples (recordid, list(tuple(number, word)))
+def convertToORT(toolbox_text, debug_level=0):
+    # Build up a new list of utterances
+    ort_utterances = []
+
+    # Print status message
+    if debug_level == 1:
+        print("Converting Toolbox text to ORT tier.")
+    
+    # Running number
+    word_number = 0
+    
+    # Go through Toolbox text
+    for unit in toolbox_text:
+        record_id = unit[0]
+        utterance = unit[1]
+        
+        # Possibly also contains utterance start and end times
+        start_sample = unit[2]
+        end_sample = unit[3]
+        
+        # Split utterance into words at whitespace
+        words = utterance.strip().split()
+        
+        # List of words
+        word_list = []
+        
+        # Iterate through words
+        for word in words:
+            # Append a tuple of running number and word to the list of words
+            word_list.append((word_number, word))
+            # Increase the running number
+            word_number += 1
+        
+        # Append utterance, tuple of record id and word_list, to list of utterances
+        ort_utterances.append((record_id, word_list, start_sample, end_sample))
+    
+    return ort_utterances
+
+
+# Function to compute a fingerprint of an utterance for the record map
+# Arguments:
+# 1. the ORT utterance as produced by convertToORT
+# 2. the corresponding KAN utterance as produced by transliterateORT
+# returns the fingerprint as a hexadecimal string
+def getUtteranceFingerprint(ort_utterance, kan_utterance):
+
+    fingerprint = hashlib.sha1()
+
+    for (ort_word, kan_word) in zip(ort_utterance[1], kan_utterance[1]):
+        fingerprint.update((ort_word[1] + "\t" + kan_word[1] + "\n").encode("utf-8"))
+
+    fingerprint.update(("%s\t%s\n" % (ort_utterance[2], ort_utterance[3])).encode("utf-8"))
+
+    return fingerprint.hexdigest()
+
+
+# Function to compare the records with those of the previous run
+# The words are numbered consecutively as usual. For each record that has not
+# changed, the record map keeps the word id of its first word in the previous run,
+# so that its alignment can be taken over from the MAU tier of the previous run
+# (see langdocmaus.chunks.merge_chunks).
+# Arguments:
+# 1. the list of ORT utterances as produced by convertToORT
+# 2. the list of KAN utterances as produced by transliterateORT
+# 3. the record map of the previous run as read in by langdocmaus.chunks.readRecordMap
+# 4. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a tuple (record map, dirty records) with the dirty records as a list of tuples
+# (status, record id, ORT utterance or None, KAN utterance or None) with status new, changed or removed
+def compareRecords(ort_utterances, kan_utterances, previous_record_map, debug_level=0):
+
+    record_map = {}
+    dirty_records = []
+
+    occurrences = {}
+
+    for (ort_utterance, kan_utterance) in zip(ort_utterances, kan_utterances):
+
+        record_id = ort_utterance[0]
+
+        # Record ids may occur more than once
+        occurrence = occurrences.get(record_id, 0)
+        occurrences[record_id] = occurrence + 1
+
+        fingerprint = getUtteranceFingerprint(ort_utterance, kan_utterance)
+
+        # Records without words have no word ids
+        if len(ort_utterance[1]) > 0:
+            first_word_id = ort_utterance[1][0][0]
+        else:
+            first_word_id = 0
+
+        previous_record = previous_record_map.get((record_id, occurrence))
+
+        if previous_record is None:
+            status = "new"
+        elif previous_record["fingerprint"] != fingerprint:
+            status = "changed"
+        else:
+            status = None
+
+        if status is None:
+            previous_first_word_id = previous_record["first_word_id"]
+        else:
+            previous_first_word_id = None
+
+        record_map[(record_id, occurrence)] = {"first_word_id": first_word_id, "word_ids": len(ort_utterance[1]), "fingerprint": fingerprint, "previous_first_word_id": previous_first_word_id}
+
+        if status is not None:
+            dirty_records.append((status, record_id, ort_utterance, kan_utterance))
+
+    # Records of the previous run that no longer exist
+    for (record_id, occurrence) in sorted(set(previous_record_map) - set(record_map)):
+        dirty_records.append(("removed", record_id, None, None))
+
+    # Print status message
+    if debug_level == 1:
+        print(len(ort_utterances) - len([record for record in dirty_records if record[0] != "removed"]), "records unchanged,", len(dirty_records), "records new, changed or removed.")
+
+    return (record_map, dirty_records)
+
+
+# Function to write the list of dirty records, i.e. the utterances that have
+# to be aligned again, with their TRN segments
+# Arguments:
+# 1. the name of the file
+# 2. the list of dirty records as produced by compareRecords
+def writeDirtySegments(file_name, dirty_records):
+
+    dirty_segments_file = codecs.open(file_name, "w", "utf-8")
+
+    print("status\trecord\tstart_sample\tduration\tword_ids", file=dirty_segments_file)
+
+    for (status, record_id, ort_utterance, kan_utterance) in dirty_records:
+
+        if ort_utterance is None:
+            print("\t".join([status, record_id, "", "", ""]), file=dirty_segments_file)
+            continue
+
+        (start_sample, end_sample) = (ort_utterance[2], ort_utterance[3])
+
+        if start_sample is not None and end_sample is not None:
+            segment = [str(start_sample), str(end_sample - start_sample)]
+        else:
+            segment = ["", ""]
+
+        print("\t".join([status, record_id] + segment + [",".join(str(word[0]) for word in ort_utterance[1])]), file=dirty_segments_file)
+
+    dirty_segments_file.close()
+
+
+# Function to print the ORT tier
+# Arguments:
+# 1. the file handle
+# 2. the list of ORT utterances as produced by convertToORT
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+def printORT(file_handle, ort_utterances, debug_level=0):
+    # Print status report
+    if debug_level == 1:
+        print("Printing ORT (orthography) tier.")
+    
+    # Go through list of utterances
+    for ort_utterance in ort_utterances:
+        utterance = ort_utterance[1]
+        
+        # Go through list of words
+        for word in utterance:
+            word_id = word[0]
+            ort_word = word[1]
+            
+            # Print ORT tier line to file
+            print("ORT:", word_id, ort_word, file=file_handle)
+
+
+# Function to print the KAN (canonical transliteration) tier
+# Arguments:
+# 1. the file handle
+# 2. the list of transliterated utterances as produced by transliterateORT
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+def printKAN(file_handle, kan_utterances, debug_level=0):
+    # Print status report
+    if debug_level == 1:
+        print("Printing KAN (canonical transcription) tier.")
+    
+    # Go through list of utterances
+    for kan_utterance in kan_utterances:
+        utterance = kan_utterance[1]
+        
+        # Go through list of words
+        for word in utterance:
+            word_id = word[0]
+            kan_word = word[1]
+            
+            # Print KAN tier line to file
+            print("KAN:", word_id, kan_word, file=file_handle)
+
+
+# Function to check whether all phonemes in the KAN tier are contained in a phoneme inventory
+# (with the same results as CheckBASPartiturPhonemeInventory for the BAS Partitur file)
+# Arguments:
+# 1. the list of transliterated utterances as produced by transliterateORT
+# 2. the list of allowed phonemes as read in by read_inventory_file
+# 3. the number of the line of the first word of the KAN tier in the BAS Partitur file
+# 4. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a dictionary of illegal phonemes as produced by check_phonemes
+def checkKAN(kan_utterances, allowed_phonemes, first_line_number, debug_level=0):
+    # Print status report
+    if debug_level == 1:
+        print("Checking KAN (canonical transcription) tier against phoneme inventory.")
+
+    list_of_words = []
+
+    # Go through list of utterances
+    for kan_utterance in kan_utterances:
+
+        # Go through list of words
+        for word in kan_utterance[1]:
+
+            # Normalize white space like when reading the KAN tier from the BAS Partitur file
+            list_of_words.append((" ".join(word[1].split()), first_line_number + len(list_of_words)))
+
+    return check_phonemes(list_of_words, allowed_phonemes)
+
+
+# Function to print an additional tier with information about utterances
+# Arguments:
+# 1. the file handle
+# 2. the list of transliterated utterances as produced by transliterateORT
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+def printUtteranceIDs(file_handle, ort_utterances, debug_level=0):
+    # Print status report
+    if debug_level == 1:
+        print("Printing additional utterance ID tier.")
+    
+    # Go through list of utterances
+    for ort_utterance in ort_utterances:
+        record_id = ort_utterance[0]
+        utterance = ort_utterance[1]
+        
+        # Assemble list of words
+        word_id_list = []
+        
+        # Go through list of words
+        for word in utterance:
+            word_id = word[0]
+            word_id_list.append(str(word_id))
+        
+        # Concatenate list of words with commas
+        # and output a symbolic association between words and record id
+        print("RID:", ",".join(word_id_list), record_id, file=file_handle)
+
+
+# Function to print an additional tier with utterance start and end times
+# in order to constrain automatic time alignment
+# Arguments:
+# 1. the file handle
+# 2. the list of utterances as produced by convertToORT
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+def printUtteranceTimes(file_handle, ort_utterances, debug_level=0):
+    
+    # Print status report
+    if debug_level == 1:
+        print("Printing additional utterance start and end times tier.")
+    
+    # Remember end time of last utterance
+    last_end_sample = 0
+    
+    # Go through list of utterances
+    for ort_utterance in ort_utterances:
+        record_id = ort_utterance[0]
+        utterance = ort_utterance[1]
+        start_sample = ort_utterance[2]
+        end_sample = ort_utterance[3]
+        
+        # Only output a TRN tier if the begin and end times
+        # for the current utterance have been found
+        if start_sample is not None and end_sample is not None:
+            
+            # Sanity check
+            if start_sample >= end_sample:
+                
+                print("Start time of utterance", record_id, "is greater or equal than end time.")
+                sys.exit()
+            
+            if start_sample < last_end_sample:
+                
+                print("Warning: Overlapping utterance", record_id)
+            
+            duration = end_sample - start_sample
+
+            # Remember end time of last utterance
+            last_end_sample = end_sample
+        
+            # Assemble list of words
+            word_id_list = []
+        
+            # Go through list of words
+            for word in utterance:
+                word_id = word[0]
+                word_id_list.append(str(word_id))
+        
+            # Concatenate list of words with commas
+            # and output the start and duration of the current utterance
+            # in samples and a symbolic association between words and record id
+            print("TRN:", str(start_sample), str(duration), ",".join(word_id_list), record_id, file=file_handle)
+            
+#            if (duration < 10000):
+              
+#                print("Very short TRN:", str(start_sample), str(duration), ",".join(word_id_list), record_id)
+
+
+# Function to write a BAS Partitur file and an excerpt of the wave file for each chunk
+# of a fixed number of utterances, so that the chunks can be aligned independently
+# Only utterances with start and end times are included in the chunks.
+# Arguments:
+# 1. The name of the BAS Partitur file of the whole recording
+#    (the names of the chunk files are derived from it)
+# 2. the list of ORT utterances as produced by convertToORT
+# 3. the list of KAN utterances as produced by transliterateORT
+# 4. the number of utterances per chunk
+# 5. the name of the wave file
+# 6. the sample rate of the wave file
+# 7. the bit depth of the wave file in bytes
+# 8. the number of channels of the wave file
+# 9. the name of the Toolbox file (for the header)
+# 10. The output character encoding (defaults to utf-8)
+# 11. debug level (0 --> no status messages, 1 --> print status messages)
+# returns the name of the chunk list file
+def writeChunks(output_file_name, ort_utterances, kan_utterances, chunk_size, wave_file_name, sample_rate, bit_depth, channels, input_file_name, output_encoding="utf-8", debug_level=0):
+
+    # Sanity check
+    if chunk_size < 1:
+        print("The number of utterances per chunk has to be at least 1.")
+        sys.exit()
+
+    if readWaveHeader(wave_file_name)["sample_rate"] != sample_rate:
+        print("The sample rate of the wave file", wave_file_name, "is not", sample_rate, "Hz.")
+        sys.exit()
+
+    # Collect the utterances with start and end times
+    timed_utterances = []
+
+    for (ort_utterance, kan_utterance) in zip(ort_utterances, kan_utterances):
+
+        if ort_utterance[2] is None or ort_utterance[3] is None:
+            print("Warning: Utterance", ort_utterance[0], "has no start or end time and is not included in any chunk.")
+            continue
+
+        timed_utterances.append((ort_utterance, kan_utterance))
+
+    chunks = []
+
+    for first_utterance in range(0, len(timed_utterances), chunk_size):
+
+        chunk_utterances = timed_utterances[first_utterance:first_utterance + chunk_size]
+        chunk_number = len(chunks) + 1
+
+        # The chunk covers all its utterances
+        start_sample = min(ort_utterance[2] for (ort_utterance, kan_utterance) in chunk_utterances)
+        end_sample = max(ort_utterance[3] for (ort_utterance, kan_utterance) in chunk_utterances)
+
+        chunk = {"par": getChunkFileName(output_file_name, chunk_number, ".par"),
+                 "wave": getChunkFileName(output_file_name, chunk_number, ".wav"),
+                 "mau": getChunkFileName(output_file_name, chunk_number, ".mau"),
+                 "start_sample": start_sample,
+                 "end_sample": end_sample,
+                 "word_ids": []}
+
+        # Number the words of the chunk from 0 and make the utterance times relative to the chunk
+        chunk_ort_utterances = []
+        chunk_kan_utterances = []
+
+        for (ort_utterance, kan_utterance) in chunk_utterances:
+
+            first_word_id = len(chunk["word_ids"])
+
+            chunk["word_ids"].extend(word[0] for word in ort_utterance[1])
+
+            chunk_ort_utterances.append((ort_utterance[0], [(first_word_id + index, word[1]) for (index, word) in enumerate(ort_utterance[1])], ort_utterance[2] - start_sample, ort_utterance[3] - start_sample))
+            chunk_kan_utterances.append((kan_utterance[0], [(first_word_id + index, word[1]) for (index, word) in enumerate(kan_utterance[1])]))
+
+        # Print status message
+        if debug_level == 1:
+            print("Writing chunk", chunk_number, "to", chunk["par"], "and", chunk["wave"])
+
+        writeWaveExcerpt(wave_file_name, chunk["wave"], start_sample, end_sample)
+
+        chunk_file = codecs.open(chunk["par"], "w", output_encoding)
+
+        printBASPartiturHeader(chunk_file, snb=bit_depth, sam=sample_rate, ssb=bit_depth*8, nch=channels, dbn=os.path.basename(input_file_name), src=os.path.basename(chunk["wave"]))
+
+        print(file=chunk_file)
+        printORT(chunk_file, chunk_ort_utterances)
+        print(file=chunk_file)
+        printKAN(chunk_file, chunk_kan_utterances)
+        print(file=chunk_file)
+        printUtteranceIDs(chunk_file, chunk_ort_utterances)
+        print(file=chunk_file)
+        printUtteranceTimes(chunk_file, chunk_ort_utterances)
+
+        chunk_file.close()
+
+        chunks.append(chunk)
+
+    chunk_list_file_name = getChunkListFileName(output_file_name)
+
+    writeChunkList(chunk_list_file_name, chunks)
+
+    # Print status message
+    if debug_level == 1:
+        print("Wrote", len(chunks), "chunks listed in", chunk_list_file_name)
+
+    return chunk_list_file_name
+
+
+# Function to convert the transcription in a Toolbox file to a BAS Partitur file
+# Arguments:
+# 1. The name of the input Toolbox file
+# 2. The name of the output BAS Partitur file
+# 3. The name of the transliteration table file
+# 4. The name of the transcription tier marker in the Toolbox file
+# 5. The name of the record marker in the Toolbox file
+# 6. The sample rate of the associated wave file in Hz (defaults to 44100)
+# 7. The number of channels of the associated wave file (defaults to 1)
+# 8. The bit depth of the associated wave file in bytes (defaults to 2)
+# 9. The name of the associated wave file (defaults to None)
+# 10. The name of the Toolbox tier containing utterance start times (defaults to None)
+# 11. The name of the Toolbox tier containing utterance end times (defaults to None)
+#     (if both are given, a TRN tier constraining the automatic alignment is output)
+# 12. The input character encoding (defaults to utf-8)
+# 13. The output character encoding (defaults to utf-8)
+# 14. The character encoding of the transliteration table (defaults to utf-8)
+# 15. debug level (0 --> no status messages, 1 --> print status messages)
+# 16. The name of a file in which transliterations are cached between runs (defaults to None)
+# 17. The name of a KANINVENTAR file against which the KAN tier is checked (defaults to None, i.e. no check)
+# 18. The character encoding of the KANINVENTAR file (defaults to utf-8)
+# 19. The name of a file in which the word ids and fingerprints of the records are kept
+#     between runs to find the records that have changed (defaults to None)
+# 20. The name of a file to which the records that are new, changed or removed
+#     since the last run are written (defaults to None, only used with a record map file);
+#     with utterance times and a wave file, a chunk of its own is written for each new
+#     or changed record (see writeChunks)
+# 21. The number of utterances per chunk (defaults to None, i.e. no chunks are written)
+#     (only possible with utterance start and end times and a wave file, see writeChunks)
+# 22. The number of the first record to be processed (defaults to None, i.e. the first record)
+# 23. The number of the last record to be processed (defaults to None, i.e. the last record)
+# 24. The record id of the first record to be processed (defaults to None, overrides 22.)
+# 25. The record id of the last record to be processed (defaults to None, overrides 23.)
+# returns a dictionary of illegal phonemes as produced by check_phonemes
+# (None if no KANINVENTAR file is given)
+def toolbox_to_partitur(input_file_name, output_file_name, transliteration_file_name, transcription_tier_name, reference_tier_name, sample_rate=44100, channels=1, bit_depth=2, wave_file_name=None, start_time_marker=None, end_time_marker=None, input_encoding="utf-8", output_encoding="utf-8", transliteration_encoding="utf-8", debug_level=0, transliteration_cache_file_name=None, inventory_file_name=None, inventory_encoding="utf-8", record_map_file_name=None, dirty_segments_file_name=None, chunk_size=None, start_number=None, end_number=None, start_id=None, end_id=None):
+
+    # Only constrain the alignment if both utterance start and end times are known
+    constrain_alignment = start_time_marker is not None and end_time_marker is not None
+
+    # Chunks are cut from the wave file at the utterance times
+    if chunk_size is not None and (not constrain_alignment or wave_file_name is None):
+        print("Splitting the recording into chunks requires utterance start and end times and a wave file.")
+        sys.exit()
+
+    # Print status report
+    if debug_level == 1:
+        print("Converting Toolbox file", input_file_name, "to", output_file_name)
+
+    # Read in Toolbox file
+    if constrain_alignment:
+        toolbox_text = readToolboxFile(input_file_name, transcription_tier_name, reference_tier_name, sample_rate, start_time_marker, end_time_marker, input_encoding, debug_level)
+    else:
+        toolbox_text = readToolboxFile(input_file_name, transcription_tier_name, reference_tier_name, sample_rate, None, None, input_encoding, debug_level)
+
+    # Only process the selected range of records
+    if start_number is not None or end_number is not None or start_id is not None or end_id is not None:
+        toolbox_text = selectRecords(toolbox_text, start_number, end_number, start_id, end_id, debug_level)
+
+    # Read transliteration table
+    transliteration_table = readTransliterationTable(transliteration_file_name, transliteration_encoding, debug_level)
+
+    # Create orthographic tier (ORT)
+    ort_tier = convertToORT(toolbox_text, debug_level)
+
+    # Read in the transliterations of earlier runs
+    if transliteration_cache_file_name is not None:
+        readTransliterationCache(transliteration_cache_file_name, transliteration_table, debug_level)
+
+    # Perform transliteration to KAN tier
+    kan_tier = transliterateORT(ort_tier, transliteration_table, debug_level)
+
+    # Save the transliterations for later runs
+    if transliteration_cache_file_name is not None:
+        writeTransliterationCache(transliteration_cache_file_name, transliteration_table, debug_level)
+
+    # Determine the records that have changed since the last run
+    if record_map_file_name is not None:
+        (record_map, dirty_records) = compareRecords(ort_tier, kan_tier, readRecordMap(record_map_file_name), debug_level)
+
+    # Create output file
+    output_file = codecs.open(output_file_name, "w", output_encoding)
+
+    # Determine the name of the wave file for the header
+    if wave_file_name is not None:
+        src = os.path.basename(wave_file_name)
+    else:
+        src = None
+
+    # Print BAS Partitur header
+    number_of_header_lines = printBASPartiturHeader(output_file, snb=bit_depth, sam=sample_rate, ssb=bit_depth*8, nch=channels, dbn=os.path.basename(input_file_name), src=src, debug_level=debug_level)
+
+    # Insert empty line
+    print(file=output_file)
+
+    # Print orthographic tier (ORT)
+    printORT(output_file, ort_tier, debug_level)
+
+    # Insert empty line
+    print(file=output_file)
+
+    # Print canonical transcription tier (KAN)
+    printKAN(output_file, kan_tier, debug_level)
+
+    # Insert empty line
+    print(file=output_file)
+
+    # Print additional information about utterances
+    printUtteranceIDs(output_file, ort_tier, debug_level)
+
+    # Optionally also output a tier with known utterance start
+    # and end times in order to constraint the automatic alignment
+    if constrain_alignment:
+
+        # Insert empty line
+        print(file=output_file)
+
+        # Print additional information about utterance start and end times
+        printUtteranceTimes(output_file, ort_tier, debug_level)
+
+    # Close output file
+    output_file.close()
+
+    # Save the word ids of the records for later runs
+    if record_map_file_name is not None:
+        writeRecordMap(record_map_file_name, record_map)
+
+        if dirty_segments_file_name is not None:
+            writeDirtySegments(dirty_segments_file_name, dirty_records)
+
+            # Write a chunk for each new or changed record, so that only these
+            # have to be aligned again (e.g. DIRTYBASENAME.chunk001.par for DIRTYBASENAME.tsv)
+            if constrain_alignment and wave_file_name is not None:
+                dirty_chunks_file_name = os.path.splitext(dirty_segments_file_name)[0] + os.path.splitext(output_file_name)[1]
+
+                writeChunks(dirty_chunks_file_name, [record[2] for record in dirty_records if record[0] != "removed"], [record[3] for record in dirty_records if record[0] != "removed"], 1, wave_file_name, sample_rate, bit_depth, channels, input_file_name, output_encoding, debug_level)
+
+    # Write a BAS Partitur file and a wave file for each chunk of utterances
+    if chunk_size is not None:
+        writeChunks(output_file_name, ort_tier, kan_tier, chunk_size, wave_file_name, sample_rate, bit_depth, channels, input_file_name, output_encoding, debug_level)
+
+    # Check the phonemes of the KAN tier
+    if inventory_file_name is None:
+        return None
+
+    allowed_phonemes = read_inventory_file(inventory_file_name, inventory_encoding)
+
+    # The KAN tier starts after the header, the ORT tier and two empty lines
+    first_line_number = number_of_header_lines + sum(len(utterance[1]) for utterance in ort_tier) + 3
+
+    results = checkKAN(kan_tier, allowed_phonemes, first_line_number, debug_level)
+
+    # Output the results
+    print_results(results, output_file_name)
+
+    return results
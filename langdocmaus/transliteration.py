@@ -0,0 +1,421 @@
+# encoding=utf-8
+
+# Functions for the grapheme-to-phoneme conversion of orthographic words
+# to SAMPA using transliteration tables
+
+# Codecs for handling character encodings
+import codecs
+
+# Ordered dictionary for the transliteration cache
+import collections
+
+# Module to compute fingerprints of transliteration tables
+import hashlib
+
+import os
+
+# Use regular expressions
+import re
+
+import sys
+
+# Maximal number of words kept in the transliteration cache
+TRANSLITERATION_CACHE_SIZE = 100000
+
+# Cache from pairs (table fingerprint, orthographic word) to transliterations,
+# the least recently used words are removed first if the cache is full
+transliteration_cache = collections.OrderedDict()
+
+
+# Function to read in a transliteration table
+# (Format:
+#  Source_Symbol(s) --> Target_Symbol(s)
+#  one entry per line)
+# Arguments:
+# 1. Name of the file
+# 2. Character encoding to use (defaults to UTF-8)
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a list of transliteration pairs (tuples)
+def readTransliterationTable(file_name, encoding="utf-8", debug_level=0):
+
+    # Make a new transliteration table
+    transliteration_table = []
+    
+    # Print status message
+    if debug_level == 1:
+        print("Reading in transliteration table from file", file_name)
+    
+    # Compile regular expression for deletion lines
+    deletion_re = re.compile(r"^(\S+)\s+\-\-\s*$")
+    
+    # Open file
+    table_file = codecs.open(file_name, "r", encoding)
+    
+    # Read in table
+    for line in table_file:
+        
+        # Normalize whitespace
+        line = line.rstrip("\r\n")
+        # line = re.sub(r"\s+", " ", line)
+        
+        # Skip empty lines
+        if line == "": continue
+        
+        # Skip comments, starting with #
+        if re.search(r"^\#", line):
+            continue        
+        
+        # Split line at arrow
+        line_split = line.split(" --> ")
+        
+        if len(line_split) == 2:
+            (source, destination) = line_split
+        else:
+            match = deletion_re.search(line)
+            if match:
+                source = match.group(1)
+                destination = ""
+            else:
+                print("Line in transliteration table is not well-formed:", line)
+                sys.exit()
+        
+        # Insert entry into transliteration dictionary
+        transliteration_table.append((source, destination))
+    
+    # Print status message
+    if debug_level == 1:
+        print(len(transliteration_table), "transliteration pairs read in.")
+    
+    return transliteration_table
+
+# Function to transliterate a single orthographic word to SAMPA
+# Arguments:
+# 1. An orthographic word
+# 2. A transliteration table dictionary as produced by readTransliterationTable
+# returns a transliteration of the word to SAMPA
+def transliterate(word, transliteration_table):
+    # SAMPA transcription
+    sampa_word = word
+    
+    # Iterate through all rules
+    for pair in transliteration_table:
+        source = pair[0]
+        destination = pair[1]
+        
+        # Status report
+        # print("Replacing '" + source + "' with '" + destination + "'.")
+
+        # Transliterate single grapheme
+#        sampa_word = re.sub(source, destination, sampa_word)
+        sampa_word = sampa_word.replace(source, destination)
+        
+        # Normalize white space
+        sampa_word = re.sub(r"\s+", " ", sampa_word)
+        sampa_word = sampa_word.strip()
+    
+    return sampa_word
+
+
+# Function to compile a transliteration table into a sequence of stages
+# that can each be applied to a word in a single pass
+#
+# The rules of a transliteration table are applied one after the other
+# (cf. transliterate). Consecutive rules are combined into one stage as long as
+# applying them in a single left-to-right pass gives the same result, i.e.
+# - the sources of the rules in a stage have no characters in common
+#   (so at most one rule can match at any position),
+# - no source contains characters produced by an earlier rule of the stage
+#   (so a later rule never applies to the output of an earlier one),
+# - no source contains whitespace (which is normalized after every rule),
+# - and no source with more than one character follows a deletion
+#   (which could join characters into a new match).
+# Arguments:
+# 1. A transliteration table as produced by readTransliterationTable
+# returns a list of stages as pairs (normalize_first, stage), where stage is either
+# a translation table for str.translate (if all sources of the stage are single
+# characters) or a pair of a compiled regular expression matching all sources
+# (longest first) and a dictionary from sources to destinations
+def compileTransliterationTable(transliteration_table):
+
+    # Group the rules into stages
+    stages = []
+
+    cur_stage = []
+    cur_source_characters = set()
+    cur_destination_characters = set()
+    cur_has_deletion = False
+
+    for (source, destination) in transliteration_table:
+
+        source_characters = set(source)
+
+        # Test whether the rule can be added to the current stage
+        if len(cur_stage) > 0:
+
+            if (source_characters & cur_source_characters
+                or source_characters & cur_destination_characters
+                or re.search(r"\s", source) or source == ""
+                or (cur_has_deletion and len(source) > 1)):
+
+                stages.append(cur_stage)
+                cur_stage = []
+                cur_source_characters = set()
+                cur_destination_characters = set()
+                cur_has_deletion = False
+
+        cur_stage.append((source, destination))
+        cur_source_characters |= source_characters
+        cur_destination_characters |= set(destination)
+        cur_has_deletion = cur_has_deletion or destination == ""
+
+        # Rules with whitespace in the source always form a stage of their own
+        if re.search(r"\s", source) or source == "":
+            stages.append(cur_stage)
+            cur_stage = []
+            cur_source_characters = set()
+            cur_destination_characters = set()
+            cur_has_deletion = False
+
+    if len(cur_stage) > 0:
+        stages.append(cur_stage)
+
+    # Compile the stages
+    compiled_stages = []
+
+    for stage in stages:
+
+        # White space is normalized after every rule, but this only makes a difference
+        # for the following stage if one of its sources contains white space (or is empty)
+        normalize_first = len(compiled_stages) > 0 and any(source == "" or re.search(r"\s", source) for (source, destination) in stage)
+
+        # Single-character sources can be replaced using a translation table
+        if all(len(source) == 1 for (source, destination) in stage):
+            compiled_stages.append((normalize_first, dict((ord(source), destination) for (source, destination) in stage)))
+
+        # Otherwise use a regular expression matching the longest source first
+        else:
+            sources = sorted(set(source for (source, destination) in stage), key=len, reverse=True)
+            compiled_stages.append((normalize_first, (re.compile("|".join(re.escape(source) for source in sources)), dict(stage))))
+
+    return compiled_stages
+
+
+# Function to transliterate a single orthographic word to SAMPA
+# using a compiled transliteration table (with the same result as transliterate)
+# Arguments:
+# 1. An orthographic word
+# 2. A compiled transliteration table as produced by compileTransliterationTable
+# returns a transliteration of the word to SAMPA
+def transliterateCompiled(word, compiled_table):
+    # SAMPA transcription
+    sampa_word = word
+
+    # Apply all stages
+    for (normalize_first, stage) in compiled_table:
+
+        # Normalize white space
+        if normalize_first:
+            sampa_word = re.sub(r"\s+", " ", sampa_word)
+            sampa_word = sampa_word.strip()
+
+        if isinstance(stage, dict):
+            sampa_word = sampa_word.translate(stage)
+        else:
+            (source_re, destinations) = stage
+            sampa_word = source_re.sub(lambda match: destinations[match.group(0)], sampa_word)
+
+    # Normalize white space
+    sampa_word = re.sub(r"\s+", " ", sampa_word)
+    sampa_word = sampa_word.strip()
+
+    return sampa_word
+
+
+# Function to compute a fingerprint of a transliteration table
+# (tables with the same rules in the same order have the same fingerprint)
+# Arguments:
+# 1. A transliteration table as produced by readTransliterationTable
+# returns the fingerprint as a string of hexadecimal digits
+def getTableFingerprint(transliteration_table):
+
+    fingerprint = hashlib.sha1()
+
+    for (source, destination) in transliteration_table:
+        fingerprint.update((source + "\t" + destination + "\n").encode("utf-8"))
+
+    return fingerprint.hexdigest()
+
+
+# Function to transliterate a single orthographic word to SAMPA
+# using the transliteration cache
+# Arguments:
+# 1. An orthographic word
+# 2. A compiled transliteration table as produced by compileTransliterationTable
+# 3. The fingerprint of the transliteration table as produced by getTableFingerprint
+# returns a pair of the transliteration of the word to SAMPA and
+# a Boolean indicating whether the word was found in the cache
+def transliterateCached(word, compiled_table, table_fingerprint):
+
+    key = (table_fingerprint, word)
+
+    # Look up the word in the cache and mark it as recently used
+    if key in transliteration_cache:
+        transliteration_cache.move_to_end(key)
+        return (transliteration_cache[key], True)
+
+    # Transliterate the word and put it into the cache
+    sampa_word = transliterateCompiled(word, compiled_table)
+
+    transliteration_cache[key] = sampa_word
+
+    # Remove the least recently used word if the cache is full
+    if len(transliteration_cache) > TRANSLITERATION_CACHE_SIZE:
+        transliteration_cache.popitem(last=False)
+
+    return (sampa_word, False)
+
+
+# Function to read in a transliteration cache file created by writeTransliterationCache
+# (the cached words are only used if the file was created with the same transliteration table)
+# Arguments:
+# 1. Name of the cache file
+# 2. A transliteration table as produced by readTransliterationTable
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+def readTransliterationCache(file_name, transliteration_table, debug_level=0):
+
+    # There is nothing to read before the first run
+    if not os.path.exists(file_name):
+        return
+
+    table_fingerprint = getTableFingerprint(transliteration_table)
+
+    cache_file = codecs.open(file_name, "r", "utf-8")
+
+    # The first line contains the fingerprint of the transliteration table
+    if cache_file.readline().rstrip("\r\n") != table_fingerprint:
+        cache_file.close()
+
+        # Print status message
+        if debug_level == 1:
+            print("Ignoring transliteration cache file", file_name, "created with a different transliteration table")
+
+        return
+
+    num_words = 0
+
+    # Each line contains an orthographic word and its transliteration separated by a tab
+    for line in cache_file:
+        (word, sampa_word) = line.rstrip("\r\n").split("\t")
+
+        transliteration_cache[(table_fingerprint, word)] = sampa_word
+        num_words += 1
+
+        # Remove the least recently used word if the cache is full
+        if len(transliteration_cache) > TRANSLITERATION_CACHE_SIZE:
+            transliteration_cache.popitem(last=False)
+
+    cache_file.close()
+
+    # Print status message
+    if debug_level == 1:
+        print(num_words, "transliterations read in from cache file", file_name)
+
+
+# Function to write the cached transliterations for a transliteration table to a file
+# Arguments:
+# 1. Name of the cache file
+# 2. A transliteration table as produced by readTransliterationTable
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+def writeTransliterationCache(file_name, transliteration_table, debug_level=0):
+
+    table_fingerprint = getTableFingerprint(transliteration_table)
+
+    # Write to a temporary file first so that an interrupted run
+    # does not leave behind an incomplete cache file
+    temporary_file_name = "%s.%d.tmp" % (file_name, os.getpid())
+
+    cache_file = codecs.open(temporary_file_name, "w", "utf-8")
+
+    print(table_fingerprint, file=cache_file)
+
+    num_words = 0
+
+    # Words are written from the least to the most recently used
+    # so that reading the file restores the order of the cache
+    for ((fingerprint, word), sampa_word) in transliteration_cache.items():
+        if fingerprint == table_fingerprint:
+            print(word + "\t" + sampa_word, file=cache_file)
+            num_words += 1
+
+    cache_file.close()
+
+    os.replace(temporary_file_name, file_name)
+
+    # Print status message
+    if debug_level == 1:
+        print(num_words, "transliterations written to cache file", file_name)
+
+
+# Function to transliterate orthographic words to SAMPA
+# Arguments:
+# 1. A list of ORT utterances as produced by convertToORT
+# 2. A transliteration table dictionary as produced by readTransliterationTable
+# 3. debug level (0 --> no status messages, 1 --> print status messages)
+# returns a list of utterances as tuples (recordid, list(tuple(number, SAMPA-word)))
+def transliterateORT(ort_utterances, transliteration_table, debug_level=0):
+    # Build up a new list of utterances
+    sampa_utterances = []
+    
+    # Print status message
+    if debug_level == 1:
+        print("Converting ORT (orthographic) tier to KAN (canonical transcription) tier.")
+
+    # Compile the transliteration table once for all words
+    compiled_table = compileTransliterationTable(transliteration_table)
+    table_fingerprint = getTableFingerprint(transliteration_table)
+
+    # Count how many words were found in the transliteration cache
+    cache_hits = 0
+    cache_misses = 0
+    
+    # Go through Toolbox text
+    for utterance in ort_utterances:
+        record_id = utterance[0]
+        utterance = utterance[1]
+        
+        # New list of transliterated words
+        sampa_utterance = []
+
+        # Go through all words in the utterance        
+        for word in utterance:
+            word_id = word[0]
+            word_ORT = word[1]
+            
+            # Transliterate ORT to SAMPA
+            (word_SAMPA, found_in_cache) = transliterateCached(word_ORT, compiled_table, table_fingerprint)
+
+            if found_in_cache:
+                cache_hits += 1
+            else:
+                cache_misses += 1
+            
+            # If the transliteration produces an empty token,
+            # leave out this token 
+            if word_SAMPA.strip() == "":
+                word_SAMPA = "<nib>"
+                print("Transliteration led to empty word:")
+                print("ORT:", word_ORT)
+                print("KAN:", word_SAMPA)
+            
+            # Append newly transliterated word
+            sampa_utterance.append((word_id, word_SAMPA))
+        
+        # Append SAMPA utterance to list of utterances
+        sampa_utterances.append((record_id, sampa_utterance))
+    
+    # Print status message
+    if debug_level == 1:
+        print("Transliterated", len(sampa_utterances), "utterances from ORT to SAMPA.")
+        print("Transliteration cache:", cache_hits, "hits,", cache_misses, "misses.")
+    
+    return sampa_utterances
@@ -0,0 +1,551 @@
+# encoding=utf-8
+
+# Functions to set word start and end times in an ELAN file
+# by extracting the relevant information from a Toolbox file.
+
+# Binary search in the sorted parent annotations
+import bisect
+
+import codecs
+
+# Writing the report of words without word times
+import csv
+
+# Regular expressions
+import re
+
+import sys
+
+# Functions for reading and writing ELAN files
+from langdocmaus.eaf import isSameFile
+from langdocmaus.eaf import readELANFile
+from langdocmaus.eaf import writeELANFile
+
+# Functions for reading Toolbox files
+from langdocmaus.toolbox import readToolboxFile
+
+
+# Function to remove "a" or "ann" before annotation IDs
+def remove_ann(ann_id):
+    return int(re.sub("^a(nn)?", "", ann_id))
+
+
+# Function to extract information about word start and end times
+# from a Toolbox file
+# Arguments:
+# 1. The Toolbox as read in by readToolboxFile
+# 2. The name of the reference tier
+# 3. The name of the tier containing the word start times
+# 4. The name of the tier containing the word end times
+# returns a dictionary from Toolbox references
+# to a list of two lists (one with word start times
+# and one with word end times)
+def extractWordTimes(toolbox_file, reference_tier_name, word_start_tier_name, word_end_tier_name):
+
+    # Dictionary from Toolbox annotation unit IDs to word start and end times
+    toolbox_refs_to_word_times = {}
+
+    # Compile a regular expression to extract the tier contents
+    tier_contents_re = re.compile("^" + r"\\(\S+)\s+(.+)$")
+
+    # Current utterance ID
+    cur_utterance_id = None
+    cur_word_start_times = []
+    cur_word_end_times = []
+    
+    line_number = 0
+
+    # Go through Toolbox file to find annotation units with word start and end times
+    for line in toolbox_file:
+        
+        # Increase line number
+        line_number += 1
+        
+        # Unpack line contents
+        (cur_toolbox_marker, cur_line, cur_line_ending) = line
+        
+        # Check whether we have found the reference tier
+        if cur_toolbox_marker == reference_tier_name:
+                    
+            # Save current word start and end times of preceding utterance
+            if cur_utterance_id is not None:
+                
+                if len(cur_word_start_times) > 0 and len(cur_word_end_times) > 0:
+        
+                    # Save information in dictionary
+                    toolbox_refs_to_word_times[cur_utterance_id] = [cur_word_start_times, cur_word_end_times]
+
+                    cur_utterance_id = None
+                    cur_word_start_times = []
+                    cur_word_end_times = []
+                
+                else:
+                    
+                    print("Warning: Did not find word start and end times for the following, possibly empty utterance:", cur_utterance_id)
+            
+            # Extract the contents of the reference tier
+            match = tier_contents_re.search(cur_line)
+
+            if match:
+
+                cur_utterance_id = match.group(2).strip()
+
+            else:
+
+                print("Something is wrong. I cannot extract the reference from the reference tier in line " + str(line_number) +".")
+                print(line)
+                sys.exit()
+    
+        elif cur_toolbox_marker == word_start_tier_name:
+        
+            # Extract the contents of the tier
+            match = tier_contents_re.search(cur_line)
+
+            if match:
+
+                cur_word_start_times.extend(match.group(2).strip().split())
+
+            else:
+
+                print("Something is wrong. I cannot extract the word start times from the tier in line " + str(line_number) +".")
+                print(line)
+                sys.exit()
+
+        elif cur_toolbox_marker == word_end_tier_name:
+        
+            # Extract the contents of the tier
+            match = tier_contents_re.search(cur_line)
+
+            if match:
+
+                cur_word_end_times.extend(match.group(2).strip().split())
+
+            else:
+
+                print("Something is wrong. I cannot extract the word start times from the tier in line " + str(line_number) +".")
+                print(line)
+                sys.exit()
+            
+    # Save current word start and end times
+    if cur_utterance_id is not None:
+        
+        if len(cur_word_start_times) > 0 and len(cur_word_end_times) > 0:
+        
+            # Save information in dictionary
+            toolbox_refs_to_word_times[cur_utterance_id] = [cur_word_start_times, cur_word_end_times]
+
+            cur_utterance_id = None
+            cur_word_start_times = []
+            cur_word_end_times = []
+        
+        else:
+            
+            print("Warning: Did not find word start and end times for the following, possibly empty utterance:", cur_utterance_id)
+
+    return toolbox_refs_to_word_times
+
+
+# Function to index the annotations on a parent tier by their start times
+# so that the parent annotations containing an annotation can be found
+# by binary search (cf. findParentAnnotations)
+# Arguments:
+# 1. The annotations on the parent tier
+# 2. The word start and end times as extracted by extractWordTimes
+#    (parent annotations without word times are left out)
+# returns a tuple of three lists sorted by the start times of the parent annotations:
+# the start times, the maximal end times up to each parent annotation and the parent
+# annotations as tuples (start time, end time, position on the parent tier, annotation id)
+def indexParentAnnotations(parent_annotations, toolbox_refs_to_word_times):
+
+    parents = []
+
+    for (position, parent_annotation) in enumerate(parent_annotations):
+
+        # Make sure that there are word times for the current parent annotation
+        # Otherwise ignore it
+        if parent_annotation.get_annotation_value() not in toolbox_refs_to_word_times:
+            continue
+
+        parents.append((parent_annotation.get_start_time(), parent_annotation.get_end_time(), position, parent_annotation.get_annotation_id()))
+
+    # Sort the parent annotations by their start times
+    parents.sort(key=lambda parent: parent[0])
+
+    start_times = [parent[0] for parent in parents]
+
+    # Remember the maximal end time of all parent annotations up to each position
+    # in order to know when to stop searching for containing parent annotations
+    max_end_times = []
+    max_end_time = None
+
+    for parent in parents:
+
+        if max_end_time is None or parent[1] > max_end_time:
+            max_end_time = parent[1]
+
+        max_end_times.append(max_end_time)
+
+    return (start_times, max_end_times, parents)
+
+
+# Function to find the parent annotations containing an annotation
+# Arguments:
+# 1. The parent annotations as indexed by indexParentAnnotations
+# 2. The start time of the annotation
+# 3. The end time of the annotation
+# returns a list of the ids of the parent annotations that contain the annotation
+# (in the order of the parent tier)
+def findParentAnnotations(parent_index, start_time, end_time):
+
+    (start_times, max_end_times, parents) = parent_index
+
+    # Only parent annotations starting before the annotation can contain it
+    position = bisect.bisect_right(start_times, start_time)
+
+    containing_parents = []
+
+    # Go back as long as there are parent annotations ending after the annotation
+    while position > 0 and max_end_times[position - 1] >= end_time:
+
+        position -= 1
+
+        if parents[position][1] >= end_time:
+            containing_parents.append(parents[position])
+
+    containing_parents.sort(key=lambda parent: parent[2])
+
+    return [parent[3] for parent in containing_parents]
+
+
+# Function to determine the positions of the daughter annotations within their parent annotations
+# (sorting numerically according to annotation id, because sorting by start times did not work)
+# Arguments:
+# 1. A dictionary from parent annotation ids to lists of the ids of their daughter annotations
+# returns a pair of a dictionary from parent annotation ids to the sorted lists of the ids
+# of their daughter annotations and a dictionary from parent annotation ids to dictionaries
+# from the ids of their daughter annotations to their positions
+def indexDaughterAnnotations(parent_annotation_to_daughter_annotations):
+
+    parent_annotation_to_sorted_daughter_annotations = {}
+    parent_annotation_to_daughter_positions = {}
+
+    for (parent_annotation_id, daughter_annotation_ids) in parent_annotation_to_daughter_annotations.items():
+
+        sorted_daughter_annotation_ids = sorted(daughter_annotation_ids, key=remove_ann)
+
+        daughter_positions = {}
+
+        for (position, daughter_annotation_id) in enumerate(sorted_daughter_annotation_ids):
+
+            if daughter_annotation_id not in daughter_positions:
+                daughter_positions[daughter_annotation_id] = position
+
+        parent_annotation_to_sorted_daughter_annotations[parent_annotation_id] = sorted_daughter_annotation_ids
+        parent_annotation_to_daughter_positions[parent_annotation_id] = daughter_positions
+
+    return (parent_annotation_to_sorted_daughter_annotations, parent_annotation_to_daughter_positions)
+
+
+# Function to set the word start and end times in an ELAN file
+# (the ELAN file is modified in place)
+# Arguments:
+# 1. The ELAN file as read in by readELANFile
+# 2. The word start and end times as extracted by extractWordTimes
+# 3. The name of the transcription tier containing the words
+# 4. A list to collect the words whose times cannot be set (defaults to None, i.e. stop at the first
+#    such word); if a list is given, a tuple (tier id, Toolbox reference of the annotation unit,
+#    annotation id, word, problem, message) is appended for each word and the remaining words
+#    are processed (cf. writeWordTimeErrorReport)
+def importWordTimes(elan_file, toolbox_refs_to_word_times, text_tier_name, word_time_errors=None):
+
+    # Get the time order
+    time_order = elan_file.get_time_order()
+
+    print("Searching for relevant tiers in the ELAN file.")
+
+    relevant_tiers = []
+
+    for tier in elan_file.get_tiers():
+
+        linguistic_type = tier.get_linguistic_type()
+
+        # The linguistic type of the tier has to have the same
+        # name as the Toolbox marker for the text tier
+        if linguistic_type == text_tier_name:
+
+            relevant_tiers.append(tier.get_tier_id())
+
+    # Status message
+    print("Tiers that need to be processed:", " ".join(relevant_tiers))
+
+    # Mapping from annotations to parent annotations
+    annotation_to_parent_annotation = {}
+
+    # Mapping from parent annotations to daughter annotations
+    parent_annotation_to_daughter_annotations = {}
+
+    # Go through the relevant tiers
+    # and determine which annotation is included in which
+    # annotation unit
+    for tier_name in relevant_tiers:
+
+        # Status message
+        print("Processing tier:", tier_name)
+
+        # Get tier
+        tier = elan_file.get_tier_by_id(tier_name)
+
+        # Get annotations in the tier
+        annotations = tier.get_annotations()
+
+        # Get the parent tier
+        parent_tier_name = tier.get_parent_tier_ref()
+
+        # Get tier from ELANFile
+        parent_tier = elan_file.get_tier_by_id(parent_tier_name)
+
+        # Index the annotations on the parent tier by their start and end times
+        parent_index = indexParentAnnotations(parent_tier.get_annotations(), toolbox_refs_to_word_times)
+
+        # Go through annotations
+        for annotation in annotations:
+
+            # Get annotation id
+            annotation_id = annotation.get_annotation_id()
+
+            # Get start time
+            annotation_start_time = annotation.get_start_time()
+
+            # Get end time
+            annotation_end_time = annotation.get_end_time()
+
+            # Go through the parent annotations that include the current annotation
+            for parent_annotation_id in findParentAnnotations(parent_index, annotation_start_time, annotation_end_time):
+
+                annotation_to_parent_annotation[annotation_id] = parent_annotation_id
+
+                if parent_annotation_id in parent_annotation_to_daughter_annotations:
+
+                    parent_annotation_to_daughter_annotations[parent_annotation_id].append(annotation_id)
+
+                else:
+
+                    parent_annotation_to_daughter_annotations[parent_annotation_id] = [annotation_id]
+
+            # Have we found a parent annotation?
+            if annotation_id not in annotation_to_parent_annotation:
+
+                # Record the word and go on with the next one
+                if word_time_errors is not None:
+                    word_time_errors.append((tier_name, None, annotation_id, annotation.get_annotation_value(), "no_parent", "Cannot find parent annotation with word times"))
+                    continue
+
+                raise RuntimeError("Cannot find parent annotation of annotation", annotation_id + ".")
+
+    # Determine the positions of the daughter annotations
+    # within their parent annotations once for all annotations
+    (parent_annotation_to_sorted_daughter_annotations, parent_annotation_to_daughter_positions) = indexDaughterAnnotations(parent_annotation_to_daughter_annotations)
+
+    # Go through all relevant tiers in the ELAN file
+    for tier_id in relevant_tiers:
+
+        print("Setting word start and end times in tier", tier_id)
+
+        tier = elan_file.get_tier_by_id(tier_id)
+
+        # Go through all annotations in the tier
+        for annotation in tier:
+
+            # Get annotation ID
+            annotation_id = annotation.get_annotation_id()
+
+            # Get annotation value
+            annotation_value = annotation.get_annotation_value()
+
+            # Determine parent annotation, i.e. the annotation unit
+            if annotation_id in annotation_to_parent_annotation:
+
+                parent_annotation_id = annotation_to_parent_annotation[annotation_id]
+
+                parent_annotation = elan_file.get_annotation_by_id(parent_annotation_id)
+
+                # Determine Toolbox reference
+                parent_reference = parent_annotation.get_annotation_value()
+
+                # Determine parent start and end times
+                parent_start_time = parent_annotation.get_start_time()
+                parent_end_time = parent_annotation.get_end_time()
+
+    #            print("Processing annotation unit", parent_reference)
+
+            else:
+
+                # The word has already been recorded when looking for its parent annotation
+                if word_time_errors is not None:
+                    continue
+
+                print("Cannot find the parent annotation of annotation", annotation_id)
+
+            # Determine the position of the current daughter annotations
+            # within the parent annotation
+            position = parent_annotation_to_daughter_positions[parent_annotation_id][annotation_id]
+
+            # Get relevant word start and end times
+            if parent_reference in toolbox_refs_to_word_times:
+
+                if position < len(toolbox_refs_to_word_times[parent_reference][0]) and position < len(toolbox_refs_to_word_times[parent_reference][1]):
+
+                    # Get start and end time from Toolbox file for current word
+                    # Convert seconds to milliseconds by deleting the dot (avoid floating point problems)
+                    start_time = int(re.sub(r"\.", "", toolbox_refs_to_word_times[parent_reference][0][position]))
+                    end_time = int(re.sub(r"\.", "", toolbox_refs_to_word_times[parent_reference][1][position]))
+
+                    # Make sure that the start time and end time is within the parent annotation
+                    if start_time < parent_start_time:
+                        print("Start time", start_time, "of annotation unit", annotation_id,"is smaller than the annotation time", parent_start_time, "of its parent annotation", parent_annotation_id, "(" + parent_reference + ")")
+
+                        # Adjust parent start time
+                        parent_start_time_slot_id = parent_annotation.get_start_time_slot()
+                        parent_start_time_slot = time_order.get_time_slot_by_id(parent_start_time_slot_id)
+                        parent_start_time_slot.set_time_value(start_time)
+
+                    if end_time > parent_end_time:
+                        print("End time", end_time, "of annotation unit", annotation_id,"is greater than the annotation time", parent_end_time, "of its parent annotation", parent_annotation_id, "(" + parent_reference + ")")
+
+                        # Adjust parent end time
+                        parent_end_time_slot_id = parent_annotation.get_end_time_slot()
+                        parent_end_time_slot = time_order.get_time_slot_by_id(parent_end_time_slot_id)
+                        parent_end_time_slot.set_time_value(end_time)
+
+                    # Set the times in the time order directly
+                    start_time_slot_id = annotation.get_start_time_slot()
+                    start_time_slot = time_order.get_time_slot_by_id(start_time_slot_id)
+                    start_time_slot.set_time_value(start_time)
+                    end_time_slot_id = annotation.get_end_time_slot()
+                    end_time_slot = time_order.get_time_slot_by_id(end_time_slot_id)
+                    end_time_slot.set_time_value(end_time)
+
+                else:
+
+                    print("Could not determine position of word", annotation_value, "in parent unit", parent_reference)
+                    print("Position:", position)
+                    print("Annotation ID:", annotation_id)
+                    print(len(toolbox_refs_to_word_times[parent_reference][0]))
+                    print(toolbox_refs_to_word_times[parent_reference][0])
+                    print(" ".join(parent_annotation_to_sorted_daughter_annotations[parent_annotation_id]))
+
+                    # Record the word and go on with the next one
+                    if word_time_errors is not None:
+                        word_time_errors.append((tier_id, parent_reference, annotation_id, annotation_value, "no_position", "Word %d of the annotation unit, but only %d word start and %d word end times" % (position + 1, len(toolbox_refs_to_word_times[parent_reference][0]), len(toolbox_refs_to_word_times[parent_reference][1]))))
+                        continue
+
+                    sys.exit()
+
+            else:
+
+                print("Could not determine annotation unit of word", annotation_value)
+
+                # Record the word and go on with the next one
+                if word_time_errors is not None:
+                    word_time_errors.append((tier_id, parent_reference, annotation_id, annotation_value, "no_word_times", "No word times for the annotation unit"))
+                    continue
+
+                sys.exit()
+
+
+# Function to write the words whose times could not be set to a report file
+# (tab-separated, one line per word, with a header line)
+# Arguments:
+# 1. The name of the report file
+# 2. The list of words as collected by importWordTimes
+def writeWordTimeErrorReport(report_file_name, word_time_errors):
+
+    report_file = codecs.open(report_file_name, "w", "utf-8")
+    report_writer = csv.writer(report_file, delimiter="\t", lineterminator="\n")
+
+    report_writer.writerow(["tier", "utterance", "annotation_id", "word", "problem", "message"])
+
+    for (tier_id, utterance_id, annotation_id, word, problem, message) in word_time_errors:
+        if utterance_id is None:
+            utterance_id = ""
+
+        report_writer.writerow([tier_id, utterance_id, annotation_id, word, problem, message])
+
+    report_file.close()
+
+
+# Function to determine the tiers whose annotations are needed for setting the word times
+# (the transcription tiers containing the words and their parent tiers)
+# Arguments:
+# 1. The ELAN file as read in by readELANFile (only the tiers are used)
+# 2. The name of the transcription tier containing the words
+# returns a list of tier ids
+def selectWordTimeTiers(elan_file, text_tier_name):
+
+    tier_ids = []
+
+    for tier in elan_file.get_tiers():
+
+        if tier.get_linguistic_type() == text_tier_name:
+
+            tier_ids.append(tier.get_tier_id())
+            tier_ids.append(tier.get_parent_tier_ref())
+
+    return tier_ids
+
+
+# Function to set the word start and end times in an ELAN file using
+# the information in a Toolbox file and to write the result to a new ELAN file
+# Arguments:
+# 1. The name of the input ELAN file
+# 2. The name of the Toolbox file containing the word start and end times
+# 3. The name of the output ELAN file
+# 4. The name of the reference tier (defaults to ref)
+# 5. The name of the transcription tier containing the words (defaults to t)
+# 6. The name of the tier containing the word start times (defaults to WordBegin)
+# 7. The name of the tier containing the word end times (defaults to WordEnd)
+# 8. The name of a report file for the words whose times cannot be set (defaults to None);
+#    if given, these words are written to the report instead of stopping at the first one
+# returns the list of words whose times could not be set as collected by importWordTimes
+# (None if no report file is given)
+def import_word_times(input_file_name, toolbox_file_name, output_file_name, reference_tier_name="ref", text_tier_name="t", word_start_tier_name="WordBegin", word_end_tier_name="WordEnd", error_report_file_name=None):
+
+    # Safety check
+    # (also catches different spellings of the same file name, e.g. same.eaf and ./same.eaf)
+    if isSameFile(input_file_name, output_file_name):
+        print("Input and output file name are the same. Cannot overwrite input file.")
+        sys.exit()
+
+    print("Opening input ELAN file:", input_file_name)
+
+    # Try to open the input file
+    # (only the annotations of the transcription tiers and their parent tiers are read in)
+    elan_file = readELANFile(input_file_name, lambda elan_file: selectWordTimeTiers(elan_file, text_tier_name))
+
+    print("Opening input Toolbox file:", toolbox_file_name)
+
+    # Try to open the Toolbox file
+    toolbox_file = readToolboxFile(toolbox_file_name)
+
+    print("Extracting word start and end times from Toolbox file.")
+
+    toolbox_refs_to_word_times = extractWordTimes(toolbox_file, reference_tier_name, word_start_tier_name, word_end_tier_name)
+
+    # Collect the words whose times cannot be set instead of stopping
+    if error_report_file_name is not None:
+        word_time_errors = []
+    else:
+        word_time_errors = None
+
+    # Set the word start and end times
+    importWordTimes(elan_file, toolbox_refs_to_word_times, text_tier_name, word_time_errors)
+
+    # Write the report
+    if word_time_errors is not None:
+        writeWordTimeErrorReport(error_report_file_name, word_time_errors)
+        print(len(word_time_errors), "words without word times written to", error_report_file_name)
+
+    # Output the modified ELAN file
+    writeELANFile(elan_file, output_file_name)
+
+    return word_time_errors
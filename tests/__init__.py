@@ -0,0 +1,3 @@
+# encoding=utf-8
+
+# Tests for the langdocmaus package
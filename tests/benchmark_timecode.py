@@ -0,0 +1,40 @@
+# encoding=utf-8
+
+# Benchmark for converting time codes with and without the fast path for plain seconds
+#
+# Usage:
+# python -m tests.benchmark_timecode
+
+# Module for the benchmark
+import timeit
+
+from langdocmaus.timecode import matchTimecode
+from langdocmaus.timecode import timecode2seconds
+from langdocmaus.timecode import timecodes2seconds
+
+
+# Function to compare the time needed for converting time codes
+# with and without the fast path for plain seconds
+# Arguments:
+# 1. The number of time codes (defaults to 100000)
+# 2. The number of repetitions (defaults to 5)
+def benchmark(number_of_time_codes=100000, repetitions=5):
+
+    plain_seconds = ["%.3f" % (index * 1.234) for index in range(number_of_time_codes)]
+    hours_minutes_seconds = ["%d:%02d:%06.3f" % (index // 3600, index // 60 % 60, index % 60 + 0.5) for index in range(number_of_time_codes)]
+
+    for (name, time_codes) in (("plain seconds", plain_seconds), ("hours:minutes:seconds", hours_minutes_seconds)):
+
+        timings = [("regular expressions only", lambda: [matchTimecode(time_code) for time_code in time_codes]),
+                   ("timecode2seconds", lambda: [timecode2seconds(time_code) for time_code in time_codes]),
+                   ("timecodes2seconds", lambda: timecodes2seconds(time_codes))]
+
+        print(number_of_time_codes, "time codes in", name + ":")
+
+        for (function_name, function) in timings:
+            seconds = min(timeit.repeat(function, number=1, repeat=repetitions))
+            print("    %-26s %.3f s" % (function_name, seconds))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,158 @@
+# encoding=utf-8
+
+# Tests for aligning many BAS Partitur files with langdocmaus.aligners
+
+import sys
+import threading
+import time
+import wave
+
+from langdocmaus.aligners import align_files
+from langdocmaus.aligners import alignEvenly
+from langdocmaus.aligners import makeCommandAligner
+from langdocmaus.partitur import readBASPartiturFile
+
+# A BAS Partitur file with two utterances
+PARTITUR_FILE = """LHD: Partitur 1.3
+SAM: 16000
+LBD:
+ORT: 0 oke
+ORT: 1 kiá
+KAN: 0 o k E
+KAN: 1 k i a
+TRN: 1600 4800 0 ref_001
+TRN: 8000 3200 1 ref_002
+RID: 0 ref_001
+RID: 1 ref_002
+"""
+
+
+def writeAlignmentFiles(directory, number_of_files=1):
+
+    alignments = []
+
+    for i in range(number_of_files):
+
+        par_file_name = directory / ("test%d.par" % i)
+        par_file_name.write_text(PARTITUR_FILE, encoding="utf-8")
+
+        wave_file_name = directory / ("test%d.wav" % i)
+
+        wave_file = wave.open(str(wave_file_name), "wb")
+        wave_file.setnchannels(1)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(16000)
+        # The files differ in length, so that they are cached separately
+        wave_file.writeframes(b"\x00\x00" * (16000 + i))
+        wave_file.close()
+
+        alignments.append((str(par_file_name), str(wave_file_name), str(directory / ("test%d.mau" % i))))
+
+    return alignments
+
+
+def test_align_evenly(tmp_path):
+
+    [(par_file_name, wave_file_name, output_file_name)] = writeAlignmentFiles(tmp_path)
+
+    alignEvenly(par_file_name, wave_file_name, output_file_name)
+
+    tiers = readBASPartiturFile(output_file_name)
+
+    assert tiers["ORT"] == [("0", "oke"), ("1", "kiá")]
+    assert tiers["MAU"] == [("0", "1599", "-1", "<p:>"),
+                            ("1600", "1599", "0", "o"), ("3200", "1599", "0", "k"), ("4800", "1599", "0", "E"),
+                            ("6400", "1599", "-1", "<p:>"),
+                            ("8000", "1065", "1", "k"), ("9066", "1066", "1", "i"), ("10133", "1066", "1", "a"),
+                            ("11200", "4799", "-1", "<p:>")]
+
+
+def test_align_files_with_cache(tmp_path):
+
+    alignments = writeAlignmentFiles(tmp_path, 3)
+    cache_directory = str(tmp_path / "cache")
+
+    results = align_files(alignments, alignEvenly, cache_directory=cache_directory, debug_level=0)
+
+    assert [status for (par_file_name, status, message) in results] == ["aligned"] * 3
+
+    results = align_files(alignments, alignEvenly, cache_directory=cache_directory, debug_level=0)
+
+    assert [status for (par_file_name, status, message) in results] == ["cached"] * 3
+
+
+def test_failed_alignments_are_retried(tmp_path):
+
+    alignments = writeAlignmentFiles(tmp_path, 2)
+
+    attempts = []
+
+    def failTwice(par_file_name, wave_file_name, output_file_name):
+
+        attempts.append(par_file_name)
+
+        # The partial output of a failed attempt is discarded
+        open(output_file_name, "w").close()
+
+        if attempts.count(par_file_name) <= 2:
+            raise RuntimeError("failed")
+
+        alignEvenly(par_file_name, wave_file_name, output_file_name)
+
+    results = align_files(alignments, failTwice, retries=2, retry_delay=0, debug_level=0)
+
+    assert [status for (par_file_name, status, message) in results] == ["aligned", "aligned"]
+    assert len(attempts) == 6
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["test0.mau", "test0.par", "test0.wav", "test1.mau", "test1.par", "test1.wav"]
+
+
+def test_timeout_of_ordinary_function(tmp_path):
+
+    alignments = writeAlignmentFiles(tmp_path, 4)
+
+    lock = threading.Lock()
+    running = [0]
+    most_running = [0]
+    attempts = []
+
+    def alignSlowly(par_file_name, wave_file_name, output_file_name):
+
+        with lock:
+            attempts.append(par_file_name)
+            running[0] += 1
+            most_running[0] = max(most_running[0], running[0])
+
+        output_file = open(output_file_name, "w")
+        time.sleep(0.3)
+        output_file.write("partial")
+        output_file.close()
+
+        with lock:
+            running[0] -= 1
+
+    results = align_files(alignments, alignSlowly, concurrency=2, retries=2, retry_delay=0, timeout=0.05, debug_level=0)
+
+    # The threads cannot be stopped, so they are neither retried nor run beyond the limit
+    assert [status for (par_file_name, status, message) in results] == ["failed"] * 4
+    assert len(attempts) == 4
+    assert most_running[0] == 2
+
+    # No partial output files are left behind
+    assert not any(path.suffix in (".mau", ".tmp") or ".tmp" in path.name for path in tmp_path.iterdir())
+
+
+def test_timeout_of_command(tmp_path):
+
+    [alignment] = writeAlignmentFiles(tmp_path)
+
+    aligner = makeCommandAligner("\"%s\" -c \"import sys, time; open(sys.argv[1], 'w').write('partial'); time.sleep(10)\" {mau}" % sys.executable)
+
+    start_time = time.perf_counter()
+
+    [(par_file_name, status, message)] = align_files([alignment], aligner, retries=1, retry_delay=0, timeout=0.5, debug_level=0)
+
+    # The command is killed and retried
+    assert status == "failed"
+    assert "longer than" in message
+    assert time.perf_counter() - start_time < 5
+    assert not any(path.suffix == ".mau" or ".tmp" in path.name for path in tmp_path.iterdir())
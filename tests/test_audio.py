@@ -0,0 +1,138 @@
+# encoding=utf-8
+
+# Tests for reading the headers of wave files
+
+import os
+import struct
+
+import pytest
+
+from langdocmaus import audio
+
+# The sub format GUID of PCM data in WAVE_FORMAT_EXTENSIBLE files (without the format tag)
+PCM_SUB_FORMAT = b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+
+
+# Function to build the format chunk of a wave file
+# Arguments:
+# 1. The number of channels
+# 2. The sample rate
+# 3. The bit depth in bits
+# 4. Whether the format should be WAVE_FORMAT_EXTENSIBLE (defaults to False)
+# returns the format chunk including its chunk header
+def formatChunk(channels, sample_rate, bits_per_sample, extensible=False):
+
+    block_align = channels * bits_per_sample // 8
+
+    if extensible:
+        format_chunk = struct.pack("<HHIIHHHHI", audio.WAVE_FORMAT_EXTENSIBLE, channels, sample_rate, sample_rate * block_align,
+                                   block_align, bits_per_sample, 22, bits_per_sample, 0) + struct.pack("<H", 1) + PCM_SUB_FORMAT
+    else:
+        format_chunk = struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * block_align, block_align, bits_per_sample)
+
+    return b"fmt " + struct.pack("<I", len(format_chunk)) + format_chunk
+
+
+def test_read_pcm_header(tmp_path):
+
+    data = b"\x01\x00" * 2 * 100
+    wave_file_name = str(tmp_path / "pcm.wav")
+
+    # A LIST chunk with an odd size before the format chunk has to be skipped
+    chunks = b"LIST" + struct.pack("<I", 3) + b"abc\x00" + formatChunk(2, 44100, 16) + b"data" + struct.pack("<I", len(data)) + data
+
+    with open(wave_file_name, "wb") as wave_file:
+        wave_file.write(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+    header = audio.readWaveHeader(wave_file_name)
+
+    assert header["format"] == 1
+    assert header["channels"] == 2
+    assert header["sample_rate"] == 44100
+    assert header["bits_per_sample"] == 16
+    assert header["sample_width"] == 2
+    assert header["block_align"] == 4
+    assert header["data_offset"] == 12 + 12 + 24 + 8
+    assert header["data_size"] == len(data)
+    assert header["frames"] == 100
+
+
+def test_read_extensible_header(tmp_path):
+
+    data = b"\x00\x00\x00" * 50
+    wave_file_name = str(tmp_path / "extensible.wav")
+
+    chunks = formatChunk(1, 48000, 24, extensible=True) + b"data" + struct.pack("<I", len(data)) + data
+
+    with open(wave_file_name, "wb") as wave_file:
+        wave_file.write(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+    header = audio.readWaveHeader(wave_file_name)
+
+    # The format tag is taken from the sub format
+    assert header["format"] == 1
+    assert header["channels"] == 1
+    assert header["sample_rate"] == 48000
+    assert header["sample_width"] == 3
+    assert header["frames"] == 50
+
+
+def test_read_rf64_header(tmp_path):
+
+    data = b"\x00\x00" * 80
+    wave_file_name = str(tmp_path / "rf64.wav")
+
+    # The real sizes are given in the ds64 chunk
+    ds64_chunk = struct.pack("<QQQI", 0, len(data), 80, 0)
+    chunks = (b"ds64" + struct.pack("<I", len(ds64_chunk)) + ds64_chunk + formatChunk(1, 16000, 16)
+              + b"data" + struct.pack("<I", audio.RF64_SIZE_IN_DS64) + data)
+
+    with open(wave_file_name, "wb") as wave_file:
+        wave_file.write(b"RF64" + struct.pack("<I", audio.RF64_SIZE_IN_DS64) + b"WAVE" + chunks)
+
+    header = audio.readWaveHeader(wave_file_name)
+
+    assert header["sample_rate"] == 16000
+    assert header["data_size"] == len(data)
+    assert header["frames"] == 80
+
+
+def test_read_invalid_header(tmp_path):
+
+    wave_file_name = str(tmp_path / "invalid.wav")
+
+    with open(wave_file_name, "wb") as wave_file:
+        wave_file.write(b"RIFX\x00\x00\x00\x00WAVE")
+
+    with pytest.raises(ValueError):
+        audio.readWaveHeader(wave_file_name)
+
+
+def test_wave_index(tmp_path):
+
+    data = b"\x00\x00" * 10
+    wave_file_name = str(tmp_path / "index.wav")
+    index_file_name = str(tmp_path / "waves.tsv")
+
+    chunks = formatChunk(1, 22050, 16) + b"data" + struct.pack("<I", len(data)) + data
+
+    with open(wave_file_name, "wb") as wave_file:
+        wave_file.write(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+    assert audio.getWaveProperties(wave_file_name, index_file_name) == (22050, 1, 2)
+
+    key = audio.getWaveFileKey(wave_file_name)
+
+    assert audio.readWaveIndex(index_file_name) == {key: (22050, 1, 2)}
+
+    # A new process only has the index file
+    del audio.wave_properties_cache[key]
+
+    # Make sure that the header is not read again
+    # (keeping the size and modification time, i.e. the key of the wave file)
+    with open(wave_file_name, "r+b") as wave_file:
+        wave_file.write(b"XXXX")
+
+    os.utime(wave_file_name, ns=(key[2], key[2]))
+
+    assert audio.getWaveProperties(wave_file_name, index_file_name) == (22050, 1, 2)
@@ -0,0 +1,86 @@
+# encoding=utf-8
+
+# Tests for running the whole pipeline over a corpus with langdocmaus.batch
+
+import codecs
+import os
+import shutil
+
+from langdocmaus.batch import batch_align
+from langdocmaus.partitur import readBASPartiturFile
+
+from tests.test_mau2elan import UTTERANCES
+from tests.test_mau2elan import writeToolboxImport
+from tests.test_toolbox2partitur import TRANSLITERATION_FILE_NAME
+from tests.test_toolbox2partitur import writeWaveFile
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def test_batch_align(tmp_path):
+
+    corpus_directory = tmp_path / "corpus"
+
+    for directory in ("complete", "unaligned", "twowaves", os.path.join("twowaves", "copy")):
+        os.makedirs(str(corpus_directory / directory))
+
+    # A recording with all input files (with the ELAN file called NAME.nowordtimes.eaf)
+    writeWaveFile(str(corpus_directory / "complete" / "bora.wav"), 6)
+    shutil.copy(os.path.join(DATA_DIRECTORY, "bora.txt"), str(corpus_directory / "complete" / "bora.txt"))
+    shutil.copy(os.path.join(DATA_DIRECTORY, "bora.mau"), str(corpus_directory / "complete" / "bora.mau"))
+    writeToolboxImport(str(corpus_directory / "complete" / "bora.nowordtimes.eaf"), UTTERANCES)
+
+    # A recording that has not been aligned yet
+    writeWaveFile(str(corpus_directory / "unaligned" / "unaligned.wav"), 6)
+    shutil.copy(os.path.join(DATA_DIRECTORY, "bora.txt"), str(corpus_directory / "unaligned" / "unaligned.txt"))
+
+    # A recording with two wave files
+    writeWaveFile(str(corpus_directory / "twowaves" / "twowaves.wav"), 6)
+    writeWaveFile(str(corpus_directory / "twowaves" / "copy" / "twowaves.wav"), 6)
+    shutil.copy(os.path.join(DATA_DIRECTORY, "bora.txt"), str(corpus_directory / "twowaves" / "twowaves.txt"))
+
+    # A wave file without transcription is not a recording of the corpus
+    writeWaveFile(str(corpus_directory / "untranscribed.wav"), 1)
+
+    output_directory = tmp_path / "output"
+
+    batch_align(str(corpus_directory), str(output_directory), TRANSLITERATION_FILE_NAME, jobs=1,
+                start_time_marker="ELANBegin", end_time_marker="ELANEnd")
+
+    report_file = codecs.open(str(output_directory / "batch_report.tsv"), "r", "utf-8")
+    report = [line.rstrip("\n").split("\t") for line in report_file]
+    report_file.close()
+
+    two_waves_message = "Found more than one wave file: %s, %s" % (corpus_directory / "twowaves" / "twowaves.wav", corpus_directory / "twowaves" / "copy" / "twowaves.wav")
+
+    assert report == [["recording", "stage", "status", "message"],
+                      ["bora", "Toolbox2BASPartitur", "ok", ""],
+                      ["bora", "MAU2Toolbox", "ok", ""],
+                      ["bora", "MAU2TextGrid", "ok", ""],
+                      ["bora", "flexibilize", "ok", ""],
+                      ["bora", "import_wordtimes", "ok", ""],
+                      ["twowaves", "Toolbox2BASPartitur", "skipped", two_waves_message],
+                      ["twowaves", "MAU2Toolbox", "skipped", two_waves_message],
+                      ["twowaves", "MAU2TextGrid", "skipped", two_waves_message],
+                      ["twowaves", "flexibilize", "skipped", two_waves_message],
+                      ["twowaves", "import_wordtimes", "skipped", two_waves_message],
+                      ["unaligned", "Toolbox2BASPartitur", "ok", ""],
+                      ["unaligned", "MAU2Toolbox", "skipped", "No MAU file (automatic alignment not performed yet)"],
+                      ["unaligned", "MAU2TextGrid", "skipped", "No MAU file (automatic alignment not performed yet)"],
+                      ["unaligned", "flexibilize", "skipped", "No MAU file (automatic alignment not performed yet)"],
+                      ["unaligned", "import_wordtimes", "skipped", "No MAU file (automatic alignment not performed yet)"]]
+
+    # The BAS Partitur file has the same tiers as the one written by Toolbox2BASPartitur.py
+    tiers = readBASPartiturFile(str(output_directory / "bora.par"))
+    expected_tiers = readBASPartiturFile(os.path.join(DATA_DIRECTORY, "bora.par"))
+
+    for tier_name in ("ORT", "KAN", "RID", "TRN"):
+        assert tiers[tier_name] == expected_tiers[tier_name]
+
+    assert os.path.isfile(str(output_directory / "bora.wordtimes.eaf"))
+
+    # Nothing has changed in the second run
+    results = batch_align(str(corpus_directory), str(output_directory), TRANSLITERATION_FILE_NAME, jobs=1,
+                          start_time_marker="ELANBegin", end_time_marker="ELANEnd")
+
+    assert [status for (stage, status, message) in results["bora"]] == ["unchanged"] * 5
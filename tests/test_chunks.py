@@ -0,0 +1,42 @@
+# encoding=utf-8
+
+# Tests for aligning a long recording in chunks with langdocmaus.chunks
+
+from langdocmaus.aligners import alignEvenly
+from langdocmaus.chunks import getChunkListFileName
+from langdocmaus.chunks import merge_chunks
+from langdocmaus.chunks import readChunkList
+from langdocmaus.partitur import readBASPartiturFile
+from langdocmaus.toolbox2partitur import toolbox_to_partitur
+
+from tests.test_toolbox2partitur import RECORDS
+from tests.test_toolbox2partitur import SAMPLE_RATE
+from tests.test_toolbox2partitur import TRANSLITERATION_FILE_NAME
+from tests.test_toolbox2partitur import writeToolboxFile
+from tests.test_toolbox2partitur import writeWaveFile
+
+
+def test_merge_chunks_round_trip(tmp_path):
+
+    writeWaveFile(str(tmp_path / "test.wav"), 8)
+    writeToolboxFile(str(tmp_path / "test.txt"), RECORDS)
+
+    toolbox_to_partitur(str(tmp_path / "test.txt"), str(tmp_path / "test.par"), TRANSLITERATION_FILE_NAME, "t", "ref",
+                        sample_rate=SAMPLE_RATE, wave_file_name=str(tmp_path / "test.wav"),
+                        start_time_marker="ELANBegin", end_time_marker="ELANEnd", chunk_size=3)
+
+    chunk_list_file_name = getChunkListFileName(str(tmp_path / "test.par"))
+    chunks = readChunkList(chunk_list_file_name)
+
+    # The second chunk only contains the last record
+    assert [(chunk["start_sample"], chunk["end_sample"], chunk["word_ids"]) for chunk in chunks] == [(8000, 72000, ["0", "1", "2", "3", "4"]), (80000, 96000, ["5", "6", "7"])]
+
+    for chunk in chunks:
+        alignEvenly(chunk["par"], chunk["wave"], chunk["mau"])
+
+    assert merge_chunks(chunk_list_file_name, str(tmp_path / "test.mau"), end_sample=8 * SAMPLE_RATE) == 2
+
+    # The result is the same as aligning the whole BAS Partitur file
+    alignEvenly(str(tmp_path / "test.par"), str(tmp_path / "test.wav"), str(tmp_path / "full.mau"))
+
+    assert readBASPartiturFile(str(tmp_path / "test.mau"))["MAU"] == readBASPartiturFile(str(tmp_path / "full.mau"))["MAU"]
@@ -0,0 +1,112 @@
+# encoding=utf-8
+
+# Tests for reading and writing ELAN files with langdocmaus.eaf
+
+from langdocmaus.eaf import isSameFile
+from langdocmaus.eaf import readELANFile
+from langdocmaus.eaf import writeELANFile
+
+# A small ELAN file with a comment before the root element,
+# comments inside copied elements and special characters
+ELAN_FILE = """<?xml version="1.0" encoding="UTF-8"?>
+<!-- exported from Toolbox -->
+<ANNOTATION_DOCUMENT xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" AUTHOR="" DATE="2020-01-01T00:00:00+01:00" FORMAT="3.0" VERSION="3.0" xsi:noNamespaceSchemaLocation="http://www.mpi.nl/tools/elan/EAFv3.0.xsd">
+    <HEADER MEDIA_FILE="" TIME_UNITS="milliseconds">
+        <MEDIA_DESCRIPTOR MEDIA_URL="file:///a.wav" MIME_TYPE="audio/x-wav" />
+        <!-- inside the header -->
+    </HEADER>
+    <TIME_ORDER>
+        <TIME_SLOT TIME_SLOT_ID="ts1" TIME_VALUE="0"/>
+        <TIME_SLOT TIME_SLOT_ID="ts2" TIME_VALUE="1000"/>
+        <TIME_SLOT TIME_SLOT_ID="ts3"/>
+    </TIME_ORDER>
+    <!-- between the time order and the tiers -->
+    <TIER LINGUISTIC_TYPE_REF="ref" TIER_ID="ref">
+        <ANNOTATION>
+            <ALIGNABLE_ANNOTATION ANNOTATION_ID="a1" TIME_SLOT_REF1="ts1" TIME_SLOT_REF2="ts2">
+                <ANNOTATION_VALUE>s1 &amp; &lt;x&gt;</ANNOTATION_VALUE>
+            </ALIGNABLE_ANNOTATION>
+        </ANNOTATION>
+    </TIER>
+    <TIER LINGUISTIC_TYPE_REF="tx" PARENT_REF="ref" TIER_ID="tx">
+        <!-- inside a tier -->
+        <ANNOTATION>
+            <REF_ANNOTATION ANNOTATION_ID="a2" ANNOTATION_REF="a1">
+                <ANNOTATION_VALUE>héllo</ANNOTATION_VALUE>
+            </REF_ANNOTATION>
+        </ANNOTATION>
+    </TIER>
+    <LINGUISTIC_TYPE GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="ref" TIME_ALIGNABLE="true" />
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Association" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="tx" TIME_ALIGNABLE="false" />
+</ANNOTATION_DOCUMENT>
+"""
+
+
+def writeTestFile(directory):
+
+    file_name = directory / "test.eaf"
+    file_name.write_text(ELAN_FILE, encoding="utf-8")
+
+    return file_name
+
+
+def test_read_elan_file(tmp_path):
+
+    elan_file = readELANFile(str(writeTestFile(tmp_path)))
+
+    assert [tier.get_tier_id() for tier in elan_file.get_tiers()] == ["ref", "tx"]
+    assert [linguistic_type.get_linguistic_type_id() for linguistic_type in elan_file.get_linguistic_types()] == ["ref", "tx"]
+    assert [(time_slot.get_id(), time_slot.get_time_value()) for time_slot in elan_file.get_time_order()] == [("ts1", 0), ("ts2", 1000), ("ts3", None)]
+
+    annotation = elan_file.get_annotation_by_id("a1")
+
+    assert annotation.get_annotation_value() == "s1 & <x>"
+    assert (annotation.get_start_time(), annotation.get_end_time()) == (0, 1000)
+    assert elan_file.get_annotation_by_id("a2").get_annotation_value() == "héllo"
+
+
+def test_round_trip_keeps_unchanged_file(tmp_path):
+
+    # Annotations of all tiers are written from memory
+    output_file_name = tmp_path / "output.eaf"
+    writeELANFile(readELANFile(str(writeTestFile(tmp_path))), str(output_file_name))
+
+    # Annotations of all tiers are copied from the input file
+    copied_file_name = tmp_path / "copied.eaf"
+    writeELANFile(readELANFile(str(writeTestFile(tmp_path)), lambda elan_file: []), str(copied_file_name))
+
+    assert copied_file_name.read_text(encoding="utf-8") == ELAN_FILE
+    assert output_file_name.read_text(encoding="utf-8") == ELAN_FILE.replace("        <!-- inside a tier -->\n", "")
+
+
+def test_round_trip_keeps_changes(tmp_path):
+
+    elan_file = readELANFile(str(writeTestFile(tmp_path)), lambda elan_file: ["ref"])
+    elan_file.get_annotation_by_id("a1").set_annotation_value("changed & \"quoted\"")
+    elan_file.get_time_order().get_time_slot_by_id("ts3").set_time_value(2000)
+
+    output_file_name = str(tmp_path / "output.eaf")
+    writeELANFile(elan_file, output_file_name)
+
+    elan_file = readELANFile(output_file_name)
+
+    assert elan_file.get_annotation_by_id("a1").get_annotation_value() == "changed & \"quoted\""
+    assert elan_file.get_annotation_by_id("a2").get_annotation_value() == "héllo"
+    assert elan_file.get_time_value("ts3") == 2000
+
+
+def test_write_over_input_file(tmp_path):
+
+    input_file_name = writeTestFile(tmp_path)
+
+    elan_file = readELANFile(str(input_file_name))
+    writeELANFile(elan_file, str(tmp_path / "." / "test.eaf"))
+
+    assert readELANFile(str(input_file_name)).get_annotation_by_id("a2").get_annotation_value() == "héllo"
+    assert [path.name for path in tmp_path.iterdir()] == ["test.eaf"]
+
+
+def test_is_same_file(tmp_path):
+
+    assert isSameFile(str(tmp_path / "same.eaf"), str(tmp_path / "." / "same.eaf"))
+    assert not isSameFile(str(tmp_path / "same.eaf"), str(tmp_path / "other.eaf"))
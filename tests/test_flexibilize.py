@@ -0,0 +1,83 @@
+# encoding=utf-8
+
+# Tests for flexibilizing ELAN files with langdocmaus.flexibilize
+
+import pytest
+
+from langdocmaus.flexibilize import findFirstDaughterAnnotations
+
+
+class Annotation(object):
+
+    def __init__(self, annotation_id, start_time_slot, end_time_slot, start_time=None):
+
+        self.annotation_id = annotation_id
+        self.start_time_slot = start_time_slot
+        self.end_time_slot = end_time_slot
+        self.start_time = start_time
+
+    def get_annotation_id(self):
+        return self.annotation_id
+
+    def get_start_time_slot(self):
+        return self.start_time_slot
+
+    def get_start_time(self):
+        return self.start_time
+
+
+# Function to call findFirstDaughterAnnotations like flexibilizeELANFile does
+# Arguments:
+# 1. The daughter annotations on the tier
+def findChains(annotations):
+
+    annotations_by_id = dict((annotation.get_annotation_id(), annotation) for annotation in annotations)
+
+    daughter_end_time_slots = {}
+
+    for annotation in annotations:
+        daughter_end_time_slots.setdefault(annotation.end_time_slot, []).append(annotation.get_annotation_id())
+
+    return findFirstDaughterAnnotations(annotations, annotations_by_id, daughter_end_time_slots)
+
+
+def test_chains():
+
+    # Two parent annotations with three and two words
+    annotations = [Annotation("a10", "ts1", "ts2", 0),
+                   Annotation("a11", "ts2", "ts3"),
+                   Annotation("a12", "ts3", "ts4"),
+                   Annotation("a13", "ts5", "ts6", 2000),
+                   Annotation("a14", "ts6", "ts7")]
+
+    expected_result = ({"a11": "a10", "a12": "a10", "a14": "a13"}, {"a10": 0, "a11": 1, "a12": 2, "a13": 0, "a14": 1})
+
+    assert findChains(annotations) == expected_result
+
+    # The chains are followed back from the last annotation first
+    assert findChains(list(reversed(annotations))) == expected_result
+
+
+def test_cycle():
+
+    annotations = [Annotation("a10", "ts1", "ts2", 0),
+                   Annotation("a11", "ts3", "ts4"),
+                   Annotation("a12", "ts4", "ts3")]
+
+    with pytest.raises(RuntimeError) as error:
+        findChains(annotations)
+
+    assert error.value.args[0].startswith("Found a cycle")
+
+
+def test_broken_chain():
+
+    # No annotation ends at the start time slot of a12
+    annotations = [Annotation("a10", "ts1", "ts2", 0),
+                   Annotation("a11", "ts2", "ts3"),
+                   Annotation("a12", "ts9", "ts4")]
+
+    with pytest.raises(RuntimeError) as error:
+        findChains(annotations)
+
+    assert error.value.args == ("Cannot find preceding first daughter annotation for annotation", "a12.")
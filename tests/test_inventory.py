@@ -0,0 +1,88 @@
+# encoding=utf-8
+
+# Tests for checking the KAN tier of BAS Partitur files against a phoneme inventory
+# with langdocmaus.inventory
+
+import codecs
+import os
+
+import CheckBASPartiturPhonemeInventory
+
+from langdocmaus.inventory import check_phonemes
+from langdocmaus.toolbox2partitur import toolbox_to_partitur
+
+from tests.test_toolbox2partitur import TRANSLITERATION_FILE_NAME
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# "t" is listed before "ts", so that the first listed phoneme at the start of "tsa" is "t"
+INVENTORY = ["t", "ts", "a", "e", "h", "hb"]
+
+
+def test_longest_match():
+
+    # The first listed phoneme would leave an illegal "s"
+    assert check_phonemes([("tsa", 1)], INVENTORY) == {}
+    assert check_phonemes([("tsahbe", 1)], INVENTORY) == {}
+
+
+def test_illegal_phoneme_in_the_middle_of_a_word():
+
+    # The segmentation continues with the character after the illegal one
+    assert check_phonemes([("taxtsa", 3), ("hbxe", 4)], INVENTORY) == {"x": ["3", "4"]}
+    assert check_phonemes([("tsaqxe", 5)], INVENTORY) == {"q": ["5"], "x": ["5"]}
+
+
+def test_old_style_word_without_spaces():
+
+    # Every occurrence of an illegal phoneme is listed (also within one word)
+    assert check_phonemes([("tsahbesse", 2)], INVENTORY) == {"s": ["2", "2"]}
+
+
+def test_new_style_word_with_spaces():
+
+    # The phonemes are not segmented further
+    assert check_phonemes([("ts a hb e", 1), ("tsa", 2)], INVENTORY) == {}
+    assert check_phonemes([("t s a", 7)], INVENTORY) == {"s": ["7"]}
+
+
+def test_same_report_as_checking_the_bas_partitur_file(tmp_path, capsys):
+
+    # Q and J are missing from the inventory
+    inventory_file_name = str(tmp_path / "inventory.list")
+
+    with codecs.open(inventory_file_name, "w", "utf-8") as inventory_file:
+        inventory_file.write("\n".join(["o", "k", "E", "i", "a", "ts", "p", "m", "b", "c", "M", "B", "t", "tS", "S"]) + "\n")
+
+    par_file_name = str(tmp_path / "bora.par")
+
+    # Check the KAN tier while writing the BAS Partitur file
+    inline_results = toolbox_to_partitur(os.path.join(DATA_DIRECTORY, "bora.txt"), par_file_name, TRANSLITERATION_FILE_NAME, "t", "ref",
+                                         sample_rate=16000, start_time_marker="ELANBegin", end_time_marker="ELANEnd",
+                                         inventory_file_name=inventory_file_name)
+
+    inline_report = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Illegal phoneme")]
+
+    # Check the BAS Partitur file with CheckBASPartiturPhonemeInventory.py
+    CheckBASPartiturPhonemeInventory.main([par_file_name, inventory_file_name])
+
+    report = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Illegal phoneme")]
+
+    assert inline_report == report
+    assert inline_report == ["Illegal phoneme J occuring in lines:\t\t" + " ".join(inline_results["J"]),
+                             "Illegal phoneme Q occuring in lines:\t\t" + " ".join(inline_results["Q"])]
+
+    # The line numbers refer to the KAN tier of the BAS Partitur file
+    with codecs.open(par_file_name, "r", "utf-8") as par_file:
+        lines = par_file.read().splitlines()
+
+    for line_number in inline_results["Q"]:
+        assert lines[int(line_number) - 1].startswith("KAN:") and "Q" in lines[int(line_number) - 1].split()[2:]
+
+    # The report file of the corpus mode lists the same occurrences
+    CheckBASPartiturPhonemeInventory.main([par_file_name, inventory_file_name, "-report", str(tmp_path / "report.tsv"), "-jobs", "1"])
+
+    with codecs.open(str(tmp_path / "report.tsv"), "r", "utf-8") as report_file:
+        report_rows = [line.rstrip("\n").split("\t") for line in report_file][1:]
+
+    assert sorted((phoneme, line_number) for (file_name, line_number, phoneme, message) in report_rows) == sorted((phoneme, line_number) for phoneme in inline_results for line_number in inline_results[phoneme])
@@ -0,0 +1,129 @@
+# encoding=utf-8
+
+# Tests for deciding whether a conversion has to be run again with langdocmaus.manifest
+
+import codecs
+import os
+
+from langdocmaus import manifest as manifests
+
+
+def writeFile(file_name, contents):
+
+    output_file = codecs.open(file_name, "w", "utf-8")
+    output_file.write(contents)
+    output_file.close()
+
+
+# Function to run a fake conversion and record it in a manifest file
+# Arguments:
+# 1. The directory of the input, output and manifest files
+# 2. The options of the conversion
+# returns the manifest of the conversion as read in from the manifest file
+def convert(directory, options):
+
+    input_file_names = {"toolbox": str(directory / "input.txt")}
+    output_file_name = str(directory / "output.txt")
+    manifest_file_name = str(directory / "output.manifest.json")
+
+    manifest = manifests.makeManifest("convert", input_file_names, [output_file_name], options, manifests.readManifest(manifest_file_name))
+
+    input_file = codecs.open(input_file_names["toolbox"], "r", "utf-8")
+    writeFile(output_file_name, input_file.read().upper())
+    input_file.close()
+
+    manifests.writeManifest(manifest_file_name, manifest, "converted")
+
+    return manifests.readManifest(manifest_file_name)
+
+
+def isUpToDate(directory, previous_manifest, options):
+
+    return manifests.isUpToDate(previous_manifest, manifests.makeManifest("convert", {"toolbox": str(directory / "input.txt")}, [str(directory / "output.txt")], options, previous_manifest))
+
+
+def test_first_run(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    assert not isUpToDate(tmp_path, None, {"tier": "t"})
+
+
+def test_unchanged(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t"})
+
+    assert previous_manifest["message"] == "converted"
+    assert isUpToDate(tmp_path, previous_manifest, {"tier": "t"})
+
+
+def test_touched_input(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t"})
+
+    # Only the modification time changes, the hash stays the same
+    file_status = os.stat(str(tmp_path / "input.txt"))
+    os.utime(str(tmp_path / "input.txt"), ns=(file_status.st_atime_ns, file_status.st_mtime_ns + 10 ** 9))
+
+    assert isUpToDate(tmp_path, previous_manifest, {"tier": "t"})
+
+
+def test_changed_input(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t"})
+
+    # The same size and modification time, but different contents
+    file_status = os.stat(str(tmp_path / "input.txt"))
+    writeFile(str(tmp_path / "input.txt"), "oke kiu")
+    os.utime(str(tmp_path / "input.txt"), ns=(file_status.st_atime_ns, file_status.st_mtime_ns + 10 ** 9))
+
+    assert not isUpToDate(tmp_path, previous_manifest, {"tier": "t"})
+
+
+def test_changed_options(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t", "references": ("ref",)})
+
+    # Options are compared as they are stored in the manifest file (tuples become lists)
+    assert isUpToDate(tmp_path, previous_manifest, {"tier": "t", "references": ("ref",)})
+    assert not isUpToDate(tmp_path, previous_manifest, {"tier": "tx", "references": ("ref",)})
+
+
+def test_deleted_output(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t"})
+
+    os.remove(str(tmp_path / "output.txt"))
+
+    assert not isUpToDate(tmp_path, previous_manifest, {"tier": "t"})
+
+
+def test_changed_output(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t"})
+
+    writeFile(str(tmp_path / "output.txt"), "edited by hand")
+
+    assert not isUpToDate(tmp_path, previous_manifest, {"tier": "t"})
+
+
+def test_changed_code(tmp_path):
+
+    writeFile(str(tmp_path / "input.txt"), "oke kiá")
+
+    previous_manifest = convert(tmp_path, {"tier": "t"})
+    previous_manifest["code"] = "0" * 64
+
+    assert not isUpToDate(tmp_path, previous_manifest, {"tier": "t"})
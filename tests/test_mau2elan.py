@@ -0,0 +1,85 @@
+# encoding=utf-8
+
+# Tests for setting word times in ELAN files directly from BAS Partitur files
+# with langdocmaus.mau2elan
+
+import os
+
+from langdocmaus.eaf import readELANFile
+from langdocmaus.flexibilize import flexibilize_elan
+from langdocmaus.mau2elan import mau_to_elan
+from langdocmaus.mau2toolbox import mau_to_toolbox
+from langdocmaus.wordtimes import import_word_times
+
+from tests.test_wordtimes import writeELANTestFile
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+SAMPLE_RATE = 16000
+
+# The utterances of tests/data/bora.txt as tuples (Toolbox reference, start time, end time, words)
+UTTERANCES = [("bora_test.001", 500, 1750, ["oke", "kiá", "tsaápi"]),
+              ("bora_test.002", 2000, 3250, ["méméhba", "ihjyúváa"]),
+              ("bora_test.003", 3500, 5125, ["táñahbe", "llíhíñe", "chíjyé"])]
+
+
+# Function to write an ELAN file as created by importing a Toolbox file
+# (the words of an utterance share the time slots between them, which have no time values)
+# Arguments:
+# 1. The file name
+# 2. A list of utterances as tuples (Toolbox reference, start time, end time, words)
+def writeToolboxImport(file_name, utterances):
+
+    time_slots = []
+    ref_annotations = []
+    word_annotations = []
+
+    for (reference, start_time, end_time, words) in utterances:
+
+        first_time_slot_number = len(time_slots) + 1
+
+        time_slots.append(("ts%d" % first_time_slot_number, start_time))
+        time_slots.extend(("ts%d" % (first_time_slot_number + number), None) for number in range(1, len(words)))
+        time_slots.append(("ts%d" % (first_time_slot_number + len(words)), end_time))
+
+        ref_annotations.append(("a%d" % (len(ref_annotations) + 1), "ts%d" % first_time_slot_number, "ts%d" % (first_time_slot_number + len(words)), reference))
+
+        for (number, word) in enumerate(words):
+            word_annotations.append((None, "ts%d" % (first_time_slot_number + number), "ts%d" % (first_time_slot_number + number + 1), word))
+
+    # The word annotations are numbered after the utterance annotations
+    word_annotations = [("a%d" % (len(ref_annotations) + number), start_time_slot, end_time_slot, word)
+                        for (number, (annotation_id, start_time_slot, end_time_slot, word)) in enumerate(word_annotations, 1)]
+
+    writeELANTestFile(file_name, time_slots, ref_annotations, word_annotations)
+
+
+def getWordTimes(file_name):
+
+    elan_file = readELANFile(file_name)
+
+    return [(annotation.get_annotation_value(), annotation.get_start_time(), annotation.get_end_time()) for annotation in elan_file.get_tier_by_id("t")]
+
+
+def test_same_word_times_as_toolbox_route(tmp_path):
+
+    writeToolboxImport(str(tmp_path / "bora.eaf"), UTTERANCES)
+
+    mau_file_name = os.path.join(DATA_DIRECTORY, "bora.mau")
+    par_file_name = os.path.join(DATA_DIRECTORY, "bora.par")
+
+    # MAU2Toolbox with word times, flexibilize_imported_toolbox_in_elan and import_wordtimes_from_toolbox_to_elan
+    mau_to_toolbox(mau_file_name, par_file_name, str(tmp_path / "bora.times.txt"), SAMPLE_RATE,
+                   original_toolbox_file_name=os.path.join(DATA_DIRECTORY, "bora.txt"), output_word_times=True)
+
+    flexibilize_elan(str(tmp_path / "bora.eaf"), str(tmp_path / "bora.flexible.eaf"))
+
+    import_word_times(str(tmp_path / "bora.flexible.eaf"), str(tmp_path / "bora.times.txt"), str(tmp_path / "toolbox.eaf"))
+
+    # MAU2ELAN
+    mau_to_elan(mau_file_name, par_file_name, str(tmp_path / "bora.eaf"), str(tmp_path / "direct.eaf"), SAMPLE_RATE)
+
+    word_times = getWordTimes(str(tmp_path / "direct.eaf"))
+
+    assert word_times == getWordTimes(str(tmp_path / "toolbox.eaf"))
+    assert word_times[:3] == [("oke", 500, 841), ("kiá", 841, 1182), ("tsaápi", 1182, 1750)]
@@ -0,0 +1,198 @@
+# encoding=utf-8
+
+# Tests for converting BAS Partitur files with MAU tier to Praat TextGrid files
+# with langdocmaus.mau2textgrid
+
+import codecs
+import os
+import struct
+
+import pytest
+
+from langdocmaus import mau2textgrid
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+SAMPLE_RATE = 16000
+
+
+# Function to read in a Praat TextGrid file in long text format
+# Arguments:
+# 1. The file name
+# returns a list of the tiers as tuples (name, intervals)
+# with the intervals as tuples (start time, end time, text)
+def readLongTextGrid(file_name):
+
+    textgrid_file = codecs.open(file_name, "r", "utf-8")
+    lines = textgrid_file.read().split("\n")
+    textgrid_file.close()
+
+    values = {}
+    tiers = []
+
+    for line in lines:
+
+        (key, separator, value) = line.strip().partition(" = ")
+
+        if separator == "":
+            continue
+
+        if key == "name":
+            tiers.append((value.strip("\""), []))
+
+        elif key == "text":
+            tiers[-1][1].append((float(values["xmin"]), float(values["xmax"]), value))
+
+        # The times of an interval come right before its text
+        elif key in ("xmin", "xmax"):
+            values[key] = value
+
+    return tiers
+
+
+# Function to read in a Praat TextGrid file in short text format
+# Arguments:
+# 1. The file name
+# returns the tiers as described for readLongTextGrid
+def readShortTextGrid(file_name):
+
+    textgrid_file = codecs.open(file_name, "r", "utf-8")
+    lines = iter(textgrid_file.read().split("\n")[7:])
+    textgrid_file.close()
+
+    tiers = []
+
+    for tier_class in lines:
+
+        if tier_class == "":
+            break
+
+        assert tier_class == "\"IntervalTier\""
+
+        tier_name = next(lines)[1:-1].replace("\"\"", "\"")
+        next(lines)
+        next(lines)
+
+        intervals = []
+
+        for interval_number in range(int(next(lines))):
+            intervals.append((float(next(lines)), float(next(lines)), next(lines)[1:-1].replace("\"\"", "\"")))
+
+        tiers.append((tier_name, intervals))
+
+    return tiers
+
+
+# Function to read in a Praat TextGrid file in binary format
+# Arguments:
+# 1. The file name
+# returns the tiers as described for readLongTextGrid
+def readBinaryTextGrid(file_name):
+
+    with open(file_name, "rb") as textgrid_file:
+        data = textgrid_file.read()
+
+    position = [0]
+
+    def read(size):
+        position[0] += size
+        return data[position[0] - size:position[0]]
+
+    def readString(length_size):
+        length_format = ">B" if length_size == 1 else ">H"
+        length = struct.unpack(length_format, read(length_size))[0]
+
+        # Strings that are not ASCII are written in UTF-16
+        if length == (0xFF if length_size == 1 else 0xFFFF):
+            length = struct.unpack(length_format, read(length_size))[0]
+            return read(2 * length).decode("utf-16-be")
+
+        return read(length).decode("ascii")
+
+    assert read(12) == b"ooBinaryFile"
+    assert readString(1) == "TextGrid"
+
+    read(16)
+    assert read(1) == b"\x01"
+
+    tiers = []
+
+    for tier_number in range(struct.unpack(">i", read(4))[0]):
+
+        assert readString(1) == "IntervalTier"
+
+        tier_name = readString(2)
+        read(16)
+
+        intervals = []
+
+        for interval_number in range(struct.unpack(">i", read(4))[0]):
+            (start_time, end_time) = struct.unpack(">dd", read(16))
+            intervals.append((start_time, end_time, readString(2)))
+
+        tiers.append((tier_name, intervals))
+
+    assert position[0] == len(data)
+
+    return tiers
+
+
+def convert(output_file_name, streaming=False, textgrid_format="long"):
+
+    mau2textgrid.mau_to_textgrid(os.path.join(DATA_DIRECTORY, "bora.mau"), os.path.join(DATA_DIRECTORY, "bora.par"), output_file_name,
+                                 SAMPLE_RATE, streaming=streaming, textgrid_format=textgrid_format)
+
+    with open(output_file_name, "rb") as output_file:
+        return output_file.read()
+
+
+@pytest.mark.parametrize("textgrid_format", mau2textgrid.TEXTGRID_FORMATS)
+def test_streaming(tmp_path, monkeypatch, textgrid_format):
+
+    # Spill the intervals in several chunks
+    monkeypatch.setattr(mau2textgrid, "INTERVAL_CHUNK_SIZE", 2)
+
+    assert convert(str(tmp_path / "streamed.TextGrid"), True, textgrid_format) == convert(str(tmp_path / "output.TextGrid"), False, textgrid_format)
+
+
+def test_streaming_baseline(tmp_path):
+
+    with open(os.path.join(DATA_DIRECTORY, "bora.TextGrid"), "rb") as expected_file:
+        assert convert(str(tmp_path / "streamed.TextGrid"), True) == expected_file.read()
+
+
+@pytest.mark.parametrize(("textgrid_format", "readTextGrid"), [("short", readShortTextGrid), ("binary", readBinaryTextGrid)])
+def test_textgrid_formats(tmp_path, textgrid_format, readTextGrid):
+
+    convert(str(tmp_path / "output.TextGrid"), textgrid_format=textgrid_format)
+
+    tiers = readTextGrid(str(tmp_path / "output.TextGrid"))
+
+    # The same tiers and intervals as in the long text format
+    assert [tier_name for (tier_name, intervals) in tiers] == ["UTT", "ORT", "KAN", "MAU"]
+    assert tiers == readLongTextGrid(os.path.join(DATA_DIRECTORY, "bora.TextGrid"))
+
+
+def test_binary_string_outside_basic_multilingual_plane(tmp_path):
+
+    # The length of strings that are not ASCII is given in UTF-16 code units
+    assert mau2textgrid.encodePraatBinaryString("\U0001d51eb") == b"\xff\xff\x00\x03" + "\U0001d51eb".encode("utf-16-be")
+    assert mau2textgrid.encodePraatBinaryString("ab") == b"\x00\x02ab"
+
+    # The rest of the file can still be read
+    par_file_name = str(tmp_path / "bora.par")
+
+    with codecs.open(os.path.join(DATA_DIRECTORY, "bora.par"), "r", "utf-8") as input_file, codecs.open(par_file_name, "w", "utf-8") as output_file:
+        output_file.write(input_file.read().replace("ORT: 0 oke", "ORT: 0 oke\U0001d51e"))
+
+    mau2textgrid.mau_to_textgrid(os.path.join(DATA_DIRECTORY, "bora.mau"), par_file_name, str(tmp_path / "output.TextGrid"),
+                                 SAMPLE_RATE, textgrid_format="binary")
+
+    tiers = readBinaryTextGrid(str(tmp_path / "output.TextGrid"))
+    expected_tiers = readLongTextGrid(os.path.join(DATA_DIRECTORY, "bora.TextGrid"))
+
+    assert [tier_name for (tier_name, intervals) in tiers] == ["UTT", "ORT", "KAN", "MAU"]
+
+    for ((tier_name, intervals), (expected_tier_name, expected_intervals)) in zip(tiers, expected_tiers):
+        assert intervals == [(start_time, end_time, text.replace("oke", "oke\U0001d51e", 1) if tier_name in ("UTT", "ORT") else text)
+                             for (start_time, end_time, text) in expected_intervals]
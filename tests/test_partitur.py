@@ -0,0 +1,122 @@
+# encoding=utf-8
+
+# Tests for reading BAS Partitur files and combining phoneme times with langdocmaus.partitur
+
+import random
+import warnings
+
+import pytest
+
+from langdocmaus import partitur
+from langdocmaus.partitur import combinePhonemesIntoWords
+from langdocmaus.partitur import makeIntegerArray
+from langdocmaus.partitur import parseBASPartiturLine
+from langdocmaus.partitur import readBASPartiturFile
+
+# The array computations are only used if NumPy is available
+requires_numpy = pytest.mark.skipif(partitur.numpy is None, reason="NumPy is not installed")
+
+# A small BAS Partitur file with a MAU tier
+PARTITUR_FILE = """LHD: Partitur 1.3
+SAM: 16000
+LBD:
+ORT: 0 oke
+ORT: 1 kiá
+KAN: 0 o k E
+KAN: 1 k i a
+MAU: 0 1599 -1 <p:>
+MAU: 1600 799 0 o
+MAU: 2400 1599 0 k
+MAU: 4000 799 1 k
+MAU: 4800 1599 1 i
+TRN: 1600 4799 0,1 ref_001
+RID: 0,1 ref_001
+"""
+
+
+def test_parse_partitur_lines():
+
+    assert parseBASPartiturLine("ORT: 0 oke\n", 1) == ("ORT", ("0", "oke"))
+    assert parseBASPartiturLine("ORT:\t0 oke", 1) == ("ORT", ("0", "oke"))
+    assert parseBASPartiturLine("KAN: 0 o k E", 1) == ("KAN", ("0", "o k E"))
+    assert parseBASPartiturLine("RID: 0,1 ref 001", 1) == ("RID", ["ref 001", ["0", "1"]])
+    assert parseBASPartiturLine("MAU: 1600 799 0 o", 1) == ("MAU", ("1600", "799", "0", "o"))
+    assert parseBASPartiturLine("TRN: 1600 4799 0,1 ref_001", 1) == ("TRN", ("1600", "4799", ["0", "1"], "ref_001"))
+    assert parseBASPartiturLine("SAM: 16000", 1) == ("SAM", "16000")
+    assert parseBASPartiturLine("LBD:", 1) == ("LBD", "")
+    assert parseBASPartiturLine("   ", 1) is None
+
+    # Lines without a tier marker are skipped
+    assert parseBASPartiturLine("note: not a tier", 1) is None
+    assert parseBASPartiturLine("word", 1) is None
+
+
+@pytest.mark.parametrize("line", ["ORT:0 oke", "KAN:0 o k E", "RID:0,1 ref_001", "MAU:1600 799 0 o", "TRN:1600 4799 0,1 ref_001", "ORT: 0", "MAU: 1600 799 0", "TRN: 1600 4799 0,1"])
+def test_malformed_partitur_lines_stop(line):
+
+    with pytest.raises(SystemExit):
+        parseBASPartiturLine(line, 1)
+
+
+def test_read_partitur_file(tmp_path):
+
+    file_name = tmp_path / "test.par"
+    file_name.write_text(PARTITUR_FILE, encoding="utf-8")
+
+    tiers = readBASPartiturFile(str(file_name))
+
+    assert tiers["ORT"] == [("0", "oke"), ("1", "kiá")]
+    assert tiers["RID"] == [["ref_001", ["0", "1"]]]
+    assert tiers["SAM"] == ["16000"]
+    assert len(tiers["MAU"]) == 5
+    assert combinePhonemesIntoWords(tiers["MAU"]) == {"0": (1600, 3999), "1": (4000, 6399)}
+
+
+@requires_numpy
+def test_make_integer_array():
+
+    assert makeIntegerArray(["0", "1", "-1", "250"]).tolist() == [0, 1, -1, 250]
+    assert makeIntegerArray([]).tolist() == []
+
+    # Only plain integers are accepted for exact conversion
+    for string in ["01", "+1", "-0", "1.5", "１", "1e3", "", "99999999999999999999"]:
+        assert makeIntegerArray([string]) is None, string
+
+    # Signs and leading zeros are accepted otherwise, as by int
+    assert makeIntegerArray(["01", "+1", "-0"], False).tolist() == [1, 1, 0]
+
+    for string in ["1.5", "１", "1_000", "0x10", "", "99999999999999999999"]:
+        assert makeIntegerArray([string], False) is None, string
+
+
+def test_malformed_times_raise_errors():
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+
+        with pytest.raises(ValueError):
+            combinePhonemesIntoWords([("1.5", "10", "1", "a")])
+
+        with pytest.raises(ValueError):
+            combinePhonemesIntoWords([("0", "10", "1", "a"), ("10", "2x", "1", "b")])
+
+        # Non-ASCII digits are converted by int as before
+        assert combinePhonemesIntoWords([("１", "10", "1", "a")]) == {"1": (1, 11)}
+
+
+@requires_numpy
+def test_combine_phonemes_with_and_without_numpy(monkeypatch):
+
+    randomizer = random.Random(16000)
+
+    phonemes = []
+
+    for i in range(2000):
+        word_id = str(randomizer.randint(-1, 300))
+        phonemes.append((str(randomizer.randint(0, 10 ** 7)), str(randomizer.randint(1, 5000)), word_id, "a"))
+
+    word_times = combinePhonemesIntoWords(phonemes)
+
+    monkeypatch.setattr(partitur, "numpy", None)
+
+    assert combinePhonemesIntoWords(phonemes) == word_times
@@ -0,0 +1,93 @@
+# encoding=utf-8
+
+# Regression tests for the command-line scripts: the output has to be byte-identical
+# to that of the original scripts (before the conversion logic was moved into the
+# langdocmaus package) for the files in tests/data
+
+import os
+import shutil
+import wave
+
+import pytest
+
+import MAU2TextGrid
+import MAU2Toolbox
+import Toolbox2BASPartitur
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+TRANSLITERATION_FILE_NAME = os.path.join(os.path.dirname(os.path.dirname(DATA_DIRECTORY)), "transliterationtables", "Bora", "bora.maus.tab")
+
+
+@pytest.fixture
+def data_directory(tmp_path):
+
+    for file_name in ("bora.txt", "bora.par", "bora.mau", "records.txt", "records.par", "records.mau"):
+        shutil.copy(os.path.join(DATA_DIRECTORY, file_name), str(tmp_path))
+
+    # Six seconds of silence at 16 kHz
+    wave_file = wave.open(str(tmp_path / "bora.wav"), "wb")
+    wave_file.setnchannels(1)
+    wave_file.setsampwidth(2)
+    wave_file.setframerate(16000)
+    wave_file.writeframes(b"\x00\x00" * 16000 * 6)
+    wave_file.close()
+
+    return tmp_path
+
+
+def assertSameFile(file_name, expected_file_name):
+
+    with open(str(file_name), "rb") as output_file:
+        output = output_file.read()
+
+    with open(os.path.join(DATA_DIRECTORY, expected_file_name), "rb") as expected_file:
+        expected_output = expected_file.read()
+
+    assert output == expected_output
+
+
+def test_toolbox_to_partitur(data_directory):
+
+    Toolbox2BASPartitur.main(["-t", "t", "-r", "ref", "-wave", str(data_directory / "bora.wav"),
+                              "-starttimemarker", "ELANBegin", "-endtimemarker", "ELANEnd", "-debuglevel", "0",
+                              str(data_directory / "bora.txt"), str(data_directory / "output.par"), TRANSLITERATION_FILE_NAME])
+
+    assertSameFile(data_directory / "output.par", "bora.par")
+
+
+@pytest.mark.parametrize(("arguments", "expected_file_name"), [
+    (["-outputwordtimes"], "bora.new.txt"),
+    (["-toolboxfile", "bora.txt", "-outputwordtimes"], "bora.annotated.txt"),
+    (["-toolboxfile", "bora.txt", "-keeputterancetimes"], "bora.kept.txt"),
+])
+def test_mau_to_toolbox(data_directory, arguments, expected_file_name):
+
+    arguments = [os.path.join(str(data_directory), argument) if argument.startswith("bora.") else argument for argument in arguments]
+
+    MAU2Toolbox.main(["-wave", str(data_directory / "bora.wav"), "-debuglevel", "0"] + arguments
+                     + [str(data_directory / "bora.mau"), str(data_directory / "bora.par"), str(data_directory / "output.txt")])
+
+    assertSameFile(data_directory / "output.txt", expected_file_name)
+
+
+def test_mau_to_textgrid(data_directory):
+
+    MAU2TextGrid.main(["-wave", str(data_directory / "bora.wav"), "-debuglevel", "0",
+                       str(data_directory / "bora.mau"), str(data_directory / "bora.par"), str(data_directory / "output.TextGrid")])
+
+    assertSameFile(data_directory / "output.TextGrid", "bora.TextGrid")
+
+
+# records.txt contains a duplicate record id, a record without utterance times
+# and a trailing record without words, which has to be copied unchanged
+@pytest.mark.parametrize(("arguments", "expected_file_name"), [
+    (["-outputwordtimes"], "records.annotated.txt"),
+    (["-keeputterancetimes"], "records.kept.txt"),
+])
+def test_annotate_toolbox_records(data_directory, arguments, expected_file_name):
+
+    MAU2Toolbox.main(["-wave", str(data_directory / "bora.wav"), "-debuglevel", "0", "-toolboxfile", str(data_directory / "records.txt")] + arguments
+                     + [str(data_directory / "records.mau"), str(data_directory / "records.par"), str(data_directory / "output.txt")])
+
+    assertSameFile(data_directory / "output.txt", expected_file_name)
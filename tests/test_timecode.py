@@ -0,0 +1,45 @@
+# encoding=utf-8
+
+# Tests for converting time codes with langdocmaus.timecode
+
+import pytest
+
+from langdocmaus.timecode import matchTimecode
+from langdocmaus.timecode import timecode2samples
+from langdocmaus.timecode import timecode2seconds
+from langdocmaus.timecode import timecodes2samples
+from langdocmaus.timecode import timecodes2seconds
+
+from tests.benchmark_timecode import benchmark
+
+
+@pytest.mark.parametrize(("time_code", "seconds"), [
+    # Plain seconds (fast path)
+    ("0.000", 0.0), ("12.345", 12.345), ("0.5", 0.5), ("007.250", 7.25), ("3600.001", 3600.001),
+    # Plain seconds without fraction (only 0 is allowed)
+    ("0", 0.0),
+    # Hours, minutes and seconds with and without fraction
+    ("0:00:12.345", 12.345), ("00:00:00.500", 0.5), ("1:02:03", 3723.0), ("10:59:59.999", 39599.999),
+])
+def test_fast_path_agrees_with_regular_expressions(time_code, seconds):
+
+    assert matchTimecode(time_code) == seconds
+    assert timecode2seconds(time_code) == seconds
+    assert timecodes2seconds([time_code, time_code]) == [seconds, seconds]
+    assert timecode2samples(time_code, 16000) == timecodes2samples([time_code], 16000)[0] == int(seconds * 16000)
+
+
+@pytest.mark.parametrize("time_code", ["", "abc", "5", "12.", ".5", "1.2.3", "-1.5", "+1.5", "1e3", " 1.5", "1.5 ", "1:2", "1:02:03.", "nan", "1_000.5"])
+def test_invalid_time_codes(time_code, capsys):
+
+    # All functions reject the time code like the regular expressions do
+    for function in (matchTimecode, timecode2seconds, lambda time_code: timecodes2seconds([time_code])):
+        with pytest.raises(SystemExit):
+            function(time_code)
+
+
+def test_benchmark(capsys):
+
+    benchmark(100, 1)
+
+    assert "100 time codes in plain seconds:" in capsys.readouterr().out
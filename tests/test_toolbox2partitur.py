@@ -0,0 +1,191 @@
+# encoding=utf-8
+
+# Tests for converting Toolbox files to BAS Partitur files with langdocmaus.toolbox2partitur
+
+import codecs
+import os
+import wave
+
+import pytest
+
+import Toolbox2BASPartitur
+
+from langdocmaus.aligners import alignEvenly
+from langdocmaus.chunks import merge_chunks
+from langdocmaus.chunks import readChunkList
+from langdocmaus.chunks import readRecordMap
+from langdocmaus.partitur import readBASPartiturFile
+from langdocmaus.toolbox2partitur import toolbox_to_partitur
+
+TRANSLITERATION_FILE_NAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "transliterationtables", "Bora", "bora.maus.tab")
+
+SAMPLE_RATE = 16000
+
+# Records as tuples (record id, start time, end time, transcription)
+RECORDS = [("001", "0.5", "1.5", "oke kiá"),
+           ("002", "2.0", "3.0", "tsaápi"),
+           ("003", "3.5", "4.5", "méméhba oke"),
+           ("004", "5.0", "6.0", "táñahbe kiá oke")]
+
+# The same records after editing: 001 is unchanged, 002 has changed,
+# 003 has grown, 004 has been removed and 005 is new
+EDITED_RECORDS = [("001", "0.5", "1.5", "oke kiá"),
+                  ("002", "2.0", "3.0", "tsaápi oke"),
+                  ("003", "3.5", "4.5", "méméhba oke kiá tsaápi"),
+                  ("005", "6.5", "7.5", "llíhíñe")]
+
+
+def writeToolboxFile(file_name, records):
+
+    toolbox_file = codecs.open(file_name, "w", "utf-8")
+
+    for (record_id, start_time, end_time, transcription) in records:
+        print("\\ref " + record_id, file=toolbox_file)
+        print("\\ELANBegin " + start_time, file=toolbox_file)
+        print("\\ELANEnd " + end_time, file=toolbox_file)
+        print("\\t " + transcription, file=toolbox_file)
+        print(file=toolbox_file)
+
+    toolbox_file.close()
+
+
+def writeWaveFile(file_name, seconds):
+
+    wave_file = wave.open(file_name, "wb")
+    wave_file.setnchannels(1)
+    wave_file.setsampwidth(2)
+    wave_file.setframerate(SAMPLE_RATE)
+    wave_file.writeframes(b"\x00\x00" * (SAMPLE_RATE * seconds))
+    wave_file.close()
+
+
+def convertIncrementally(directory, records):
+
+    writeToolboxFile(str(directory / "test.txt"), records)
+
+    toolbox_to_partitur(str(directory / "test.txt"), str(directory / "test.par"), TRANSLITERATION_FILE_NAME, "t", "ref",
+                        sample_rate=SAMPLE_RATE, wave_file_name=str(directory / "test.wav"),
+                        start_time_marker="ELANBegin", end_time_marker="ELANEnd",
+                        record_map_file_name=str(directory / "test.records.tsv"),
+                        dirty_segments_file_name=str(directory / "test.dirty.tsv"))
+
+    return readBASPartiturFile(str(directory / "test.par"))
+
+
+def readDirtySegments(file_name):
+
+    dirty_segments_file = codecs.open(file_name, "r", "utf-8")
+
+    dirty_segments = [tuple(line.rstrip("\r\n").split("\t")) for line in dirty_segments_file][1:]
+
+    dirty_segments_file.close()
+
+    return dirty_segments
+
+
+def test_first_run_lists_all_records(tmp_path):
+
+    writeWaveFile(str(tmp_path / "test.wav"), 8)
+
+    tiers = convertIncrementally(tmp_path, RECORDS)
+
+    assert [word_id for (word_id, word) in tiers["ORT"]] == [str(word_id) for word_id in range(8)]
+    assert [(status, record_id) for (status, record_id, start_sample, duration, word_ids) in readDirtySegments(str(tmp_path / "test.dirty.tsv"))] == [("new", "001"), ("new", "002"), ("new", "003"), ("new", "004")]
+    assert len(readChunkList(str(tmp_path / "test.dirty.chunks.tsv"))) == 4
+
+    # Nothing has changed in the second run
+    convertIncrementally(tmp_path, RECORDS)
+
+    assert readDirtySegments(str(tmp_path / "test.dirty.tsv")) == []
+    assert readChunkList(str(tmp_path / "test.dirty.chunks.tsv")) == []
+
+
+def test_edited_records(tmp_path):
+
+    writeWaveFile(str(tmp_path / "test.wav"), 8)
+
+    convertIncrementally(tmp_path, RECORDS)
+
+    tiers = convertIncrementally(tmp_path, EDITED_RECORDS)
+
+    # The words are numbered consecutively in the order of the file
+    assert [word_id for (word_id, word) in tiers["ORT"]] == [str(word_id) for word_id in range(9)]
+    assert tiers["RID"] == [["001", ["0", "1"]], ["002", ["2", "3"]], ["003", ["4", "5", "6", "7"]], ["005", ["8"]]]
+
+    assert readDirtySegments(str(tmp_path / "test.dirty.tsv")) == [("changed", "002", "32000", "16000", "2,3"),
+                                                                    ("changed", "003", "56000", "16000", "4,5,6,7"),
+                                                                    ("new", "005", "104000", "16000", "8"),
+                                                                    ("removed", "004", "", "", "")]
+
+    record_map = readRecordMap(str(tmp_path / "test.records.tsv"))
+
+    assert [(record_id, record["first_word_id"], record["previous_first_word_id"]) for ((record_id, occurrence), record) in sorted(record_map.items())] == [("001", 0, 0), ("002", 2, None), ("003", 4, None), ("005", 8, None)]
+
+    # Only the new and changed records are written as chunks
+    chunks = readChunkList(str(tmp_path / "test.dirty.chunks.tsv"))
+
+    assert [(chunk["start_sample"], chunk["end_sample"], chunk["word_ids"]) for chunk in chunks] == [(32000, 48000, ["2", "3"]), (56000, 72000, ["4", "5", "6", "7"]), (104000, 120000, ["8"])]
+
+
+def test_merge_changed_records_into_previous_alignment(tmp_path):
+
+    writeWaveFile(str(tmp_path / "test.wav"), 8)
+
+    convertIncrementally(tmp_path, RECORDS)
+
+    alignEvenly(str(tmp_path / "test.par"), str(tmp_path / "test.wav"), str(tmp_path / "test.mau"))
+
+    convertIncrementally(tmp_path, EDITED_RECORDS)
+
+    # Align only the chunks of the new and changed records
+    for chunk in readChunkList(str(tmp_path / "test.dirty.chunks.tsv")):
+        alignEvenly(chunk["par"], chunk["wave"], chunk["mau"])
+
+    merge_chunks(str(tmp_path / "test.dirty.chunks.tsv"), str(tmp_path / "test.mau"),
+                 previous_file_name=str(tmp_path / "test.mau"), record_map_file_name=str(tmp_path / "test.records.tsv"))
+
+    # The result is the same as aligning the whole new BAS Partitur file
+    alignEvenly(str(tmp_path / "test.par"), str(tmp_path / "test.wav"), str(tmp_path / "full.mau"))
+
+    assert readBASPartiturFile(str(tmp_path / "test.mau"))["MAU"] == readBASPartiturFile(str(tmp_path / "full.mau"))["MAU"]
+
+
+def test_record_range(tmp_path):
+
+    writeToolboxFile(str(tmp_path / "test.txt"), RECORDS)
+
+    # By number
+    toolbox_to_partitur(str(tmp_path / "test.txt"), str(tmp_path / "test.par"), TRANSLITERATION_FILE_NAME, "t", "ref",
+                        start_number=2, end_number=3)
+
+    tiers = readBASPartiturFile(str(tmp_path / "test.par"))
+
+    assert [record_id for (record_id, word_ids) in tiers["RID"]] == ["002", "003"]
+    assert [word for (word_id, word) in tiers["ORT"]] == ["tsaápi", "méméhba", "oke"]
+
+    # By record id and open-ended
+    toolbox_to_partitur(str(tmp_path / "test.txt"), str(tmp_path / "test.par"), TRANSLITERATION_FILE_NAME, "t", "ref",
+                        start_id="003")
+
+    assert [record_id for (record_id, word_ids) in readBASPartiturFile(str(tmp_path / "test.par"))["RID"]] == ["003", "004"]
+
+
+def test_record_range_from_command_line(tmp_path):
+
+    writeToolboxFile(str(tmp_path / "test.txt"), RECORDS)
+
+    Toolbox2BASPartitur.main(["-t", "t", "-r", "ref", "-debuglevel", "0", "-noinventorycheck", "-endid", "002",
+                              str(tmp_path / "test.txt"), str(tmp_path / "test.par"), TRANSLITERATION_FILE_NAME])
+
+    assert [record_id for (record_id, word_ids) in readBASPartiturFile(str(tmp_path / "test.par"))["RID"]] == ["001", "002"]
+
+
+def test_unknown_record_id(tmp_path, capsys):
+
+    writeToolboxFile(str(tmp_path / "test.txt"), RECORDS)
+
+    with pytest.raises(SystemExit):
+        toolbox_to_partitur(str(tmp_path / "test.txt"), str(tmp_path / "test.par"), TRANSLITERATION_FILE_NAME, "t", "ref",
+                            end_id="005")
+
+    assert "Cannot find the record ID of the last record to be processed: 005" in capsys.readouterr().out
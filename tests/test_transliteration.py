@@ -0,0 +1,184 @@
+# encoding=utf-8
+
+# Tests for the grapheme-to-phoneme conversion with langdocmaus.transliteration
+
+import collections
+import glob
+import os
+import random
+
+import pytest
+
+from langdocmaus import transliteration
+from langdocmaus.transliteration import compileTransliterationTable
+from langdocmaus.transliteration import getTableFingerprint
+from langdocmaus.transliteration import readTransliterationTable
+from langdocmaus.transliteration import readTransliterationCache
+from langdocmaus.transliteration import transliterate
+from langdocmaus.transliteration import transliterateCached
+from langdocmaus.transliteration import transliterateCompiled
+from langdocmaus.transliteration import transliterateORT
+from langdocmaus.transliteration import writeTransliterationCache
+
+# Directory with the transliteration tables shipped with LangDocMAUS
+TABLE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "transliterationtables")
+
+TABLE_FILE_NAMES = sorted(glob.glob(os.path.join(TABLE_DIRECTORY, "**", "*.tab"), recursive=True))
+
+# Orthographic words as they occur in Toolbox files
+# (Bora words, Spanish loans, punctuation, capitalization and unknown words)
+REAL_WORDS = [
+    "", " ", "[xxx]", "ihjyúváa", "Ihjyúváa", "méméhba", "tsaápi", "tsáhájkímɨ́",
+    "llíhíñe", "kiá", "oke", "táñahbe", "Ɨ´ɨ", "ɨ́ɨ", "chíjyé", "quíwa", "dsɨ́jcu",
+    "mé-,", "¿kiá?", "¡oke!", "(táñahbe)", "\"tsaápi\"", "a_b", "a/b", "a\\/b",
+    "tsá jyá", "t s", "Juan", "Qué", "México", "jyjyjy", "123", "x-y-z",
+]
+
+
+@pytest.fixture(scope="module", params=TABLE_FILE_NAMES, ids=lambda file_name: os.path.relpath(file_name, TABLE_DIRECTORY))
+def transliteration_table(request):
+
+    return readTransliterationTable(request.param)
+
+
+def test_tables_are_shipped():
+
+    assert any(os.path.basename(file_name) == "bora.maus.tab" for file_name in TABLE_FILE_NAMES)
+
+
+def test_compiled_table_on_graphemes(transliteration_table):
+
+    compiled_table = compileTransliterationTable(transliteration_table)
+
+    # Each source on its own and all sources in table order and in reverse order
+    words = [source for (source, destination) in transliteration_table]
+    words.append("".join(words))
+    words.append("".join(reversed(words)))
+
+    for word in words:
+        assert transliterateCompiled(word, compiled_table) == transliterate(word, transliteration_table), word
+
+
+def test_compiled_table_on_real_words(transliteration_table):
+
+    compiled_table = compileTransliterationTable(transliteration_table)
+
+    for word in REAL_WORDS:
+        assert transliterateCompiled(word, compiled_table) == transliterate(word, transliteration_table), word
+
+
+def test_compiled_table_on_random_words(transliteration_table):
+
+    compiled_table = compileTransliterationTable(transliteration_table)
+
+    # Random words from the sources and destinations of the table, their characters,
+    # whitespace and some characters not covered by the table
+    pieces = set(" \t") | set("xzü1")
+
+    for (source, destination) in transliteration_table:
+        pieces.add(source)
+        pieces.add(destination)
+        pieces.update(source)
+        pieces.update(destination)
+
+    pieces = sorted(pieces)
+
+    randomizer = random.Random(20130501)
+
+    for i in range(5000):
+        word = "".join(randomizer.choice(pieces) for j in range(randomizer.randint(1, 12)))
+
+        assert transliterateCompiled(word, compiled_table) == transliterate(word, transliteration_table), word
+
+
+def test_compiled_table_on_adversarial_tables():
+
+    # Small random tables over few characters, so that rules often
+    # overlap, consume each other's output or delete characters
+    randomizer = random.Random(85)
+
+    alphabet = "ab c"
+
+    for i in range(500):
+        transliteration_table = []
+
+        for j in range(randomizer.randint(1, 6)):
+            source = "".join(randomizer.choice(alphabet) for k in range(randomizer.randint(1, 3)))
+            destination = "".join(randomizer.choice(alphabet) for k in range(randomizer.randint(0, 3)))
+            transliteration_table.append((source, destination))
+
+        compiled_table = compileTransliterationTable(transliteration_table)
+
+        for j in range(20):
+            word = "".join(randomizer.choice(alphabet) for k in range(randomizer.randint(0, 8)))
+
+            assert transliterateCompiled(word, compiled_table) == transliterate(word, transliteration_table), (transliteration_table, word)
+
+
+# A small table for testing the transliteration cache
+CACHE_TEST_TABLE = [("á", "a"), ("ñ", "J"), ("ch", "tS")]
+
+
+@pytest.fixture
+def empty_cache(monkeypatch):
+
+    monkeypatch.setattr(transliteration, "transliteration_cache", collections.OrderedDict())
+    monkeypatch.setattr(transliteration, "TRANSLITERATION_CACHE_SIZE", 3)
+
+
+def test_cache_keeps_recently_used_words(empty_cache):
+
+    compiled_table = compileTransliterationTable(CACHE_TEST_TABLE)
+    table_fingerprint = getTableFingerprint(CACHE_TEST_TABLE)
+
+    for word in ("kiá", "táñahbe", "chíjyé"):
+        assert transliterateCached(word, compiled_table, table_fingerprint) == (transliterate(word, CACHE_TEST_TABLE), False)
+
+    # Using kiá again makes táñahbe the least recently used word
+    assert transliterateCached("kiá", compiled_table, table_fingerprint) == ("kia", True)
+    assert transliterateCached("oke", compiled_table, table_fingerprint) == ("oke", False)
+
+    assert list(transliteration.transliteration_cache) == [(table_fingerprint, "chíjyé"), (table_fingerprint, "kiá"), (table_fingerprint, "oke")]
+    assert transliterateCached("táñahbe", compiled_table, table_fingerprint) == ("taJahbe", False)
+
+
+def test_cache_counts_hits_and_misses(empty_cache, capsys):
+
+    ort_utterances = [("001", [("0", "kiá"), ("1", "oke"), ("2", "kiá")]),
+                      ("002", [("3", "oke"), ("4", "chíjyé")])]
+
+    sampa_utterances = transliterateORT(ort_utterances, CACHE_TEST_TABLE, debug_level=1)
+
+    assert sampa_utterances == [("001", [("0", "kia"), ("1", "oke"), ("2", "kia")]),
+                                ("002", [("3", "oke"), ("4", "tSíjyé")])]
+    assert "Transliteration cache: 2 hits, 3 misses." in capsys.readouterr().out
+
+    # All words are in the cache in the second run
+    transliterateORT(ort_utterances, CACHE_TEST_TABLE, debug_level=1)
+
+    assert "Transliteration cache: 5 hits, 0 misses." in capsys.readouterr().out
+
+
+def test_cache_file(empty_cache, tmp_path):
+
+    cache_file_name = str(tmp_path / "transliteration_cache.tsv")
+
+    transliterateORT([("001", [("0", "kiá"), ("1", "oke")])], CACHE_TEST_TABLE)
+    writeTransliterationCache(cache_file_name, CACHE_TEST_TABLE)
+
+    # A cache file written with the same table is read in
+    transliteration.transliteration_cache.clear()
+    readTransliterationCache(cache_file_name, CACHE_TEST_TABLE)
+
+    table_fingerprint = getTableFingerprint(CACHE_TEST_TABLE)
+
+    assert list(transliteration.transliteration_cache.items()) == [((table_fingerprint, "kiá"), "kia"), ((table_fingerprint, "oke"), "oke")]
+
+    # A cache file written with another table is ignored
+    other_table = CACHE_TEST_TABLE + [("k", "kh")]
+
+    transliteration.transliteration_cache.clear()
+    readTransliterationCache(cache_file_name, other_table)
+
+    assert len(transliteration.transliteration_cache) == 0
+    assert transliterateCached("kiá", compileTransliterationTable(other_table), getTableFingerprint(other_table)) == ("khia", False)
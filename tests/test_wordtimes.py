@@ -0,0 +1,164 @@
+# encoding=utf-8
+
+# Tests for setting word start and end times in ELAN files with langdocmaus.wordtimes
+
+import codecs
+
+from langdocmaus.eaf import readELANFile
+from langdocmaus.wordtimes import findParentAnnotations
+from langdocmaus.wordtimes import importWordTimes
+from langdocmaus.wordtimes import indexParentAnnotations
+from langdocmaus.wordtimes import writeWordTimeErrorReport
+
+ELAN_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<ANNOTATION_DOCUMENT AUTHOR="" DATE="2020-01-01T00:00:00+01:00" FORMAT="3.0" VERSION="3.0">
+    <HEADER MEDIA_FILE="" TIME_UNITS="milliseconds"/>
+"""
+
+ELAN_FOOTER = """    <LINGUISTIC_TYPE GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="ref" TIME_ALIGNABLE="true"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Included_In" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="t" TIME_ALIGNABLE="true"/>
+    <CONSTRAINT DESCRIPTION="Time alignable annotations within the parent annotation's time interval, gaps are allowed" STEREOTYPE="Included_In"/>
+</ANNOTATION_DOCUMENT>
+"""
+
+
+# Function to write an ELAN file with a reference tier and a transcription tier
+# Arguments:
+# 1. The file name
+# 2. A list of time slots as pairs (time slot id, time value or None)
+# 3. A list of the annotations on the reference tier as tuples (annotation id, start time slot, end time slot, value)
+# 4. A list of the annotations on the transcription tier as tuples (annotation id, start time slot, end time slot, value)
+def writeELANTestFile(file_name, time_slots, ref_annotations, word_annotations):
+
+    elan_file = codecs.open(file_name, "w", "utf-8")
+
+    elan_file.write(ELAN_HEADER)
+    elan_file.write("    <TIME_ORDER>\n")
+
+    for (time_slot_id, time_value) in time_slots:
+
+        if time_value is None:
+            elan_file.write("        <TIME_SLOT TIME_SLOT_ID=\"%s\"/>\n" % time_slot_id)
+        else:
+            elan_file.write("        <TIME_SLOT TIME_SLOT_ID=\"%s\" TIME_VALUE=\"%d\"/>\n" % (time_slot_id, time_value))
+
+    elan_file.write("    </TIME_ORDER>\n")
+
+    for (tier_attributes, annotations) in (("LINGUISTIC_TYPE_REF=\"ref\" TIER_ID=\"ref\"", ref_annotations),
+                                           ("LINGUISTIC_TYPE_REF=\"t\" PARENT_REF=\"ref\" TIER_ID=\"t\"", word_annotations)):
+
+        elan_file.write("    <TIER %s>\n" % tier_attributes)
+
+        for (annotation_id, start_time_slot, end_time_slot, value) in annotations:
+            elan_file.write("        <ANNOTATION>\n"
+                            "            <ALIGNABLE_ANNOTATION ANNOTATION_ID=\"%s\" TIME_SLOT_REF1=\"%s\" TIME_SLOT_REF2=\"%s\">\n"
+                            "                <ANNOTATION_VALUE>%s</ANNOTATION_VALUE>\n"
+                            "            </ALIGNABLE_ANNOTATION>\n"
+                            "        </ANNOTATION>\n" % (annotation_id, start_time_slot, end_time_slot, value))
+
+        elan_file.write("    </TIER>\n")
+
+    elan_file.write(ELAN_FOOTER)
+    elan_file.close()
+
+
+# Function to write a flexibilized ELAN file, in which every annotation has its own time slots
+# Arguments:
+# 1. The file name
+# 2. A list of utterances as tuples (Toolbox reference, start time, end time, words)
+#    with the words as tuples (annotation id, start time, end time, word)
+#    (the annotations of the utterances get the ids a1, a2, ...)
+def writeFlexibilizedELANFile(file_name, utterances):
+
+    time_slots = []
+    ref_annotations = []
+    word_annotations = []
+
+    def addTimeSlot(time_value):
+        time_slots.append(("ts%d" % (len(time_slots) + 1), time_value))
+        return time_slots[-1][0]
+
+    for (utterance_number, (reference, start_time, end_time, words)) in enumerate(utterances, 1):
+
+        ref_annotations.append(("a%d" % utterance_number, addTimeSlot(start_time), addTimeSlot(end_time), reference))
+
+        for (annotation_id, word_start_time, word_end_time, word) in words:
+            word_annotations.append((annotation_id, addTimeSlot(word_start_time), addTimeSlot(word_end_time), word))
+
+    # The time slots are sorted by time like in ELAN
+    time_slots.sort(key=lambda time_slot: time_slot[1])
+
+    writeELANTestFile(file_name, time_slots, ref_annotations, word_annotations)
+
+
+def getWordTimes(elan_file):
+
+    return dict((annotation.get_annotation_value(), (annotation.get_start_time(), annotation.get_end_time())) for annotation in elan_file.get_tier_by_id("t"))
+
+
+def test_word_on_utterance_boundary(tmp_path):
+
+    # The first utterance ends where the second one starts
+    writeFlexibilizedELANFile(str(tmp_path / "test.eaf"), [("u1", 0, 1000, [("a10", 0, 500, "w1"), ("a11", 500, 1000, "w2")]),
+                                                           ("u2", 1000, 2000, [("a12", 1000, 1500, "w3"), ("a13", 1500, 2000, "w4")])])
+
+    elan_file = readELANFile(str(tmp_path / "test.eaf"))
+
+    toolbox_refs_to_word_times = {"u1": [["0.010", "0.600"], ["0.590", "0.990"]],
+                                  "u2": [["1.010", "1.400"], ["1.390", "1.990"]]}
+
+    parent_index = indexParentAnnotations(elan_file.get_tier_by_id("ref").get_annotations(), toolbox_refs_to_word_times)
+
+    # Words touching the boundary only belong to the utterance containing them
+    assert findParentAnnotations(parent_index, 500, 1000) == ["a1"]
+    assert findParentAnnotations(parent_index, 1000, 1500) == ["a2"]
+
+    # A word without duration on the boundary is contained in both utterances (in the order of the tier)
+    assert findParentAnnotations(parent_index, 1000, 1000) == ["a1", "a2"]
+
+    importWordTimes(elan_file, toolbox_refs_to_word_times, "t")
+
+    assert getWordTimes(elan_file) == {"w1": (10, 590), "w2": (600, 990), "w3": (1010, 1390), "w4": (1400, 1990)}
+
+
+def test_words_out_of_order(tmp_path):
+
+    # The positions of the words are given by their annotation ids, not by the order of the tier
+    writeFlexibilizedELANFile(str(tmp_path / "test.eaf"), [("u1", 0, 3000, [("a12", 0, 1000, "w3"), ("a10", 1000, 2000, "w1"), ("a11", 2000, 3000, "w2")]),
+                                                           ("u2", 3000, 4000, [("a13", 3000, 4000, "w4")])])
+
+    elan_file = readELANFile(str(tmp_path / "test.eaf"))
+
+    importWordTimes(elan_file, {"u1": [["0.100", "1.100", "2.100"], ["1.000", "2.000", "2.900"]], "u2": [["3.100"], ["3.900"]]}, "t")
+
+    assert getWordTimes(elan_file) == {"w1": (100, 1000), "w2": (1100, 2000), "w3": (2100, 2900), "w4": (3100, 3900)}
+
+
+def test_report_unresolvable_words(tmp_path):
+
+    # u1 has one word time less than words, u3 has no word times at all
+    writeFlexibilizedELANFile(str(tmp_path / "test.eaf"), [("u1", 0, 1000, [("a10", 0, 500, "w1"), ("a11", 500, 1000, "w2")]),
+                                                           ("u2", 1000, 2000, [("a12", 1000, 2000, "w3")]),
+                                                           ("u3", 2000, 3000, [("a13", 2000, 3000, "w4")])])
+
+    elan_file = readELANFile(str(tmp_path / "test.eaf"))
+
+    word_time_errors = []
+
+    importWordTimes(elan_file, {"u1": [["0.100"], ["0.400"]], "u2": [["1.100"], ["1.900"]]}, "t", word_time_errors)
+
+    writeWordTimeErrorReport(str(tmp_path / "report.tsv"), word_time_errors)
+
+    with codecs.open(str(tmp_path / "report.tsv"), "r", "utf-8") as report_file:
+        report = [line.rstrip("\n").split("\t") for line in report_file]
+
+    assert report == [["tier", "utterance", "annotation_id", "word", "problem", "message"],
+                      ["t", "", "a13", "w4", "no_parent", "Cannot find parent annotation with word times"],
+                      ["t", "u1", "a11", "w2", "no_position", "Word 2 of the annotation unit, but only 1 word start and 1 word end times"]]
+
+    # The other words still get their word times
+    word_times = getWordTimes(elan_file)
+
+    assert word_times["w1"] == (100, 400)
+    assert word_times["w3"] == (1100, 1900)
+    assert word_times["w4"] == (2000, 3000)